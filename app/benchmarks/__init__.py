@@ -0,0 +1 @@
+## benchmarks, run as modules: python -m app.benchmarks.<name>
@@ -0,0 +1,112 @@
+"""
+base.players_processed / base.teams_processed stored as an unordered heap vs clustered by (SEASON_ID, key, GAME_DATE)
+
+the base models are restated from synthetic raw tables (see restate.synthetic_raw), then both processed tables are
+copied twice: shuffled (heap, what a season at a time of incremental inserts plus restatements degrades to) and
+ordered like the models now write them (clustered), and exported with export_processed (parquet, read through
+hive partitioned views). every query runs against each layout:
+    valid_games          make_datasets.make_valid_games_cte, every season and the last two
+    season_filter        one season of player rows, the zone map on SEASON_ID skips the other row groups
+    aggs.*               the aggs window models (sql_generator.WINDOW_MODELS) built as CREATE TABLE ... AS,
+                         over every season (a restatement) and over the last one (an incremental run)
+
+    python -m app.benchmarks.clustered --seasons 10
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import duckdb
+import pandas as pd
+
+from .restate import load_models, load_seeds, restate, synthetic_raw
+from ..model.make_datasets import make_valid_games_cte
+from ..scripts.export_processed import CLUSTER_KEYS, export_table
+from ..sql.sql_generator import SQLMeshModelGenerator, WINDOW_MODELS
+from ..utils.logger import Logger
+
+
+LAYOUTS = ('heap', 'clustered', 'parquet')
+
+
+def layouts(conn, export_path):
+    """heap.* and clustered.* copies of the processed tables, parquet.* views over their season partitioned export"""
+    for schema in LAYOUTS:
+        conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+    for table, keys in CLUSTER_KEYS.items():
+        keys = ', '.join(keys)
+        conn.execute(f"CREATE OR REPLACE TABLE heap.{table} AS SELECT * FROM base.{table} ORDER BY hash(GAME_ID, {keys})")
+        conn.execute(f"CREATE OR REPLACE TABLE clustered.{table} AS SELECT * FROM base.{table} ORDER BY {keys}")
+        export_table(conn, table, export_path=export_path)
+        conn.execute(f"""
+            CREATE OR REPLACE VIEW parquet.{table} AS
+            SELECT * FROM read_parquet('{os.path.join(export_path, table, '*', '*.parquet')}', hive_partitioning = true)
+        """)
+
+
+def queries(conn):
+    """{name: (sql, creates a table)} with base.*_processed to be replaced by the layout's schema"""
+    seasons = [row[0] for row in conn.execute("SELECT DISTINCT SEASON_ID FROM base.teams_processed ORDER BY 1").fetchall()]
+    result = {
+        'valid_games': (f"{make_valid_games_cte(season_min=0)} SELECT COUNT(*) FROM valid_games", False),
+        'valid_games_last_2': (f"{make_valid_games_cte(season_min=seasons[-3])} SELECT COUNT(*) FROM valid_games", False),
+        'season_filter': (f"""
+            SELECT PLAYER_ID, AVG(PTS), SUM(PLAYED_FLAG) FROM base.players_processed
+            WHERE SEASON_ID = {seasons[-1]} GROUP BY PLAYER_ID""", False),
+    }
+    generator = SQLMeshModelGenerator(Logger())
+    for spec in WINDOW_MODELS:
+        result[spec['name']] = (generator.window_query(spec, source_filter='TRUE'), True)
+        result[f"{spec['name']} (last season)"] = (generator.window_query(spec, source_filter=f'SEASON_ID = {seasons[-1]}'), True)
+    return result
+
+
+def timed(conn, sql, creates, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if creates:
+            conn.execute(f"CREATE OR REPLACE TEMP TABLE result AS {sql}")
+        else:
+            conn.execute(sql).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(seasons=10, repeat=3):
+    models = load_models()
+    base_models = {name: model for name, model in models.items() if model['seed'] or name.startswith('base.')}
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = duckdb.connect(os.path.join(tmp, 'bench.db'))
+        conn.execute("SET enable_progress_bar = false")
+        synthetic_raw(conn, seasons=seasons)
+        load_seeds(conn, base_models)
+        restate(conn, base_models)
+        layouts(conn, os.path.join(tmp, 'processed_parquet'))
+        rows = conn.execute("SELECT COUNT(*) FROM base.players_processed").fetchone()[0]
+
+        for name, (sql, creates) in queries(conn).items():
+            result = {'query': name, 'player_rows': rows}
+            for layout in LAYOUTS:
+                result[f'{layout}_s'] = timed(conn, sql.replace('base.players_processed', f'{layout}.players_processed')
+                                              .replace('base.teams_processed', f'{layout}.teams_processed'), creates, repeat)
+            result['clustered_speedup'] = result['heap_s'] / result['clustered_s']
+            results.append(result)
+        conn.close()
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="processed tables as an unordered heap vs clustered by season, key and date vs parquet")
+    parser.add_argument('--seasons', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3, help="best of n runs per query")
+    args = parser.parse_args()
+
+    results = run(args.seasons, args.repeat)
+    print(results.to_string(index=False, float_format='%.3f'))
+
+
+if __name__ == "__main__":
+    main()
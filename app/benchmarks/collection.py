@@ -0,0 +1,127 @@
+"""
+collection throughput and failure handling of get_data against the local fake stats api (fake_stats)
+
+the fake runs in this process; the collection (get_data.collect_season) runs in a spawned one with NBA_STATS_URL
+pointing at the fake, NBA_DATA_PATH / NBA_DATABASE_PATH / NBA_JOURNAL_PATH in a scratch directory and the response
+cache off. one run per --workers value, each records:
+    seconds, games/s and requests/s, peak rss of the collecting process
+    (game, endpoint) pairs collected / empty / failed as get_data saw them
+    requests per outcome at the server: ok / empty / throttled / error / timeout
+one json line per run is appended to --output
+
+    python -m app.benchmarks.collection --games 10 --workers 1 4 8 --latency lognormal:0.1:0.5 --throttle 0.02
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from .fake_stats import FakeStats, start
+from .pipeline import revision
+from .synthetic import season_name, LAST_YEAR
+from .window_models import peak_rss_mb
+from ..utils.logger import Logger
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+OUTPUT = os.path.join(BASE_PATH, 'app', 'benchmarks', 'results', 'collection.jsonl')
+
+
+def collect(season, workers, rate):
+    """runs in a child process: (seconds, peak rss, {outcome: (game, endpoint) pairs})"""
+    from ..scripts.get_data import collect_season
+    start_time = time.perf_counter()
+    status, _ = collect_season(season, workers=workers, rate=rate, cache_mode='off', logger=Logger(), write_duckdb=False)
+    seconds = time.perf_counter() - start_time
+    outcomes = {'collected': 0, 'empty': 0, 'failed': 0}
+    for result in status.values():
+        outcomes[result] += 1
+    return seconds, peak_rss_mb(), outcomes
+
+
+def run(workers=(1,), rate=None, games=10, latency='fixed:0', throttle=0.0, error=0.0, timeout=0.0, hang=5.0, empty=0.0,
+        client_timeout=2.0, seed=0, work_dir=None):
+    """[result dict] for one collection of a synthetic season per workers value, each against a fresh fake"""
+    year = LAST_YEAR
+    context = multiprocessing.get_context('spawn')
+    rev = revision()
+    results = []
+    for n in workers:
+        stats = FakeStats([year], games, latency, throttle, error, timeout, hang, empty, seed)
+        server = start(stats)
+        with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+            env = {
+                'NBA_STATS_URL': server.url,
+                'NBA_STATS_TIMEOUT': str(client_timeout),
+                'NBA_DATA_PATH': os.path.join(tmp, 'raw'),
+                'NBA_DATABASE_PATH': os.path.join(tmp, 'database'),
+                'NBA_JOURNAL_PATH': os.path.join(tmp, 'journal.sqlite')
+            }
+            saved = {key: os.environ.get(key) for key in env}
+            for table_class in ('teams', 'players'):
+                for endpoint in ('advanced', 'fourfactors', 'misc', 'scoring', 'traditional'):
+                    os.makedirs(os.path.join(tmp, 'raw', table_class, endpoint), exist_ok=True)
+            os.makedirs(os.path.join(tmp, 'raw', 'log'), exist_ok=True)
+            os.makedirs(env['NBA_DATABASE_PATH'], exist_ok=True)
+            os.environ.update(env)  # the spawned collection imports get_data with these set
+            try:
+                with context.Pool(1) as pool:
+                    seconds, peak_mb, outcomes = pool.apply(collect, (season_name(year), n, rate))
+            finally:
+                server.shutdown()
+                server.server_close()
+                for key, value in saved.items():
+                    if value is None:
+                        os.environ.pop(key, None)
+                    else:
+                        os.environ[key] = value
+
+        requests = {outcome: 0 for outcome in ('ok', 'empty', 'throttled', 'error', 'timeout')}
+        for (endpoint, outcome), count in stats.counts.items():
+            if endpoint != 'leaguegamefinder':
+                requests[outcome] = requests.get(outcome, 0) + count
+        game_count = len(stats.season(year)[0]['log_table']) // 2
+        results.append({
+            'run': time.strftime('%Y%m%dT%H%M%S'), 'revision': rev, 'workers': n, 'rate': rate, 'games': game_count,
+            'latency': latency, 'throttle': throttle, 'error': error, 'timeout': timeout, 'empty': empty,
+            'seconds': round(seconds, 3), 'games_per_s': round(game_count / seconds, 2),
+            'requests_per_s': round(sum(requests.values()) / seconds, 2), 'peak_rss_mb': round(peak_mb, 1),
+            **{f'pairs_{outcome}': count for outcome, count in outcomes.items()}, **{f'requests_{outcome}': count for outcome, count in requests.items()}
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="get_data throughput and failure handling against the local fake stats api")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8], help="one run per value")
+    parser.add_argument('--rate', type=float, default=None, help="max requests per second across the workers")
+    parser.add_argument('--games', type=int, default=10, help="games per team in the season collected")
+    parser.add_argument('--latency', default='fixed:0.05', help="fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA seconds")
+    parser.add_argument('--throttle', type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument('--error', type=float, default=0.0, help="share of requests answered 500")
+    parser.add_argument('--timeout', type=float, default=0.0, help="share of requests that hang past --client-timeout")
+    parser.add_argument('--hang', type=float, default=5.0)
+    parser.add_argument('--empty', type=float, default=0.0, help="share of games with empty box scores")
+    parser.add_argument('--client-timeout', type=float, default=2.0, help="NBA_STATS_TIMEOUT of the collection")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=OUTPUT, help="results file, one json line per run, appended to")
+    args = parser.parse_args()
+
+    logger = Logger()
+    results = run(args.workers, args.rate, args.games, args.latency, args.throttle, args.error, args.timeout, args.hang,
+                  args.empty, args.client_timeout, args.seed)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'a') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
+    for result in results:
+        print(f"{result['workers']:>3} workers {result['seconds']:8.1f}s {result['games_per_s']:7.2f} games/s "
+              f"{result['requests_per_s']:7.2f} req/s  collected {result['pairs_collected']} empty {result['pairs_empty']} failed {result['pairs_failed']}  "
+              f"server: {result['requests_throttled']} throttled {result['requests_error']} errors {result['requests_timeout']} timeouts")
+    logger.log_info(f"collection benchmark: {len(results)} runs, results in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
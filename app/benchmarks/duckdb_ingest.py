@@ -0,0 +1,78 @@
+"""
+duckdb ingest throughput of DataWriter.write_to_duckdb, in rows per second
+
+each batch is a 100 game flush into a scratch database with raw.teams_traditional / raw.players_traditional.
+legacy: what write_to_duckdb did before the ConnectionManager, connect per flush, two information_schema probes,
+INSERT ... SELECT * from the pandas frame
+managed: one ConnectionManager for the run, cached columns, arrow batches inside one transaction per flush
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import duckdb
+import pandas as pd
+
+from ..utils.duckdb_manager import ConnectionManager
+from .writer_flush import make_batch
+
+
+def create_tables(database_path):
+    conn = duckdb.connect(database_path)
+    conn.execute("CREATE SCHEMA raw")
+    conn.execute("CREATE TABLE raw.teams_traditional (GAME_ID BIGINT, TEAM_ID BIGINT, PTS DOUBLE)")
+    conn.execute("CREATE TABLE raw.players_traditional (GAME_ID BIGINT, TEAM_ID BIGINT, PLAYER_ID BIGINT, PTS DOUBLE)")
+    conn.close()
+
+
+def legacy_insert(database_path, endpoint_name, tstats, pstats):
+    conn = duckdb.connect(database_path)
+    team_table_exist = conn.sql(f"SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = 'raw' and TABLE_NAME = 'teams_{endpoint_name}'").fetchall()
+    player_table_exist = conn.sql(f"SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = 'raw' and TABLE_NAME = 'players_{endpoint_name}'").fetchall()
+    if team_table_exist[0][0]:
+        conn.execute(f"INSERT INTO raw.teams_{endpoint_name} SELECT * FROM tstats")
+    if player_table_exist[0][0]:
+        conn.execute(f"INSERT INTO raw.players_{endpoint_name} SELECT * FROM pstats")
+    conn.close()
+
+
+def run(batches=50, games=100):
+    frames = [make_batch(batch * games, games) for batch in range(batches)]
+    rows = sum(len(t) + len(p) for t, p in frames)
+    results = dict()
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        create_tables(legacy_path)
+        start = time.perf_counter()
+        for tstats, pstats in frames:
+            legacy_insert(legacy_path, 'traditional', tstats, pstats)
+        results['legacy'] = time.perf_counter() - start
+
+        managed_path = os.path.join(tmp, 'managed.db')
+        create_tables(managed_path)
+        start = time.perf_counter()
+        connection = ConnectionManager(managed_path)
+        for tstats, pstats in frames:
+            connection.insert([('teams_traditional', tstats), ('players_traditional', pstats)])
+        connection.close()
+        results['managed'] = time.perf_counter() - start
+
+    return pd.DataFrame([
+        {'writer': name, 'batches': batches, 'rows': rows, 'seconds': seconds, 'rows_per_s': rows / seconds}
+        for name, seconds in results.items()
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="duckdb ingest rows/s, connect per flush vs one managed connection")
+    parser.add_argument('--batches', type=int, default=50)
+    parser.add_argument('--games', type=int, default=100, help="games per flush")
+    args = parser.parse_args()
+
+    results = run(args.batches, args.games)
+    print(results.to_string(index=False, float_format='%.2f'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+local stand-in for stats.nba.com, so the collectors can be load tested without network
+
+serves what get_data / common_data request, in the api's json shape (resultSets of headers + rowSet):
+    leaguegamefinder        the season's log rows (Season)
+    boxscore*v2             advanced, fourfactors, misc, scoring, traditional player and team rows (GameID)
+    commonplayerinfo        one player's info row (PlayerID)
+the rows are synthetic.season_frames of the requested season, the same data the pipeline benchmark writes as files.
+anything else is a 404.
+
+every request first waits a latency drawn from --latency, then may be turned into a fault:
+    --throttle    share of requests answered 429 (get_data retries them with backoff)
+    --error       share answered 500
+    --timeout     share that hang for --hang seconds before answering, longer than the client's NBA_STATS_TIMEOUT
+    --empty       share of games whose box scores have no rows (the same games on every request, like box scores
+                  that are not published yet)
+
+    python -m app.benchmarks.fake_stats --port 8765 --latency lognormal:0.2:0.5 --throttle 0.02 --timeout 0.01
+    NBA_STATS_URL=http://127.0.0.1:8765/stats NBA_STATS_TIMEOUT=2 python -m app.scripts.get_data --cache-mode off
+"""
+import argparse
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from .synthetic import season_frames, season_years, GAMES
+from ..utils.logger import Logger
+
+
+# endpoint -> (synthetic endpoint, player data set, team data set), in the order the api lists them
+BOX_SCORES = {
+    'boxscoreadvancedv2': ('advanced', 'PlayerStats', 'TeamStats'),
+    'boxscorefourfactorsv2': ('fourfactors', 'sqlPlayersFourFactors', 'sqlTeamsFourFactors'),
+    'boxscoremiscv2': ('misc', 'sqlPlayersMisc', 'sqlTeamsMisc'),
+    'boxscorescoringv2': ('scoring', 'sqlPlayersScoring', 'sqlTeamsScoring'),
+    'boxscoretraditionalv2': ('traditional', 'PlayerStats', 'TeamStats')
+}
+PLAYER_INFO_COLUMNS = ['PERSON_ID', 'FIRST_NAME', 'LAST_NAME', 'DISPLAY_FIRST_LAST', 'DISPLAY_LAST_COMMA_FIRST', 'DISPLAY_FI_LAST',
+                       'PLAYER_SLUG', 'BIRTHDATE', 'SCHOOL', 'COUNTRY', 'LAST_AFFILIATION', 'HEIGHT', 'WEIGHT', 'SEASON_EXP',
+                       'JERSEY', 'POSITION', 'ROSTERSTATUS', 'TEAM_ID', 'TEAM_NAME', 'TEAM_ABBREVIATION', 'TEAM_CODE',
+                       'TEAM_CITY', 'PLAYERCODE', 'FROM_YEAR', 'TO_YEAR', 'DLEAGUE_FLAG', 'NBA_FLAG', 'GAMES_PLAYED_FLAG',
+                       'DRAFT_YEAR', 'DRAFT_ROUND', 'DRAFT_NUMBER']
+
+
+def latency_sampler(spec):
+    """
+    'fixed:SECONDS', 'uniform:LOW:HIGH' or 'lognormal:MEDIAN:SIGMA' -> function(rng) returning seconds
+    """
+    kind, *values = spec.split(':')
+    values = [float(v) for v in values]
+    if kind == 'fixed':
+        return lambda rng: values[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        return lambda rng: values[0] * float(np.exp(rng.normal(0, values[1])))
+    raise ValueError(f"unknown latency {spec}, expected fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+
+
+def result_sets(resource, parameters, data_sets):
+    """the api's json body, data_sets: [(name, headers, rows as a json array string)]"""
+    sets = ', '.join(f'{{"name": {json.dumps(name)}, "headers": {json.dumps(headers)}, "rowSet": {rows}}}' for name, headers, rows in data_sets)
+    return f'{{"resource": {json.dumps(resource)}, "parameters": {json.dumps(parameters)}, "resultSets": [{sets}]}}'
+
+
+def rows_json(frame):
+    return frame.to_json(orient='values')
+
+
+class FakeStats:
+    """
+    responses and fault injection of the fake server, shared by its handler threads
+    counts: {(endpoint, outcome): requests}, outcome one of ok / empty / throttled / error / timeout / not_found
+    """
+
+    def __init__(self, years=None, games=GAMES, latency='fixed:0', throttle=0.0, error=0.0, timeout=0.0, hang=5.0, empty=0.0, seed=0):
+        self.years = {year % 1000: year for year in (years or season_years())}  # GAME_IDs carry year % 1000
+        self.games = games
+        self.latency = latency_sampler(latency)
+        self.throttle = throttle
+        self.error = error
+        self.timeout = timeout
+        self.hang = hang
+        self.empty = empty
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.seasons = dict()  # year -> (frames, {table: {GAME_ID: row positions}}), built on first request
+        self.counts = dict()
+
+    def season(self, year):
+        with self.lock:
+            if year not in self.seasons:
+                frames = season_frames(year, games=self.games)
+                index = {table: frame.groupby('GAME_ID').indices for table, frame in frames.items() if 'GAME_ID' in frame}
+                self.seasons[year] = (frames, index)
+            return self.seasons[year]
+
+    def count(self, endpoint, outcome):
+        with self.lock:
+            self.counts[(endpoint, outcome)] = self.counts.get((endpoint, outcome), 0) + 1
+
+    def draw(self):
+        """(latency, fault or None) of one request"""
+        with self.lock:
+            latency = self.latency(self.rng)
+            u = self.rng.random()
+        for fault, share in (('throttled', self.throttle), ('error', self.error), ('timeout', self.timeout)):
+            if u < share:
+                return latency, fault
+            u -= share
+        return latency, None
+
+    def is_empty_game(self, gid):
+        return zlib.crc32(gid.encode()) % 10000 < self.empty * 10000
+
+    def respond(self, endpoint, parameters):
+        """(status, body, outcome) for one request, after its latency / fault"""
+        latency, fault = self.draw()
+        time.sleep(latency)
+        if fault == 'timeout':
+            time.sleep(self.hang)
+        elif fault == 'throttled':
+            return 429, 'Too Many Requests', fault
+        elif fault == 'error':
+            return 500, '{"Message":"An error has occurred."}', fault
+
+        if endpoint == 'leaguegamefinder':
+            year = int(parameters.get('Season', '')[:4] or 0)
+            if year not in self.years.values():
+                return 200, result_sets(endpoint, parameters, [('LeagueGameFinderResults', [], '[]')]), 'empty'
+            log = self.season(year)[0]['log_table'].astype({'SEASON_ID': str})
+            return 200, result_sets(endpoint, parameters, [('LeagueGameFinderResults', list(log.columns), rows_json(log))]), fault or 'ok'
+
+        if endpoint in BOX_SCORES:
+            gid = parameters.get('GameID', '')
+            year = self.years.get(int(gid[3:6])) if gid[3:6].isdigit() else None
+            if year is None:
+                return 400, 'GameID is invalid', 'not_found'
+            name, player_set, team_set = BOX_SCORES[endpoint]
+            frames, index = self.season(year)
+            empty = self.is_empty_game(gid)
+            data_sets = []
+            for table, set_name in ((f'players_{name}', player_set), (f'teams_{name}', team_set)):
+                frame = frames[table]
+                rows = '[]' if empty or gid not in index[table] else rows_json(frame.iloc[index[table][gid]])
+                data_sets.append((set_name, list(frame.columns), rows))
+            if name == 'traditional':
+                data_sets.append(('TeamStarterBenchStats', [], '[]'))
+            return 200, result_sets(endpoint, parameters, data_sets), fault or ('empty' if empty else 'ok')
+
+        if endpoint == 'commonplayerinfo':
+            player_id = int(parameters.get('PlayerID', 0) or 0)
+            row = {column: None for column in PLAYER_INFO_COLUMNS}
+            row.update(PERSON_ID=player_id, DISPLAY_FIRST_LAST=f"Player {player_id}", FIRST_NAME='Player', LAST_NAME=str(player_id),
+                       TEAM_ID=1610612700 + player_id // 10000 % 100, ROSTERSTATUS='Active', HEIGHT='6-6', WEIGHT='215')
+            data_sets = [('CommonPlayerInfo', PLAYER_INFO_COLUMNS, json.dumps([list(row.values())])),
+                         ('PlayerHeadlineStats', ['PLAYER_ID', 'PLAYER_NAME', 'TimeFrame', 'PTS', 'AST', 'REB', 'PIE'], '[]'),
+                         ('AvailableSeasons', ['SEASON_ID'], '[]')]
+            return 200, result_sets(endpoint, parameters, data_sets), fault or 'ok'
+
+        return 404, f'no endpoint {endpoint}', 'not_found'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, as the requests session of nba_api expects
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        endpoint = url.path.rstrip('/').rsplit('/', 1)[-1].lower()
+        parameters = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        stats = self.server.stats
+        status, body, outcome = stats.respond(endpoint, parameters)
+        stats.count(endpoint, outcome)
+        payload = body.encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out and went away
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(stats, host='127.0.0.1', port=0):
+    """port 0 picks a free one, server.url is what NBA_STATS_URL takes"""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.stats = stats
+    server.url = f"http://{host}:{server.server_address[1]}/stats"
+    return server
+
+
+def start(stats, host='127.0.0.1', port=0):
+    """the server running in a daemon thread"""
+    server = make_server(stats, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="local fake stats.nba.com for load testing the collectors")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seasons', type=int, default=35, help="synthetic seasons served, the last ones up to 2024-25")
+    parser.add_argument('--games', type=int, default=GAMES, help="games per team and season")
+    parser.add_argument('--latency', default='fixed:0', help="fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA seconds")
+    parser.add_argument('--throttle', type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument('--error', type=float, default=0.0, help="share of requests answered 500")
+    parser.add_argument('--timeout', type=float, default=0.0, help="share of requests that hang for --hang seconds")
+    parser.add_argument('--hang', type=float, default=5.0)
+    parser.add_argument('--empty', type=float, default=0.0, help="share of games with empty box scores")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logger = Logger()
+    stats = FakeStats(season_years(args.seasons), args.games, args.latency, args.throttle, args.error, args.timeout,
+                      args.hang, args.empty, args.seed)
+    server = make_server(stats, args.host, args.port)
+    logger.log_info(f"fake stats api on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for (endpoint, outcome), requests in sorted(stats.counts.items()):
+            print(f"{endpoint:25} {outcome:10} {requests:>8}")
+
+
+if __name__ == "__main__":
+    main()
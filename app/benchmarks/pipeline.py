@@ -0,0 +1,273 @@
+"""
+end to end pipeline benchmark on synthetic raw files (synthetic.write_raw)
+
+every stage runs in its own process against a scratch directory (NBA_DATA_PATH, NBA_DATABASE_PATH, NBA_SQL_PATH and
+NBA_EXTERNAL_MODELS_PATH point into it), the time and peak rss recorded are those of the stage alone. in order:
+    synthetic               raw files of every season but the last
+    make_tables             TableGenerator over them
+    synthetic_last_season   the last season's files
+    update_duckdb           its ingest (nothing is in the manifest after make_tables, every file is checked once),
+                            the box score endpoints and the last season's log rows
+    lines                   process_raw_line: the new lines file, raw.lines_table joined to the log again
+    combined:{table}        CombinedGenerator sql for the table, written to the generated schema
+    seeds                   the sqlmesh seeds
+    model:{name}            every sqlmesh model as CREATE OR REPLACE TABLE in dependency order (restate.build_model)
+    make_datasets:{export}  valid_games, then the csv / parquet / graph exports
+
+a failing stage is recorded with its error and the run goes on. one json line per stage is appended to --output:
+    run, revision, scale, seasons, stage, seconds, peak_rss_mb, rows, error
+--compare prints the stages slower or heavier than in the previous run at the same scale by more than --threshold
+
+    python -m app.benchmarks.pipeline --scale 1 5 20
+    python -m app.benchmarks.pipeline --scale 1 --seasons 5 --compare
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import tempfile
+import time
+
+import duckdb
+
+from .restate import build_model, load_models, load_seeds, ordered
+from .synthetic import season_years, write_raw, SEASONS
+from .window_models import peak_rss_mb
+from ..utils.logger import Logger
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+OUTPUT = os.path.join(BASE_PATH, 'app', 'benchmarks', 'results', 'pipeline.jsonl')
+GENERATED_SCHEMA = 'generated'
+EXPORTS = ('csv', 'parquet', 'graph')
+
+
+def connect():
+    conn = duckdb.connect(os.path.join(os.environ['NBA_DATABASE_PATH'], 'nba.db'))
+    conn.execute("SET enable_progress_bar = false")
+    return conn
+
+
+def stage_synthetic(years):
+    return write_raw(os.environ['NBA_DATA_PATH'], years=years)['players_traditional']
+
+
+def stage_make_tables():
+    from ..scripts.make_tables import main
+    main()
+    conn = connect()
+    rows = conn.execute("SELECT COUNT(*) FROM raw.players_traditional").fetchone()[0]
+    conn.close()
+    return rows
+
+
+def stage_update_duckdb():
+    from ..scripts.update_duckdb import update_duckdb, MANIFEST_TABLE
+    update_duckdb()
+    conn = connect()
+    rows = conn.execute(f"SELECT SUM(rows_inserted) FROM {MANIFEST_TABLE}").fetchone()[0]
+    conn.close()
+    return rows
+
+
+def stage_lines():
+    from ..scripts.process_raw_line import main, LINES_TABLE
+    main()
+    conn = connect()
+    rows = conn.execute(f"SELECT COUNT(*) FROM {LINES_TABLE}").fetchone()[0]
+    conn.close()
+    return rows
+
+
+def stage_combined(table):
+    from ..sql.sql_generator import CombinedGenerator
+    generator = CombinedGenerator(Logger())
+    try:
+        generator.write_sql(GENERATED_SCHEMA, table, generator.generate_sql()[table])
+        return generator.conn.execute(f"SELECT COUNT(*) FROM {GENERATED_SCHEMA}.{table}").fetchone()[0]
+    finally:
+        generator.conn.close()
+
+
+def stage_seeds():
+    models = load_models()
+    conn = connect()
+    load_seeds(conn, models)
+    conn.close()
+    return sum(1 for model in models.values() if model['seed'])
+
+
+def stage_model(name):
+    conn = connect()
+    try:
+        return build_model(conn, name, load_models()[name])
+    finally:
+        conn.close()
+
+
+def stage_make_datasets(export, output_dir):
+    from ..model import make_datasets
+    conn = connect()
+    try:
+        # every synthetic season counts, the real run's season_min would drop the older ones
+        valid_games_cte = make_datasets.make_valid_games(conn, season_exclude='4%', season_min=0, game_count_min=8)
+        if export == 'valid_games':
+            return conn.execute(f"{valid_games_cte} SELECT COUNT(*) FROM valid_games").fetchone()[0]
+        os.makedirs(output_dir, exist_ok=True)
+        if export == 'csv':
+            player_nodes = make_datasets.make_player_nodes(conn, valid_games_cte, output_dir=output_dir)
+            make_datasets.make_team_nodes(conn, valid_games_cte, output_dir=output_dir)
+            make_datasets.make_outcome_nodes(conn, valid_games_cte, output_dir=output_dir)
+            make_datasets.create_edges(conn, valid_games_cte, output_dir=output_dir)
+            return len(player_nodes)
+        if export == 'parquet':
+            return make_datasets.export_parquet(conn, valid_games_cte, output_dir=output_dir)['player_nodes']
+        return len(make_datasets.make_graph(conn, valid_games_cte, output_dir=output_dir)['player_x'])
+    finally:
+        conn.close()
+
+
+STAGES = {
+    'synthetic': stage_synthetic,
+    'make_tables': stage_make_tables,
+    'update_duckdb': stage_update_duckdb,
+    'lines': stage_lines,
+    'combined': stage_combined,
+    'seeds': stage_seeds,
+    'model': stage_model,
+    'make_datasets': stage_make_datasets
+}
+
+
+def run_stage(stage, args):
+    """runs in a child process: (seconds, peak rss, rows, error) of one stage"""
+    start = time.perf_counter()
+    rows, error = None, None
+    try:
+        rows = STAGES[stage](*args)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return time.perf_counter() - start, peak_rss_mb(), rows, error
+
+
+def stages(years, work_dir):
+    """(label, stage, args) in pipeline order"""
+    models = load_models()
+    plan = [
+        ('synthetic', 'synthetic', (years[:-1],)),
+        ('make_tables', 'make_tables', ()),
+        ('synthetic_last_season', 'synthetic', (years[-1:],)),
+        ('update_duckdb', 'update_duckdb', ()),
+        ('lines', 'lines', ()),
+        ('combined:players_combined', 'combined', ('players_combined',)),
+        ('combined:teams_combined', 'combined', ('teams_combined',)),
+        ('seeds', 'seeds', ())
+    ]
+    plan += [(f'model:{name}', 'model', (name,)) for name in ordered(models) if not models[name]['seed']]
+    plan += [(f'make_datasets:{export}', 'make_datasets', (export, os.path.join(work_dir, 'datasets', export)))
+             for export in ('valid_games',) + EXPORTS]
+    return plan
+
+
+def revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_PATH, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale=1, seasons=SEASONS, work_dir=None, logger=None):
+    """[result dict] for every stage of one pipeline run on seasons x scale synthetic seasons"""
+    logger = logger or Logger()
+    years = season_years(seasons, scale)
+    context = multiprocessing.get_context('spawn')
+    run_id, rev = time.strftime('%Y%m%dT%H%M%S'), revision()
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        env = {
+            'NBA_DATA_PATH': os.path.join(tmp, 'raw'),
+            'NBA_DATABASE_PATH': os.path.join(tmp, 'database'),
+            'NBA_SQL_PATH': os.path.join(tmp, 'sql'),
+            'NBA_EXTERNAL_MODELS_PATH': os.path.join(tmp, 'external_models')
+        }
+        saved = {key: os.environ.get(key) for key in env}
+        for path in env.values():
+            os.makedirs(path, exist_ok=True)
+        os.environ.update(env)  # spawned stages import the path modules with these set
+        try:
+            for label, stage, args in stages(years, tmp):
+                with context.Pool(1) as pool:
+                    seconds, peak_mb, rows, error = pool.apply(run_stage, (stage, args))
+                results.append({'run': run_id, 'revision': rev, 'scale': scale, 'seasons': len(years), 'stage': label,
+                                'seconds': round(seconds, 3), 'peak_rss_mb': round(peak_mb, 1), 'rows': rows, 'error': error})
+                if error:
+                    logger.log_warning(f"pipeline benchmark {label} failed: {error}")
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+    return results
+
+
+def read_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(previous, current, threshold=0.2, min_seconds=1.0):
+    """
+    [(scale, stage, metric, before, after)] for stages whose seconds / peak_rss_mb grew by more than threshold,
+    stages under min_seconds are too short for their time to mean anything
+    """
+    last = dict()
+    for result in previous:
+        if not result['error']:
+            last[(result['scale'], result['seasons'], result['stage'])] = result
+    regressions = []
+    for result in current:
+        before = last.get((result['scale'], result['seasons'], result['stage']))
+        if before is None or result['error']:
+            continue
+        for metric in ('seconds', 'peak_rss_mb'):
+            if metric == 'seconds' and max(before[metric], result[metric]) < min_seconds:
+                continue
+            if before[metric] and result[metric] > before[metric] * (1 + threshold):
+                regressions.append((result['scale'], result['stage'], metric, before[metric], result[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time and peak memory of every pipeline stage on synthetic data")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1], help="data scale, seasons x scale seasons")
+    parser.add_argument('--seasons', type=int, default=SEASONS)
+    parser.add_argument('--output', default=OUTPUT, help="results file, one json line per stage, appended to")
+    parser.add_argument('--work-dir', default=None, help="where the scratch directory is made (needs room for the data)")
+    parser.add_argument('--compare', action='store_true', help="report regressions against the previous run in --output")
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    logger = Logger()
+    previous = read_results(args.output)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    for scale in args.scale:
+        results = run(scale, args.seasons, args.work_dir, logger)
+        with open(args.output, 'a') as f:
+            for result in results:
+                f.write(json.dumps(result) + '\n')
+        for result in results:
+            status = result['error'] or ''
+            print(f"{scale:>3}x {result['stage']:40} {result['seconds']:9.2f}s {result['peak_rss_mb']:9.1f}MB {str(result['rows']):>10} {status}")
+        logger.log_info(f"pipeline benchmark at {scale}x: {sum(r['seconds'] for r in results):.1f}s, results in {args.output}")
+
+        if args.compare:
+            for _, stage, metric, before, after in compare(previous, results, args.threshold):
+                print(f"REGRESSION {scale}x {stage} {metric}: {before} -> {after}")
+
+
+if __name__ == "__main__":
+    main()
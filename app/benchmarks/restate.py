@@ -0,0 +1,198 @@
+"""
+time a full restate of the sqlmesh models
+
+    python -m app.benchmarks.restate --synthetic                 raw tables generated from the external model yaml
+    python -m app.benchmarks.restate --db app/database/nba.db    on a copy of a real database
+    python -m app.benchmarks.restate --sqlmesh                   `sqlmesh plan --restate-model` on the project database
+
+without --sqlmesh every model's query (MODEL block dropped, incremental filters off as in incremental_check) runs as
+CREATE OR REPLACE TABLE in dependency order: the work a restate of every model does, minus sqlmesh's bookkeeping.
+--models points at another copy of the models directory (e.g. an older checkout) to compare two versions
+"""
+import argparse
+import glob
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+import yaml
+
+from ..scripts.process_raw_line import build_lines_table, create_source_table, typed_lines, LINES_TABLE, SOURCE_TABLE
+from ..sql.incremental_check import full_query, MODELS_PATH
+from ..utils.logger import Logger
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app', 'database'))
+SQLMESH_PATH = os.path.join(BASE_PATH, 'app', 'sql', 'sqlmesh')
+
+MODEL_NAME = re.compile(r'MODEL\s*\(\s*name\s+([\w.]+)', re.IGNORECASE)
+SEED_PATH = re.compile(r"kind\s+SEED\s*\(\s*path\s+'\$root/([^']+)'", re.IGNORECASE)
+TABLE_REFERENCE = re.compile(r'\b((?:raw|base|aggs|fantasy)\.\w+)', re.IGNORECASE)
+
+
+def load_models(models_path=MODELS_PATH):
+    """{model name: {'file', 'seed', 'deps'}} for every .sql model under models_path"""
+    models = dict()
+    for path in sorted(glob.glob(os.path.join(models_path, '**', '*.sql'), recursive=True)):
+        with open(path) as f:
+            sql = f.read()
+        name = MODEL_NAME.search(sql)
+        if not name:
+            continue
+        seed = SEED_PATH.search(sql)
+        models[name.group(1).lower()] = {
+            'file': os.path.relpath(path, models_path),
+            'seed': seed.group(1) if seed else None,
+            'deps': {ref.lower() for ref in TABLE_REFERENCE.findall(sql[sql.index(');'):])}
+        }
+    return models
+
+
+def ordered(models):
+    """model names, every model after the models it reads"""
+    done, order = set(), []
+
+    def visit(name):
+        if name in done:
+            return
+        done.add(name)
+        for dep in sorted(models[name]['deps']):
+            if dep in models and dep != name:
+                visit(dep)
+        order.append(name)
+
+    for name in sorted(models):
+        visit(name)
+    return order
+
+
+def external_tables(models_path=MODELS_PATH):
+    """{'raw.table': {column: type}} from the external model yaml files"""
+    tables = dict()
+    for path in sorted(glob.glob(os.path.join(models_path, 'external_models', '*.yaml'))):
+        with open(path) as f:
+            for entry in yaml.safe_load(f):
+                tables[entry['name'].replace('"', '').lower()] = entry['columns']
+    return tables
+
+
+def synthetic_raw(conn, models_path=MODELS_PATH, seasons=3, teams=30, players=13, games=82, seed=0):
+    """
+    raw.* tables with the columns and types of the external model yaml, the rows synthetic.season_frames writes as
+    files (the last `seasons` seasons), GAME_ID and GAME_DATE cast to whatever type the yaml declares so older and
+    newer layouts can be compared
+    """
+    from .synthetic import season_frames, season_years
+
+    conn.execute("CREATE SCHEMA IF NOT EXISTS raw")
+    tables = external_tables(models_path)
+    for table, columns in tables.items():
+        column_sql = ', '.join(f'"{c}" {t}' for c, t in columns.items())
+        conn.execute(f"CREATE OR REPLACE TABLE {table} ({column_sql})")
+
+    # a yaml with the typed lines columns: the lines go in as process_raw_line puts them, joined to the log at the end
+    typed = 'GAME_ID' in tables.get(LINES_TABLE, {})
+    if typed:
+        conn.execute(f"DROP TABLE IF EXISTS {SOURCE_TABLE}")
+        create_source_table(conn)
+
+    created = {table: 0 for table in tables}
+    for year in season_years(seasons):
+        frames = season_frames(year, seed, models_path, teams, players, games)
+        for table, columns in tables.items():
+            frame = frames[table.split('.')[1]]
+            if typed and table == LINES_TABLE:
+                conn.execute(f"INSERT INTO {SOURCE_TABLE} BY NAME {typed_lines('frame', file=repr(f'lines{year}.csv'))}")
+                continue
+            select_sql = ', '.join(f'CAST("{c}" AS {t})' for c, t in columns.items())
+            conn.execute(f"INSERT INTO {table} SELECT {select_sql} FROM frame")
+            created[table] += len(frame)
+    if typed:
+        created[LINES_TABLE] = build_lines_table(conn)
+    return created
+
+
+def load_seeds(conn, models):
+    for name, model in models.items():
+        if model['seed']:
+            conn.execute(f"CREATE SCHEMA IF NOT EXISTS {name.split('.')[0]}")
+            conn.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM read_csv('{os.path.join(SQLMESH_PATH, model['seed'])}')")
+
+
+def build_model(conn, name, model, models_path=MODELS_PATH):
+    """CREATE OR REPLACE TABLE name AS the model's full query, returns its rows"""
+    conn.execute(f"CREATE SCHEMA IF NOT EXISTS {name.split('.')[0]}")
+    conn.execute(f"CREATE OR REPLACE TABLE {name} AS {full_query(model['file'], models_path)}")
+    return conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+
+
+def restate(conn, models, models_path=MODELS_PATH):
+    """[(model, seconds, rows)] building every model in dependency order"""
+    timings = []
+    for name in ordered(models):
+        if models[name]['seed']:
+            continue
+        start = time.perf_counter()
+        rows = build_model(conn, name, models[name], models_path)
+        timings.append((name, time.perf_counter() - start, rows))
+    return timings
+
+
+def sqlmesh_restate(models):
+    """wall time of `sqlmesh plan --restate-model ... --auto-apply` over every model, on the project's configured database"""
+    command = ['sqlmesh', 'plan', '--auto-apply', '--no-prompts']
+    for name in ordered(models):
+        if not models[name]['seed']:
+            command += ['--restate-model', name]
+    start = time.perf_counter()
+    subprocess.run(command, cwd=SQLMESH_PATH, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time a full restate of the sqlmesh models")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--db', default=os.path.join(DATABASE_PATH, 'nba.db'), help="database with the raw tables, copied first")
+    source.add_argument('--synthetic', action='store_true', help="generate the raw tables instead of reading --db")
+    source.add_argument('--sqlmesh', action='store_true', help="run sqlmesh plan --restate-model on the project instead")
+    parser.add_argument('--models', default=MODELS_PATH, help="models directory to time")
+    parser.add_argument('--seasons', type=int, default=3, help="synthetic seasons")
+    args = parser.parse_args()
+
+    logger = Logger()
+    models = load_models(args.models)
+    if args.sqlmesh:
+        seconds = sqlmesh_restate(models)
+        logger.log_info(f"sqlmesh restate of {len(models)} models: {seconds:.1f}s")
+        print(f"sqlmesh plan restate: {seconds:.1f}s")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, 'restate.db')
+        if not args.synthetic:
+            shutil.copy(args.db, database_path)
+        conn = duckdb.connect(database_path)
+        conn.execute("SET enable_progress_bar = false")
+        if args.synthetic:
+            rows = synthetic_raw(conn, args.models, seasons=args.seasons)
+            print(f"synthetic raw tables: {rows['raw.log_table']} log rows, {rows['raw.players_traditional']} player rows per endpoint")
+        load_seeds(conn, models)
+        timings = restate(conn, models, args.models)
+        conn.close()
+
+    for name, seconds, rows in timings:
+        print(f"{name:35} {seconds:8.2f}s {rows:>10} rows")
+    total = sum(seconds for _, seconds, _ in timings)
+    print(f"{'total':35} {total:8.2f}s")
+    logger.log_info(f"restate of {len(timings)} models from {args.models}: {total:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
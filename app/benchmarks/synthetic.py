@@ -0,0 +1,220 @@
+"""
+deterministic raw files shaped like the collected ones, so the pipeline runs without stats.nba.com or a local nba.db
+
+layout (make_tables / update_duckdb read it as DATA_PATH, see NBA_DATA_PATH):
+    {teams,players}/{endpoint}/{endpoint}{season}.csv    every endpoint's columns from the external model yaml
+    log/log{season}.csv                                  one row per team and game
+    lines/lines{year}.csv                                sportsdatabase.com columns: date, team, site, o:team, line, total
+
+a season is 30 teams x 82 games (1230 games), 13 players per team and game of which the last 2 did not play (stats
+NULL, a COMMENT), GAME_ID the zero padded string and GAME_DATE YYYY-MM-DD text as the api returns them.
+every season draws from its own random stream, so any subset of seasons is the same data as in a full run.
+scale multiplies the number of seasons (35 x scale, counting back from 2024-25), the shape of a season stays real
+
+    python -m app.benchmarks.synthetic --out /tmp/nba_raw --seasons 35 --scale 1
+"""
+import argparse
+import os
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from .restate import external_tables, SQLMESH_PATH
+from ..scripts.process_raw_line import LINES_COLUMNS
+from ..sql.incremental_check import MODELS_PATH
+from ..utils.logger import Logger
+
+
+ENDPOINTS = ['advanced', 'fourfactors', 'misc', 'scoring', 'traditional']
+LAST_YEAR = 2024
+SEASONS = 35
+TEAMS = 30
+PLAYERS = 13
+GAMES = 82
+STARTERS = ['F', 'F', 'C', 'G', 'G']
+
+
+def season_name(year):
+    return f"{year}-{(year + 1) % 100:02d}"
+
+
+def season_years(seasons=SEASONS, scale=1, last_year=LAST_YEAR):
+    return list(range(last_year - seasons * scale + 1, last_year + 1))
+
+
+def league(teams=TEAMS):
+    """log / lines team names from the line_team_mapping seed, abbreviations and cities derived from them"""
+    mapping = pd.read_csv(os.path.join(SQLMESH_PATH, 'seeds', 'line_team_mapping.csv')).head(teams)
+    names = mapping.log_table_team_name.to_numpy()
+    return {
+        'TEAM_ID': 1610612700 + np.arange(teams),
+        'TEAM_NAME': names,
+        'TEAM_CITY': np.array([name.rsplit(' ', 1)[0] for name in names]),
+        'TEAM_ABBREVIATION': np.array([f"{name.split()[-1][:2].upper()}{i}" for i, name in enumerate(names)]),
+        'line_team': mapping.raw_data_team_name.to_numpy()
+    }
+
+
+def schedule(year, rng, teams=TEAMS, games=GAMES):
+    """(home, away, date) per game: every round each team plays once, 1-3 days after its previous game"""
+    day = np.full(teams, np.datetime64(f'{year}-10-20'))
+    home, away, dates = [], [], []
+    for _ in range(games):
+        order = rng.permutation(teams)
+        h, a = order[0::2], order[1::2]
+        date = np.maximum(day[h], day[a]) + rng.integers(1, 4, len(h)).astype('timedelta64[D]')
+        day[h] = day[a] = date
+        home.append(h)
+        away.append(a)
+        dates.append(date)
+    return np.concatenate(home), np.concatenate(away), np.concatenate(dates)
+
+
+def fill(frame, columns, rng, played=None):
+    """
+    frame with exactly the yaml columns in order, columns not set yet are random: BIGINT counts, DOUBLE rates for
+    *_PCT / *_RATE / *RATIO columns and stats otherwise, TEXT NULL. played: rows whose DOUBLE stats are NULL when False
+    """
+    rows = len(frame)
+    for column, column_type in columns.items():
+        if column in frame:
+            continue
+        if column_type == 'BIGINT':
+            frame[column] = rng.integers(0, 15, rows)
+        elif column_type == 'DOUBLE':
+            if column.endswith(('PCT', 'RATE', 'RATIO', 'PIE')):
+                values = rng.uniform(0, 1, rows).round(3)
+            else:
+                values = rng.normal(10, 5, rows).round(1)
+            frame[column] = values if played is None else np.where(played, values, np.nan)
+        else:
+            frame[column] = None
+    return frame[list(columns)]
+
+
+def season_frames(year, seed=0, models_path=MODELS_PATH, teams=TEAMS, players=PLAYERS, games=GAMES):
+    """{raw table name: DataFrame} for one season, the file form of every column (see the module docstring)"""
+    rng = np.random.default_rng([seed, year])
+    tables = {table.split('.')[1]: columns for table, columns in external_tables(models_path).items()}
+    names = league(teams)
+    home, away, dates = schedule(year, rng, teams, games)
+    n_games = len(home)
+    game_ids = np.array([f"002{year % 1000:03d}{n:04d}" for n in range(1, n_games + 1)])
+    points = rng.integers(90, 130, (2, n_games))
+
+    # team rows: home then away of every game
+    team = np.concatenate([home, away])
+    opponent = np.concatenate([away, home])
+    pts = np.concatenate([points[0], points[1]])
+    opp_pts = np.concatenate([points[1], points[0]])
+    is_home = np.arange(2 * n_games) < n_games
+    game_id = np.concatenate([game_ids, game_ids])
+    game_date = pd.to_datetime(np.concatenate([dates, dates])).strftime('%Y-%m-%d')
+    keys = pd.DataFrame({
+        'GAME_ID': game_id,
+        'TEAM_ID': names['TEAM_ID'][team],
+        'TEAM_ABBREVIATION': names['TEAM_ABBREVIATION'][team],
+        'TEAM_NAME': names['TEAM_NAME'][team],
+        'TEAM_CITY': names['TEAM_CITY'][team]
+    })
+    order = np.lexsort((is_home, game_id))  # files list a game's two rows together
+
+    frames = dict()
+    log = keys.drop(columns='TEAM_CITY').assign(
+        SEASON_ID=int(f'2{year}'),
+        GAME_DATE=game_date,
+        MATCHUP=np.where(is_home, names['TEAM_ABBREVIATION'][team] + ' vs. ' + names['TEAM_ABBREVIATION'][opponent],
+                         names['TEAM_ABBREVIATION'][team] + ' @ ' + names['TEAM_ABBREVIATION'][opponent]),
+        WL=np.where(pts > opp_pts, 'W', 'L'),
+        MIN=240,
+        PTS=pts,
+        PLUS_MINUS=(pts - opp_pts).astype(float)
+    )
+    frames['log_table'] = fill(log.iloc[order].reset_index(drop=True), tables['log_table'], rng)
+
+    box = keys.assign(MIN='240:00', PTS=pts, PLUS_MINUS=(pts - opp_pts).astype(float)).iloc[order].reset_index(drop=True)
+    # player rows: the team rows repeated per roster slot, the roster turns over by two players a season
+    slot = np.tile(np.arange(players), len(box))
+    player_keys = box[['GAME_ID', 'TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_CITY']].loc[box.index.repeat(players)].reset_index(drop=True)
+    team_index = player_keys.TEAM_ID.to_numpy() - 1610612700
+    player_id = 1000000 + team_index * 10000 + (year % 1000) * 2 + slot
+    played = slot < players - 2
+    minutes = rng.integers(4, 40, len(slot))
+    players_frame = player_keys.assign(
+        PLAYER_ID=player_id,
+        PLAYER_NAME=[f"Player {p}" for p in player_id],
+        NICKNAME=[f"P{p % 10000}" for p in player_id],
+        START_POSITION=np.array(STARTERS + [None] * (players - len(STARTERS)), dtype=object)[slot],
+        COMMENT=np.where(played, None, "DNP - Coach's Decision"),
+        MIN=np.where(played, [f"{m}:{s:02d}" for m, s in zip(minutes, rng.integers(0, 60, len(slot)))], None)
+    )
+    for endpoint in ENDPOINTS:
+        frames[f'teams_{endpoint}'] = fill(box.copy(), tables[f'teams_{endpoint}'], rng)
+        frames[f'players_{endpoint}'] = fill(players_frame.copy(), tables[f'players_{endpoint}'], rng, played)
+
+    line = rng.integers(-12, 13, n_games).astype(float)
+    total = rng.integers(200, 241, n_games).astype(float)
+    frames['lines_table'] = pd.DataFrame({
+        'date': np.concatenate([dates, dates]).astype('datetime64[D]').astype(str),
+        'team': names['line_team'][team],
+        'site': np.where(is_home, 'home', 'away'),
+        'o:team': names['line_team'][opponent],
+        'line': np.concatenate([line, -line]),
+        'total': np.concatenate([total, total])
+    }).assign(date=lambda f: f.date.str.replace('-', '').astype(int))[LINES_COLUMNS]
+    return frames
+
+
+def write_season(data_path, year, frames, conn=None):
+    """the season's files under data_path, returns {raw table name: rows}"""
+    season = season_name(year)
+    own = conn is None
+    conn = conn or duckdb.connect()
+    paths = {'log_table': os.path.join(data_path, 'log', f'log{season}.csv'),
+             'lines_table': os.path.join(data_path, 'lines', f'lines{year}.csv')}
+    for endpoint in ENDPOINTS:
+        for table_class in ('teams', 'players'):
+            paths[f'{table_class}_{endpoint}'] = os.path.join(data_path, table_class, endpoint, f'{endpoint}{season}.csv')
+    written = dict()
+    for table, path in paths.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame = frames[table]
+        conn.execute(f"COPY frame TO '{path}' (HEADER, DELIMITER ',')")
+        written[table] = len(frame)
+    if own:
+        conn.close()
+    return written
+
+
+def write_raw(data_path, seasons=SEASONS, scale=1, seed=0, years=None, models_path=MODELS_PATH):
+    """
+    every season's raw files under data_path, years: only these seasons (start years) of the seasons x scale range
+    returns {raw table name: rows written}
+    """
+    conn = duckdb.connect()
+    conn.execute("SET enable_progress_bar = false")
+    totals = dict()
+    for year in (years if years is not None else season_years(seasons, scale)):
+        for table, rows in write_season(data_path, year, season_frames(year, seed, models_path), conn).items():
+            totals[table] = totals.get(table, 0) + rows
+    conn.close()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="write deterministic synthetic raw files in the collected layout")
+    parser.add_argument('--out', required=True, help="raw data directory (what NBA_DATA_PATH points at)")
+    parser.add_argument('--seasons', type=int, default=SEASONS)
+    parser.add_argument('--scale', type=int, default=1, help="seasons x scale seasons")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logger = Logger()
+    totals = write_raw(args.out, args.seasons, args.scale, args.seed)
+    logger.log_info(f"synthetic raw files in {args.out}: {args.seasons * args.scale} seasons, "
+                    f"{totals['log_table']} log rows, {totals['players_traditional']} player rows per endpoint")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+build time and peak memory of the aggs window models
+
+synthetic base.players_processed / base.teams_processed tables are written to a scratch database, then every
+query is built in its own process (CREATE TABLE ... AS) so the peak rss reported is that of the query alone.
+expanded: the old hand written form, the window spelled out in every OVER (...)
+named: the generated form, every aggregate OVER one named WINDOW
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from ..sql.sql_generator import SQLMeshModelGenerator, WINDOW_MODELS
+from ..utils.logger import Logger
+
+
+def make_source(database_path, table, spec, keys, groups, seasons=5, games=82, seed=0):
+    """one row per (key, season, game) with random metric values, ~10% DNP rows"""
+    rng = np.random.default_rng(seed)
+    rows = groups * seasons * games
+    frame = pd.DataFrame({
+        keys[0]: np.repeat(np.arange(groups), seasons * games),
+        'SEASON_ID': np.tile(np.repeat(np.arange(22020, 22020 + seasons), games), groups),
+        'GAME_DATE': np.tile(pd.date_range('2020-10-20', periods=games, freq='2D').strftime('%Y-%m-%d').tolist() * seasons, groups),
+    })
+    frame['GAME_ID'] = np.arange(rows).astype(str)
+    for column in spec['columns']:
+        if column not in frame:
+            frame[column] = 1
+    if 'PLAYED_FLAG' in frame:
+        frame['PLAYED_FLAG'] = (rng.random(rows) > 0.1).astype(int)
+    for metric in spec['metrics']:
+        frame[metric] = rng.normal(10, 5, rows)
+
+    conn = duckdb.connect(database_path)
+    schema = table.split('.')[0]
+    conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+    conn.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM frame")
+    conn.close()
+    return rows
+
+
+def peak_rss_mb():
+    # VmHWM belongs to this process image, ru_maxrss also carries the parent's peak across the spawn exec
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build(database_path, query, result):
+    """runs in a child process: time the query and report the process peak rss"""
+    conn = duckdb.connect(database_path, config={'enable_progress_bar': False})
+    start = time.perf_counter()
+    conn.execute(f"CREATE OR REPLACE TABLE {result} AS {query}")
+    seconds = time.perf_counter() - start
+    conn.close()
+    return seconds, peak_rss_mb()
+
+
+def run(groups=400, seasons=5):
+    generator = SQLMeshModelGenerator(Logger())
+    context = multiprocessing.get_context('spawn')
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, 'bench.db')
+        sources = dict()
+        for spec in WINDOW_MODELS:
+            if spec['source'] not in sources:
+                keys = [k for k in spec['partition'] if k != 'SEASON_ID']
+                sources[spec['source']] = make_source(database_path, spec['source'], spec, keys, groups if keys == ['PLAYER_ID'] else 30, seasons)
+
+        for spec in WINDOW_MODELS:
+            for form, named in (('expanded', False), ('named', True)):
+                if spec['variant'] == 'ewma' and not named:
+                    continue  # new model, no hand written version to compare with
+                query = generator.window_query(spec, source_filter='TRUE', named_window=named)
+                result = f"{spec['name'].replace('.', '_')}_{form}"
+                with context.Pool(1) as pool:
+                    seconds, peak_mb = pool.apply(build, (database_path, query, result))
+                results.append({'model': spec['name'], 'form': form, 'rows': sources[spec['source']], 'seconds': seconds, 'peak_rss_mb': peak_mb})
+
+            if spec['variant'] != 'ewma':
+                conn = duckdb.connect(database_path)
+                expanded, named = (f"{spec['name'].replace('.', '_')}_{form}" for form in ('expanded', 'named'))
+                diff = conn.execute(f"SELECT COUNT(*) FROM (SELECT * FROM {expanded} EXCEPT ALL SELECT * FROM {named})").fetchone()[0]
+                conn.close()
+                results[-1]['rows_differing'] = diff
+
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="aggs window models, hand expanded OVER (...) vs one named WINDOW")
+    parser.add_argument('--players', type=int, default=400)
+    parser.add_argument('--seasons', type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.players, args.seasons)
+    print(results.to_string(index=False, float_format='%.2f'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+flush latency of DataWriter.write_data as a season file grows
+
+each batch is a 100 game flush (2 team rows, ~26 player rows per game) written to a scratch directory.
+the key index keeps flush time flat, the old re-read + apply(tuple) dedupe is timed next to it for comparison
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from ..scripts.get_data import DataWriter
+from ..utils.logger import Logger
+
+
+PLAYERS_PER_TEAM = 13
+
+
+def make_batch(first_game, games=100, seed=0):
+    """synthetic traditional box score frames for games first_game .. first_game + games"""
+    rng = np.random.default_rng(seed + first_game)
+    game_ids = [f'{22400000 + g:010d}' for g in range(first_game, first_game + games)]
+    tstats = pd.DataFrame({
+        'GAME_ID': np.repeat(game_ids, 2),
+        'TEAM_ID': np.tile([1610612737, 1610612738], games),
+        'PTS': rng.integers(80, 140, 2 * games)
+    })
+    pstats = pd.DataFrame({
+        'GAME_ID': np.repeat(game_ids, 2 * PLAYERS_PER_TEAM),
+        'TEAM_ID': np.tile(np.repeat([1610612737, 1610612738], PLAYERS_PER_TEAM), games),
+        'PLAYER_ID': np.tile(np.arange(2 * PLAYERS_PER_TEAM) + 201900, games),
+        'PTS': rng.integers(0, 40, 2 * PLAYERS_PER_TEAM * games)
+    })
+    return tstats, pstats
+
+
+def legacy_filter(stats, file_path, keys):
+    """what write_data did before the key index: re-read the file and compare row tuples"""
+    if not os.path.exists(file_path):
+        return stats
+    current = pd.read_csv(file_path, usecols=keys, dtype={k: str if k == 'GAME_ID' else int for k in keys})
+    return stats[~stats[keys].apply(tuple, 1).isin(current[keys].apply(tuple, 1))]
+
+
+def legacy_write(data_path, season, endpoint_name, tstats, pstats):
+    for table_class, stats, keys in (('teams', tstats, ['GAME_ID', 'TEAM_ID']), ('players', pstats, ['GAME_ID', 'TEAM_ID', 'PLAYER_ID'])):
+        file_path = os.path.join(data_path, table_class, endpoint_name, f'{endpoint_name}{season}.csv')
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        header = not os.path.exists(file_path)
+        legacy_filter(stats, file_path, keys).to_csv(file_path, mode='a', header=header, index=False)
+
+
+def run(batches=30, games=100):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = Logger(log_file=os.path.join(tmp, 'log.log'), sql_log_file=os.path.join(tmp, 'sql.log'))
+        writer = DataWriter('2024-25', logger, data_path=os.path.join(tmp, 'indexed'))
+        legacy_path = os.path.join(tmp, 'legacy')
+
+        for batch in range(batches):
+            tstats, pstats = make_batch(batch * games, games)
+
+            start = time.perf_counter()
+            writer.write_data('traditional', tstats, pstats)
+            indexed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            legacy_write(legacy_path, '2024-25', 'traditional', tstats, pstats)
+            legacy = time.perf_counter() - start
+
+            results.append({'batch': batch, 'games_in_file': (batch + 1) * games, 'indexed_ms': indexed * 1000, 'legacy_ms': legacy * 1000})
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataWriter flush latency as a season file grows")
+    parser.add_argument('--batches', type=int, default=30)
+    parser.add_argument('--games', type=int, default=100, help="games per flush")
+    args = parser.parse_args()
+
+    results = run(args.batches, args.games)
+    print(results.to_string(index=False, float_format='%.1f'))
+    first, last = results.iloc[:3], results.iloc[-3:]
+    print(f"\nindexed: {first.indexed_ms.mean():.1f}ms -> {last.indexed_ms.mean():.1f}ms, legacy: {first.legacy_ms.mean():.1f}ms -> {last.legacy_ms.mean():.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,30 @@
+import argparse
 import pandas as pd
+import numpy as np
+import pyarrow.parquet as pq
 import duckdb
 import os
 
+from ..utils.logger import Logger
+from ..utils.metrics import StageMetrics
+
 BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-DATABASE = os.path.join(BASE_PATH,'app','database','nba.db')
+DATABASE = os.path.join(os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app', 'database')), 'nba.db')
+OUTPUT_PATH = os.path.join(BASE_PATH, 'app', 'model', 'data')
+FORMATS = ('csv', 'parquet', 'graph', 'pt')
 COLUMNS = ['EFG_PCT','FTA_RATE','TM_TOV_PCT','OREB_PCT','OPP_EFG_PCT','OPP_FTA_RATE','OPP_TOV_PCT','OPP_OREB_PCT']
+TEAM_FEATURES = ['IS_HOME','DAYS_SINCE_LAST_GAME','IS_BACK_TO_BACK','IS_3_IN_4','IS_4_IN_6','WINS_SO_FAR','LOSSES_SO_FAR',
+                 'LAST_10_WIN_PCT','WINS_VS_OPPONENT','LOSSES_VS_OPPONENT','IS_LAST_TEAM_GAME']
+# graph export: node index order, index row i of every array is node i, SEASON_ID first so a season is one index range
+GRAPH_NODES = {
+    'player': 'SEASON_ID, NEXT_GAME_ID, PLAYER_ID',
+    'team': 'SEASON_ID, NEXT_GAME_ID, TEAM_ID',
+    'outcome': 'SEASON_ID, GAME_ID'
+}
+# rows per arrow record batch when results are streamed (parquet / graph exports)
+BATCH_ROWS = 100_000
+# valid games per parameter set, written once and read by every node / edge query
+VALID_GAMES_TABLE = 'datasets.valid_games'
 
 def make_valid_games_cte(season_exclude='4%', season_min=21996, game_count_min=1):
     """
@@ -28,9 +48,54 @@ valid_games AS (
 )
     """
 
-def make_player_nodes(conn, valid_games_cte, cols=COLUMNS, output_dir=None):
+def make_valid_games(conn, season_exclude='4%', season_min=21996, game_count_min=1):
+    """
+    Materializes make_valid_games_cte once per parameter set into VALID_GAMES_TABLE and returns a CTE reading it.
+    The cached games are rebuilt when base.teams_processed changed (row count and a hash of the columns the CTE reads)
+    since they were written.
+    """
+    conn.execute("CREATE SCHEMA IF NOT EXISTS datasets")
+    conn.execute(f"""
+CREATE TABLE IF NOT EXISTS {VALID_GAMES_TABLE} (
+    SEASON_EXCLUDE VARCHAR,
+    SEASON_MIN BIGINT,
+    GAME_COUNT_MIN BIGINT,
+    SOURCE_VERSION VARCHAR,
+    GAME_ID BIGINT
+)
+    """)
+    params = f"SEASON_EXCLUDE = '{season_exclude}' AND SEASON_MIN = {int(season_min)} AND GAME_COUNT_MIN = {int(game_count_min)}"
+    version = conn.execute("""
+SELECT COUNT(*) || '_' || COALESCE(SUM(hash(GAME_ID, TEAM_ID, GAME_NUMBER, SEASON_ID))::VARCHAR, '')
+FROM base.teams_processed
+    """).fetchone()[0]
+    cached = conn.execute(f"SELECT DISTINCT SOURCE_VERSION FROM {VALID_GAMES_TABLE} WHERE {params}").fetchall()
+    if cached != [(version,)]:
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            conn.execute(f"DELETE FROM {VALID_GAMES_TABLE} WHERE {params}")
+            # the self join finds every game twice (g, h and h, g), keep each once
+            conn.execute(f"""
+INSERT INTO {VALID_GAMES_TABLE}
+{make_valid_games_cte(season_exclude, season_min, game_count_min)}
+SELECT DISTINCT '{season_exclude}', {int(season_min)}, {int(game_count_min)}, '{version}', GAME_ID
+FROM valid_games
+            """)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return f"""
+WITH valid_games AS (
+    SELECT GAME_ID
+    FROM {VALID_GAMES_TABLE}
+    WHERE {params}
+)
+    """
+
+def player_nodes_sql(valid_games_cte, cols=COLUMNS):
     col_select = ",\n\t".join([f"t1.AVG_{c}" for c in cols])
-    query = f"""
+    return f"""
 {valid_games_cte}
 SELECT
     t1.NEXT_GAME_ID::VARCHAR || '_' || t1.PLAYER_ID::VARCHAR AS node_id,
@@ -48,13 +113,22 @@ JOIN valid_games vg
   ON t1.NEXT_GAME_ID = vg.GAME_ID
 WHERE t1.NEXT_GAME_ID IS NOT NULL
     """
-    df = conn.execute(query).df()
+
+def profile(metrics, conn, label, rows):
+    """metrics: StageMetrics with profiling enabled on conn, the query just run and the rows it exported"""
+    if metrics:
+        metrics.profile(conn, label, scanned=True)
+        metrics.add(rows_out=rows)
+
+def make_player_nodes(conn, valid_games_cte, cols=COLUMNS, output_dir=None, metrics=None):
+    df = conn.execute(player_nodes_sql(valid_games_cte, cols)).df()
+    profile(metrics, conn, 'player_nodes', len(df))
     if output_dir:
         df.to_csv(os.path.join(output_dir, 'player_nodes.csv'), index=False)
     return df
 
-def make_team_nodes(conn, valid_games_cte, output_dir=None):
-    query = f"""
+def team_nodes_sql(valid_games_cte):
+    return f"""
 {valid_games_cte}
 SELECT DISTINCT
     t.NEXT_GAME_ID::VARCHAR || '_' || t.TEAM_ID::VARCHAR AS node_id,
@@ -77,31 +151,38 @@ FROM base.teams_processed t
 JOIN valid_games vg
   ON t.NEXT_GAME_ID = vg.GAME_ID
     """
-    df = conn.execute(query).df()
+
+def make_team_nodes(conn, valid_games_cte, output_dir=None, metrics=None):
+    df = conn.execute(team_nodes_sql(valid_games_cte)).df()
+    profile(metrics, conn, 'team_nodes', len(df))
     if output_dir:
         df.to_csv(os.path.join(output_dir, 'team_nodes.csv'), index=False)
     return df
 
-def make_outcome_nodes(conn, valid_games_cte, output_dir=None):
-    query = f"""
+def outcome_nodes_sql(valid_games_cte):
+    """one row per game, result: 1 when the home team won"""
+    return f"""
 {valid_games_cte}
 SELECT
-    o.GAME_ID::VARCHAR AS node_id,
+    o.GAME_ID,
+    o.SEASON_ID,
     CASE WHEN o.WL = 'W' then 1 else 0 end AS result
 FROM base.teams_processed o
 JOIN valid_games vg
   ON o.GAME_ID = vg.GAME_ID
 WHERE o.IS_HOME = TRUE
-GROUP BY o.GAME_ID, o.WL
+GROUP BY o.GAME_ID, o.SEASON_ID, o.WL
     """
-    df = conn.execute(query).df()
+
+def make_outcome_nodes(conn, valid_games_cte, output_dir=None, metrics=None):
+    df = conn.execute(f"SELECT GAME_ID::VARCHAR AS node_id, result FROM ({outcome_nodes_sql(valid_games_cte)})").df()
+    profile(metrics, conn, 'outcome_nodes', len(df))
     if output_dir:
         df.to_csv(os.path.join(output_dir, 'outcome_nodes.csv'), index=False)
     return df
 
-def create_edges(conn, valid_games_cte, output_dir=None):
-    # Player -> Team
-    player_team_query = f"""
+def player_team_edges_sql(valid_games_cte):
+    return f"""
 {valid_games_cte}
 SELECT
     p.NEXT_GAME_ID::VARCHAR || '_' || p.PLAYER_ID::VARCHAR AS source_node_id,
@@ -114,12 +195,9 @@ JOIN base.teams_processed t
 JOIN valid_games vg
   ON p.NEXT_GAME_ID = vg.GAME_ID
     """
-    df_pt = conn.execute(player_team_query).df()
-    if output_dir:
-        df_pt.to_csv(os.path.join(output_dir, 'player_team_edges.csv'), index=False)
 
-    # Team -> Outcome
-    team_outcome_query = f"""
+def team_outcome_edges_sql(valid_games_cte):
+    return f"""
 {valid_games_cte}
 SELECT
     t.NEXT_GAME_ID::VARCHAR || '_' || t.TEAM_ID::VARCHAR AS source_node_id,
@@ -132,23 +210,246 @@ JOIN base.teams_processed o
 JOIN valid_games vg
   ON t.NEXT_GAME_ID = vg.GAME_ID
     """
-    df_to = conn.execute(team_outcome_query).df()
+
+def create_edges(conn, valid_games_cte, output_dir=None, metrics=None):
+    # Player -> Team
+    df_pt = conn.execute(player_team_edges_sql(valid_games_cte)).df()
+    profile(metrics, conn, 'player_team_edges', len(df_pt))
+    if output_dir:
+        df_pt.to_csv(os.path.join(output_dir, 'player_team_edges.csv'), index=False)
+
+    # Team -> Outcome
+    df_to = conn.execute(team_outcome_edges_sql(valid_games_cte)).df()
+    profile(metrics, conn, 'team_outcome_edges', len(df_to))
     if output_dir:
         df_to.to_csv(os.path.join(output_dir, 'team_outcome_edges.csv'), index=False)
 
     return df_pt, df_to
 
-# Example main
-def main():
+def iter_batches(conn, sql, batch_rows=BATCH_ROWS):
+    """pyarrow RecordBatches of at most batch_rows rows, the result is never held whole"""
+    yield from conn.execute(sql).fetch_record_batch(batch_rows)
+
+def write_parquet(conn, sql, path, batch_rows=BATCH_ROWS, metrics=None):
+    """streams sql's result into a parquet file batch by batch, returns the row count"""
+    rows = 0
+    reader = conn.execute(sql).fetch_record_batch(batch_rows)
+    with pq.ParquetWriter(path, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    profile(metrics, conn, os.path.basename(path), rows)
+    return rows
+
+def export_parquet(conn, valid_games_cte, cols=COLUMNS, output_dir=None, batch_rows=BATCH_ROWS, metrics=None):
+    """the csv export's five tables as parquet files with the same columns, streamed, returns {file: rows}"""
+    queries = {
+        'player_nodes': player_nodes_sql(valid_games_cte, cols),
+        'team_nodes': team_nodes_sql(valid_games_cte),
+        'outcome_nodes': f"SELECT GAME_ID::VARCHAR AS node_id, result FROM ({outcome_nodes_sql(valid_games_cte)})",
+        'player_team_edges': player_team_edges_sql(valid_games_cte),
+        'team_outcome_edges': team_outcome_edges_sql(valid_games_cte)
+    }
+    return {name: write_parquet(conn, sql, os.path.join(output_dir, f'{name}.parquet'), batch_rows, metrics) for name, sql in queries.items()}
+
+def graph_tables(conn, valid_games_cte, cols=COLUMNS):
+    """
+    temp tables graph_{player,team,outcome}: the node rows with their int32 index (GRAPH_NODES order),
+    graph_{plays_for,team_result}: the edges between them, SEASON_ID of the source node, source and target indices
+    """
+    sources = {
+        'player': player_nodes_sql(valid_games_cte, cols),
+        'team': team_nodes_sql(valid_games_cte),
+        'outcome': outcome_nodes_sql(valid_games_cte)
+    }
+    for node, sql in sources.items():
+        # the string node_id is never built, the index replaces it
+        columns = "* EXCLUDE (node_id)" if node != 'outcome' else "*"
+        conn.execute(f"""
+CREATE OR REPLACE TEMP TABLE graph_{node} AS
+SELECT (ROW_NUMBER() OVER (ORDER BY {GRAPH_NODES[node]}) - 1)::INTEGER AS idx, {columns}
+FROM ({sql})
+        """)
+    conn.execute("""
+CREATE OR REPLACE TEMP TABLE graph_plays_for AS
+SELECT p.SEASON_ID, p.idx AS source, t.idx AS target
+FROM graph_player p
+JOIN graph_team t
+  ON p.NEXT_GAME_ID = t.NEXT_GAME_ID
+ AND p.TEAM_ID = t.TEAM_ID
+    """)
+    conn.execute("""
+CREATE OR REPLACE TEMP TABLE graph_team_result AS
+SELECT t.SEASON_ID, t.idx AS source, o.idx AS target
+FROM graph_team t
+JOIN graph_outcome o
+  ON t.NEXT_GAME_ID = o.GAME_ID
+    """)
+
+def graph_arrays_sql(cols=COLUMNS, season=None, offsets=None):
+    """
+    {array name: (sql, table, dtype, kind)} over the graph_* tables, kind: matrix (rows, columns), vector or edges (2, rows)
+    table: the graph_* table (and season filter) sql reads every row of, its COUNT(*) is the array's length
+    season: only that season's nodes and edges, indices counted from offsets[node] (its first node)
+    """
+    offsets = offsets or {'player': 0, 'team': 0, 'outcome': 0}
+    where = f"WHERE SEASON_ID = {int(season)}" if season is not None else ""
+    features = lambda columns: ', '.join(f'{c}::FLOAT AS {c}' for c in columns)
+    return {
+        'player_x': (f"SELECT {features([f'AVG_{c}' for c in cols])} FROM graph_player {where} ORDER BY idx", f"graph_player {where}", np.float32, 'matrix'),
+        'player_played': (f"SELECT COALESCE(PLAYED_FLAG, 0)::INTEGER FROM graph_player {where} ORDER BY idx", f"graph_player {where}", np.int32, 'vector'),
+        'team_x': (f"SELECT {features(TEAM_FEATURES)} FROM graph_team {where} ORDER BY idx", f"graph_team {where}", np.float32, 'matrix'),
+        'outcome_y': (f"SELECT result::INTEGER FROM graph_outcome {where} ORDER BY idx", f"graph_outcome {where}", np.int32, 'vector'),
+        'plays_for': (f"""
+SELECT source - {offsets['player']} AS source, target - {offsets['team']} AS target
+FROM graph_plays_for {where}
+ORDER BY source, target
+        """, f"graph_plays_for {where}", np.int32, 'edges'),
+        'team_result': (f"""
+SELECT source - {offsets['team']} AS source, target - {offsets['outcome']} AS target
+FROM graph_team_result {where}
+ORDER BY source, target
+        """, f"graph_team_result {where}", np.int32, 'edges')
+    }
+
+def fetch_array(conn, sql, table, dtype, kind, path=None, batch_rows=BATCH_ROWS, metrics=None, label=None):
+    """
+    sql's result as one numpy array filled batch by batch, path: a .npy file written through a memory map
+    instead of an array in memory, so peak memory is a batch whatever the number of rows.
+    table: the materialized table sql reads every row of, sized with its COUNT(*) so sql itself only runs once
+    """
+    rows = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    reader = conn.execute(sql).fetch_record_batch(batch_rows)
+    width = len(reader.schema)
+    shape = {'matrix': (rows, width), 'vector': (rows,), 'edges': (2, rows)}[kind]
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape) if path else np.empty(shape, dtype=dtype)
+    start = 0
+    for batch in reader:
+        # nulls become NaN in the float columns, the int columns are COALESCEd in the query
+        block = np.column_stack([column.to_numpy(zero_copy_only=False) for column in batch.columns]).astype(dtype, copy=False)
+        end = start + batch.num_rows
+        if kind == 'matrix':
+            out[start:end] = block
+        elif kind == 'vector':
+            out[start:end] = block[:, 0]
+        else:
+            out[:, start:end] = block.T
+        start = end
+    if path:
+        out.flush()
+    profile(metrics, conn, label or kind, rows)
+    return out
+
+def make_graph(conn, valid_games_cte, cols=COLUMNS, output_dir=None, batch_rows=BATCH_ROWS, metrics=None):
+    """
+    The csv export's nodes and edges as arrays ready to load, no string node ids:
+        {player,team}_x float32 feature matrices, player_played int32, outcome_y int32 (1: home team won)
+        plays_for / team_result int32 COO edge index, shape (2, edges), rows are node indices
+        {player,team}_features column names of the feature matrices
+    Node indices are contiguous int32 in GRAPH_NODES order, every season is one index range. Edges only connect
+    exported nodes. output_dir: every array is streamed into output_dir/graph/{name}.npy (read back memory mapped
+    with load_graph), the id <-> index maps are written as {player,team,outcome}_index.parquet next to it.
+    """
+    graph_tables(conn, valid_games_cte, cols)
+    graph_dir = os.path.join(output_dir, 'graph') if output_dir else None
+    if graph_dir:
+        os.makedirs(graph_dir, exist_ok=True)
+
+    graph = dict()
+    for name, (sql, table, dtype, kind) in graph_arrays_sql(cols).items():
+        graph[name] = fetch_array(conn, sql, table, dtype, kind, os.path.join(graph_dir, f'{name}.npy') if graph_dir else None, batch_rows, metrics, name)
+    graph['player_features'] = np.array([f"AVG_{c}" for c in cols])
+    graph['team_features'] = np.array(TEAM_FEATURES)
+
+    if graph_dir:
+        for name in ('player_features', 'team_features'):
+            np.save(os.path.join(graph_dir, f'{name}.npy'), graph[name])
+        index_columns = {
+            'player': ['idx', 'NEXT_GAME_ID', 'PLAYER_ID', 'TEAM_ID', 'SEASON_ID'],
+            'team': ['idx', 'NEXT_GAME_ID', 'TEAM_ID', 'SEASON_ID', 'TEAM_CITY'],
+            'outcome': ['idx', 'GAME_ID', 'SEASON_ID']
+        }
+        for node, columns in index_columns.items():
+            select = ', '.join(f'{c} AS {c}' for c in columns)  # the aggs models name some columns in lower case
+            conn.execute(f"COPY (SELECT {select} FROM graph_{node} ORDER BY idx) TO '{os.path.join(output_dir, f'{node}_index.parquet')}' (FORMAT PARQUET)")
+    return graph
+
+def season_graphs(conn, valid_games_cte, cols=COLUMNS, batch_rows=BATCH_ROWS):
+    """
+    yields (SEASON_ID, graph) one season at a time for training loops, graph as make_graph's with the node
+    indices counted from the season's first node, only one season's arrays are in memory at once
+    """
+    graph_tables(conn, valid_games_cte, cols)
+    seasons = conn.execute("""
+SELECT p.SEASON_ID, MIN(p.idx), (SELECT MIN(idx) FROM graph_team t WHERE t.SEASON_ID = p.SEASON_ID),
+       (SELECT MIN(idx) FROM graph_outcome o WHERE o.SEASON_ID = p.SEASON_ID)
+FROM graph_player p
+GROUP BY p.SEASON_ID
+ORDER BY p.SEASON_ID
+    """).fetchall()
+    for season, player, team, outcome in seasons:
+        offsets = {'player': player, 'team': team or 0, 'outcome': outcome or 0}
+        graph = {name: fetch_array(conn, sql, table, dtype, kind, batch_rows=batch_rows)
+                 for name, (sql, table, dtype, kind) in graph_arrays_sql(cols, season, offsets).items()}
+        graph['player_features'] = np.array([f"AVG_{c}" for c in cols])
+        graph['team_features'] = np.array(TEAM_FEATURES)
+        yield season, graph
+
+def load_graph(path):
+    """graph directory written by make_graph as {name: array}, the arrays memory mapped read only"""
+    return {os.path.splitext(name)[0]: np.load(os.path.join(path, name), mmap_mode='r')
+            for name in sorted(os.listdir(path)) if name.endswith('.npy')}
+
+def to_hetero_data(graph):
+    """torch_geometric HeteroData from make_graph / load_graph / season_graphs arrays"""
+    import torch
+    from torch_geometric.data import HeteroData
+
+    data = HeteroData()
+    data['player'].x = torch.tensor(graph['player_x'])
+    data['player'].played = torch.tensor(graph['player_played'])
+    data['team'].x = torch.tensor(graph['team_x'])
+    data['outcome'].y = torch.tensor(graph['outcome_y']).long()
+    data['outcome'].num_nodes = len(graph['outcome_y'])
+    data['player', 'plays_for', 'team'].edge_index = torch.tensor(graph['plays_for']).long()
+    data['team', 'team_result', 'outcome'].edge_index = torch.tensor(graph['team_result']).long()
+    return data
+
+def export_datasets(format='csv', batch_rows=BATCH_ROWS, memory_limit=None, output_dir=OUTPUT_PATH):
+    """the datasets of one FORMATS entry from nba.db into output_dir (main, the pipeline's datasets stage)"""
+    logger = Logger()
+    os.makedirs(output_dir, exist_ok=True)
     conn = duckdb.connect(DATABASE)
-    output_dir = os.path.join(BASE_PATH, 'app','model','data')
+    if memory_limit:
+        conn.execute(f"SET memory_limit = '{memory_limit}'")
+
+    with StageMetrics(f'make_datasets:{format}', logger) as metrics:
+        metrics.enable_profiling(conn)
+        valid_games_cte = make_valid_games(conn, season_exclude='4%', season_min=21996, game_count_min=8)
 
-    valid_games_cte = make_valid_games_cte(season_exclude='4%', season_min=21996, game_count_min=8)
+        if format == 'parquet':
+            export_parquet(conn, valid_games_cte, output_dir=output_dir, batch_rows=batch_rows, metrics=metrics)
+        elif format in ('graph', 'pt'):
+            graph = make_graph(conn, valid_games_cte, output_dir=output_dir, batch_rows=batch_rows, metrics=metrics)
+            if format == 'pt':
+                import torch
+                torch.save(to_hetero_data(graph), os.path.join(output_dir, 'graph.pt'))
+        else:
+            make_player_nodes(conn, valid_games_cte, output_dir=output_dir, metrics=metrics)
+            make_team_nodes(conn, valid_games_cte, output_dir=output_dir, metrics=metrics)
+            make_outcome_nodes(conn, valid_games_cte, output_dir=output_dir, metrics=metrics)
+            create_edges(conn, valid_games_cte, output_dir=output_dir, metrics=metrics)
+    conn.close()
 
-    player_nodes = make_player_nodes(conn, valid_games_cte, output_dir=output_dir)
-    team_nodes = make_team_nodes(conn, valid_games_cte, output_dir=output_dir)
-    outcome_nodes = make_outcome_nodes(conn, valid_games_cte, output_dir=output_dir)
-    create_edges(conn, valid_games_cte, output_dir=output_dir)
+def main():
+    parser = argparse.ArgumentParser(description="node / edge datasets for the graph model")
+    parser.add_argument('--format', choices=FORMATS, default='csv',
+                        help="csv: node and edge csv files, parquet: the same tables streamed to parquet, "
+                             "graph: graph/*.npy + index parquet files, pt: graph and graph.pt (HeteroData)")
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS, help="rows per streamed record batch")
+    parser.add_argument('--memory-limit', default=None, help="duckdb memory_limit (e.g. 1GB), the streamed exports stay under it")
+    args = parser.parse_args()
+    export_datasets(args.format, args.batch_rows, args.memory_limit)
 
 if __name__ == "__main__":
     main()
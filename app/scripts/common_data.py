@@ -1,33 +1,37 @@
 import os
-import glob
+import argparse
 import duckdb
 import pandas as pd
 from nba_api.stats.endpoints import commonplayerinfo
 from ..utils.logger import Logger  # Adjust relative import as needed
+from .raw_store import raw_source, RAW_FORMAT, RAW_FORMATS
+from ..utils.response_cache import ResponseCache, CACHE_MODES, DEFAULT_CACHE_MODE, PLAYER_INFO_TTL, fetch
+from ..utils.stats_api import STATS_TIMEOUT
+from ..utils.metrics import StageMetrics
 
 BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-DATA_PATH = os.path.join(BASE_PATH, 'app', 'data', 'raw')
-DATABASE_PATH = os.path.join(BASE_PATH, 'app', 'database')
+DATA_PATH = os.environ.get('NBA_DATA_PATH', os.path.join(BASE_PATH, 'app', 'data', 'raw'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app', 'database'))
 
 class CommonPlayerInfoCollector:
-    def __init__(self, logger):
+    def __init__(self, logger, cache=None, raw_format=RAW_FORMAT):
         self.logger = logger
+        self.cache = cache
+        self.raw_format = raw_format
         self.output_path = os.path.join(DATA_PATH, 'players', 'common')
         os.makedirs(self.output_path, exist_ok=True)
         self.output_file = os.path.join(self.output_path, 'common_player_info.csv')
 
     def get_all_player_ids(self):
-        traditional_path = os.path.join(DATA_PATH, 'players', 'traditional')
-        csv_files = glob.glob(f'{traditional_path}/*.csv')
+        source = raw_source('players', 'traditional', self.raw_format)
 
-        if not csv_files:
-            self.logger.log_error("No traditional player CSV files found.")
+        if source is None:
+            self.logger.log_error(f"No traditional player {self.raw_format} files found.")
             return pd.DataFrame()
 
-        file_paths_str = ', '.join([f"'{f}'" for f in csv_files])
         query = f"""
             SELECT DISTINCT player_id 
-            FROM read_csv_auto([{file_paths_str}], union_by_name=true, files_to_sniff=-1, nullstr='')
+            FROM {source}
             WHERE PLAYER_NAME is not NULL;
         """
         df = duckdb.sql(query).df()
@@ -50,7 +54,7 @@ class CommonPlayerInfoCollector:
 
     def fetch_player_info(self, player_id):
         try:
-            response = commonplayerinfo.CommonPlayerInfo(player_id=player_id)
+            response = fetch(commonplayerinfo.CommonPlayerInfo(player_id=player_id, get_request=False, timeout=STATS_TIMEOUT), self.cache, PLAYER_INFO_TTL)
             df = response.get_data_frames()[0]
             return df
         except Exception as e:
@@ -78,10 +82,17 @@ class CommonPlayerInfoCollector:
     #     except Exception as e:
     #         self.logger.log_error(f"Failed to insert into DuckDB: {e}")
 
-def main():
+def main(cache_mode=DEFAULT_CACHE_MODE, raw_format=RAW_FORMAT):
     logger = Logger()
-    collector = CommonPlayerInfoCollector(logger)
+    cache = ResponseCache(mode=cache_mode)
+    collector = CommonPlayerInfoCollector(logger, cache=cache, raw_format=raw_format)
 
+    with StageMetrics('common_data', logger) as metrics:
+        collect(collector, logger, metrics)
+        metrics.add(http_calls=cache.requests, cache_hits=cache.hits)
+
+def collect(collector, logger, metrics):
+    """commonplayerinfo of every player in the traditional box scores that common_player_info.csv does not have yet"""
     all_ids_df = collector.get_all_player_ids()
     if all_ids_df.empty:
         logger.log_warning("No player IDs found. Exiting.")
@@ -90,6 +101,7 @@ def main():
     all_ids = set(all_ids_df['PLAYER_ID'])
     existing_ids = collector.get_existing_player_ids()
     missing_ids = all_ids - existing_ids
+    metrics.add(rows_in=len(all_ids))
 
     logger.log_info(f"{len(missing_ids)} new players to update.")
 
@@ -106,9 +118,14 @@ def main():
     if all_new_data:
         result_df = pd.concat(all_new_data, ignore_index=True)
         collector.append_to_csv(result_df)
+        metrics.add(rows_out=len(result_df))
         # collector.write_to_duckdb(result_df)
     else:
         logger.log_warning("No new player info was fetched.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="collect commonplayerinfo for every player in the traditional box scores")
+    parser.add_argument('--cache-mode', choices=CACHE_MODES, default=DEFAULT_CACHE_MODE, help="on-disk response cache, replay never touches the network")
+    parser.add_argument('--raw-format', choices=RAW_FORMATS, default=RAW_FORMAT, help="read the player ids from the season csv files or the parquet store")
+    args = parser.parse_args()
+    main(cache_mode=args.cache_mode, raw_format=args.raw_format)
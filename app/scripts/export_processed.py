@@ -0,0 +1,78 @@
+"""
+season partitioned parquet copies of the processed layer, for readers outside the database
+
+layout: app/data/processed_parquet/{table}/SEASON_ID={season}/data.parquet
+    every file is written in the models' cluster order (SEASON_ID, key, GAME_DATE) so the row group statistics
+    on the key and GAME_DATE stay tight, the SEASON_ID directory level lets readers skip whole seasons
+
+    read_parquet('app/data/processed_parquet/players_processed/*/*.parquet', hive_partitioning = true)
+
+    python -m app.scripts.export_processed
+    python -m app.scripts.export_processed --table players_processed --season 22024
+"""
+import argparse
+import os
+import shutil
+
+import duckdb
+
+from ..utils.logger import Logger
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app', 'database'))
+EXPORT_PATH = os.path.join(BASE_PATH, 'app', 'data', 'processed_parquet')
+
+# the ORDER BY of the base.*_processed models
+CLUSTER_KEYS = {
+    'players_processed': ('SEASON_ID', 'PLAYER_ID', 'GAME_DATE'),
+    'teams_processed': ('SEASON_ID', 'TEAM_ID', 'GAME_DATE')
+}
+
+
+def season_dir(table, season, export_path=EXPORT_PATH):
+    return os.path.join(export_path, table, f'SEASON_ID={season}')
+
+
+def export_table(conn, table, seasons=None, export_path=EXPORT_PATH):
+    """
+    writes base.table one season directory at a time, seasons: only these (re-exported in place), None for all
+    returns {season: rows}
+    """
+    if seasons is None:
+        seasons = [row[0] for row in conn.execute(f"SELECT DISTINCT SEASON_ID FROM base.{table} ORDER BY 1").fetchall()]
+    order = ', '.join(CLUSTER_KEYS[table])
+    written = dict()
+    for season in seasons:
+        target = season_dir(table, season, export_path)
+        tmp_target = target + '.tmp'
+        shutil.rmtree(tmp_target, ignore_errors=True)
+        os.makedirs(tmp_target)
+        # SEASON_ID lives in the directory name, hive_partitioning adds it back on read
+        conn.execute(f"""
+            COPY (SELECT * EXCLUDE (SEASON_ID) FROM base.{table} WHERE SEASON_ID = {int(season)} ORDER BY {order})
+            TO '{os.path.join(tmp_target, 'data.parquet')}' (FORMAT PARQUET, COMPRESSION ZSTD)
+        """)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp_target, target)
+        written[season] = conn.execute(f"SELECT COUNT(*) FROM read_parquet('{os.path.join(target, 'data.parquet')}')").fetchone()[0]
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="export the processed tables as season partitioned parquet")
+    parser.add_argument('--db', default=os.path.join(DATABASE_PATH, 'nba.db'))
+    parser.add_argument('--table', nargs='+', choices=list(CLUSTER_KEYS), default=list(CLUSTER_KEYS))
+    parser.add_argument('--season', nargs='+', type=int, default=None, help="only re-export these SEASON_IDs")
+    args = parser.parse_args()
+
+    logger = Logger()
+    conn = duckdb.connect(args.db, read_only=True)
+    for table in args.table:
+        written = export_table(conn, table, args.season)
+        logger.log_info(f"exported base.{table}: {len(written)} seasons, {sum(written.values())} rows to {os.path.join(EXPORT_PATH, table)}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import nba_api.stats.endpoints as ep
 import pandas as pd
-import duckdb
 import random
 import time
 import logging
@@ -9,15 +8,25 @@ import os
 import requests
 from requests.exceptions import Timeout
 from urllib3.exceptions import ReadTimeoutError
-from multiprocessing import Pool
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import multiprocessing
+import argparse
 import sys
 from ..utils.logger import Logger
+from ..utils.rate_limiter import TokenBucket
+from ..utils.duckdb_manager import ConnectionManager
+from .raw_store import ParquetStore, RAW_FORMAT, RAW_FORMATS
+from .update_duckdb import update_duckdb
+from .journal import CollectionJournal, SKIP_STATUSES
+from ..utils.response_cache import ResponseCache, CacheMiss, CACHE_MODES, DEFAULT_CACHE_MODE, CURRENT_SEASON_TTL, EMPTY_RESPONSE_TTL, fetch
+from ..utils.stats_api import STATS_TIMEOUT, STATS_RATE
+from ..utils.metrics import StageMetrics
 
 
 BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 # Your data path inside the 'collection' directory
-DATA_PATH = os.path.join(BASE_PATH,  'app','data', 'raw')
-DATABASE_PATH = os.path.join(BASE_PATH, 'app','database')
+DATA_PATH = os.environ.get('NBA_DATA_PATH', os.path.join(BASE_PATH,  'app','data', 'raw'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app','database'))
 
 
 
@@ -31,14 +40,46 @@ SEASONS = [
             '2020-21','2021-22','2022-23','2023-24','2024-25'
         ]
 ENDPOINTS = ['advanced','fourfactors','misc','scoring','traditional']
+# in DataFetcher.FD but only collected when asked for (--extra-endpoints)
+EXTRA_ENDPOINTS = ['summary','matchups']
 
+# boxscorematchupsv3 is a V3 endpoint with camelCase headers, renamed to match the V2 files
+MATCHUP_COLUMNS = {
+    'gameId': 'GAME_ID',
+    'teamId': 'TEAM_ID',
+    'teamCity': 'TEAM_CITY',
+    'teamName': 'TEAM_NAME',
+    'teamTricode': 'TEAM_ABBREVIATION',
+    'personIdOff': 'PLAYER_ID',
+    'personIdDef': 'DEF_PLAYER_ID'
+}
+
+# columns that identify a row when appending to a season file
+WRITE_KEYS = {
+    'teams': ['GAME_ID', 'TEAM_ID'],
+    'players': ['GAME_ID', 'TEAM_ID', 'PLAYER_ID']
+}
+ENDPOINT_WRITE_KEYS = {
+    'matchups': {'players': ['GAME_ID', 'TEAM_ID', 'PLAYER_ID', 'DEF_PLAYER_ID']}
+}
+
+# responses that mean stats.nba.com is throttling us, retried with backoff instead of skipped
+THROTTLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class ThrottledError(Exception):
+    pass
 
 
 class DataFetcher:
-    def __init__(self, season, logger, max_retries=3):
+    def __init__(self, season, logger, max_retries=3, limiter=None, stat_endpoints=None, cache=None, timeout=STATS_TIMEOUT, metrics=None):
         self.season = season
         self.max_retries = max_retries
-        self.FD = {
+        self.timeout = timeout  # seconds per request (NBA_STATS_TIMEOUT)
+        self.limiter = limiter  # shared TokenBucket when collecting concurrently
+        self.cache = cache  # ResponseCache, None always hits the network
+        self.metrics = metrics  # StageMetrics of the collection: rows / bytes received and retries
+        self.FD = stat_endpoints or {
             'advanced': ep.boxscoreadvancedv2.BoxScoreAdvancedV2,
             'fourfactors': ep.boxscorefourfactorsv2.BoxScoreFourFactorsV2,
             'misc': ep.boxscoremiscv2.BoxScoreMiscV2,
@@ -49,13 +90,18 @@ class DataFetcher:
         }
         self.gidset = set()  # will be set later
         self.logger=logger
+        self.failures = dict()  # (endpoint, gid) -> (journal status, reason) of the last failure, 'retry' when it is transient
         self.log = self.fetch_log()
         
 
     def fetch_log(self):
         try:
         # fetch games for a specific season (reason to separate 002 and 004 is becuase there are other games (non nba games) included in the GameFinder ep)
-            result = ep.leaguegamefinder.LeagueGameFinder(season_nullable=self.season)
+            if self.limiter:
+                self.limiter.acquire()
+            # the season still being played gets new games every day, finished seasons never change
+            ttl = CURRENT_SEASON_TTL if self.season == SEASONS[-1] else None
+            result = fetch(ep.leaguegamefinder.LeagueGameFinder(season_nullable=self.season, get_request=False, timeout=self.timeout), self.cache, ttl)
             all_games = result.get_data_frames()[0]
             rs = all_games[all_games.SEASON_ID == '2' + self.season[:4]]
             rs = rs[rs.GAME_ID.str[:3] == '002']  # regular season
@@ -83,10 +129,12 @@ class DataFetcher:
 
         while retries < self.max_retries:
             try:
+                if self.limiter:
+                    self.limiter.acquire()
                 # Attempt to fetch the game data
-                game = statfunc(game_id=gid).get_data_frames()
-                players = game[0]
-                teams = game[1]
+                players, teams = self.request_frames(endpoint_name, statfunc, gid)
+                if self.limiter:
+                    self.limiter.recover()
 
                 # If we successfully fetched the data, write it to CSV
                 if writer:
@@ -94,113 +142,213 @@ class DataFetcher:
 
                 return players, teams
 
-            except (TimeoutError, Timeout, ReadTimeoutError) as e:
+            except (TimeoutError, Timeout, ReadTimeoutError, ThrottledError) as e:
                 retries += 1
+                if self.metrics:
+                    self.metrics.add(retries=1)
                 delay = random.uniform(1, 3) * (2 ** retries)  # Exponential backoff
                 error_message = f"Timeout error for {gid} (Attempt {retries}/{self.max_retries}). Retrying in {delay:.2f}s..."
                 # print(error_message)
                 # self.logger.log_warning(error_message)  # Log warning with retry info
-                time.sleep(delay)
+                if self.limiter:
+                    self.limiter.backoff()  # lower the shared rate, every worker pauses briefly
+                time.sleep(delay)  # only this worker waits out the retry delay
+
+            except CacheMiss as e:
+                # replay mode, the response may be cached by a later run
+                self.logger.log_warning(f"{gid} not in the cache: {e}. Skipping this game.")
+                self.failures[(endpoint_name, gid)] = ('retry', f"{type(e).__name__}: {e}")
+                return None, None
 
             except Exception as e:
                 # Any other errors are treated as permanent failure for this game
                 error_message = f"Error fetching game data for {gid}: {e}. Skipping this game."
                 # print(error_message)
                 self.logger.log_error(error_message)  # Log the error
+                self.failures[(endpoint_name, gid)] = ('failed', f"{type(e).__name__}: {e}")
                 return None, None  # Skip the game on failure
 
         # If retries exceeded, skip the game and log the failure
         error_message = f"Failed to fetch game data for {gid} after {self.max_retries} attempts. Skipping this game."
         # print(error_message)
         self.logger.log_error(error_message)  # Log the final failure
+        self.failures[(endpoint_name, gid)] = ('retry', f"retries exhausted after {self.max_retries} attempts")
         return None, None  # Skip this game if max retries exhausted
 
+    def request_frames(self, endpoint_name, statfunc, gid):
+        """
+        run the nba_api request, raising ThrottledError when the response status says we are being rate limited
+        (nba_api does not raise on a 429, it fails later while parsing the body)
+        returns (players, teams)
+        """
+        result = statfunc(game_id=gid, get_request=False, timeout=self.timeout)
+        try:
+            fetch(result, self.cache)  # box scores of finished games never change
+        except Exception:
+            response = getattr(result, 'nba_response', None)
+            status_code = getattr(response, '_status_code', None)
+            if status_code in THROTTLE_STATUS_CODES:
+                raise ThrottledError(f"status {status_code}")
+            raise
+        players, teams = self.select_frames(endpoint_name, result, gid)
+        if self.metrics:
+            self.metrics.add(rows_in=len(players) + len(teams), bytes_read=len(result.nba_response.get_response()))
+        return players, teams
+
+    @staticmethod
+    def select_frames(endpoint_name, result, gid):
+        """pick the (players, teams) frames out of an endpoint result"""
+        if endpoint_name == 'summary':
+            # line score is one row per team, inactive players has no GAME_ID column of its own
+            players = result.inactive_players.get_data_frame()
+            players.insert(0, 'GAME_ID', gid)
+            return players, result.line_score.get_data_frame()
+        if endpoint_name == 'matchups':
+            players = result.player_stats.get_data_frame().rename(columns=MATCHUP_COLUMNS)
+            teams = players[['GAME_ID', 'TEAM_ID', 'TEAM_CITY', 'TEAM_NAME', 'TEAM_ABBREVIATION']].drop_duplicates()
+            return players, teams
+        game = result.get_data_frames()
+        return game[0], game[1]
+
+    @staticmethod
+    def is_empty(endpoint_name, pstats, tstats):
+        """a game with no inactive players still has a summary"""
+        if endpoint_name == 'summary':
+            return tstats.empty
+        return pstats.empty or tstats.empty
+
 
 class DataWriter:
-    def __init__(self, season, logger):
+    def __init__(self, season, logger, data_path=DATA_PATH, raw_format=RAW_FORMAT, store=None, connection=None, metrics=None):
         self.season = season
-        self.data_path = 'app/data/raw'
+        self.data_path = data_path
         self.logger=logger
+        self.raw_format = raw_format  # 'csv' season files or the 'parquet' store
+        self.store = store or (ParquetStore(logger=logger) if raw_format == 'parquet' else None)
+        self.key_index = dict()  # season file path -> set of key tuples already written to it
+        self.connection = connection  # shared ConnectionManager for the run, opened on first insert when None
+        self.owns_connection = False
+        self.metrics = metrics  # StageMetrics of the collection, rows_out: rows appended to the raw files
 
     def write_to_duckdb(self,endpoint_name,tstats,pstats):
         self.logger.log_info(f"attempting to insert {len(tstats) / 2} games into duckdb")
         try:
-            ###
-            conn = duckdb.connect(f'{DATABASE_PATH}/nba.db')
-
-            team_table_exist = conn.sql(f"SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = 'raw' and TABLE_NAME = 'teams_{endpoint_name}'").fetchall()
-            player_table_exist = conn.sql(f"SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = 'raw' and TABLE_NAME = 'players_{endpoint_name}'").fetchall()
-
-
-
-            if team_table_exist[0][0]:
-                insert_statement = f"""INSERT INTO raw.teams_{endpoint_name} SELECT * FROM tstats"""
-                conn.execute(insert_statement)
-                self.logger.log_sql(insert_statement)
-            else:
-                self.logger.log_warning(f"duckdb insert: no table found for: raw.teams_{endpoint_name}")
-            if player_table_exist[0][0]:
-                insert_statement = f"""INSERT INTO raw.players_{endpoint_name} SELECT * FROM pstats"""
-                conn.execute(insert_statement)
-                self.logger.log_sql(insert_statement)
-            else:
-                self.logger.log_warning(f"duckdb insert: no table found for raw.players_{endpoint_name}")
-
-            conn.close()
+            if self.connection is None:
+                self.connection = ConnectionManager(f'{DATABASE_PATH}/nba.db', self.logger)
+                self.owns_connection = True
+            inserted = self.connection.insert([(f'teams_{endpoint_name}', tstats), (f'players_{endpoint_name}', pstats)])
+            for table_name, rows in inserted.items():
+                self.logger.log_info(f"duckdb insert: {rows} rows into raw.{table_name}")
         except Exception as e:
             self.logger.log_error(f"Attemping to insert into duckdb for {endpoint_name}, {e}")
-            conn.close()
+
+    def close(self):
+        """close the duckdb connection if this writer opened it, a shared one is closed by whoever made it"""
+        if self.owns_connection and self.connection is not None:
+            self.connection.close()
+            self.connection = None
 
     def write_data(self, endpoint_name, tstats, pstats, duckdb=False):
         try:
-            # Check if files already exist, and if they do, append the data
-            team_file = f'{BASE_PATH}/{self.data_path}/teams/{endpoint_name}/{endpoint_name}{self.season}.csv'
-            player_file = f'{BASE_PATH}/{self.data_path}/players/{endpoint_name}/{endpoint_name}{self.season}.csv'
-            ## ensure location exists
-            os.makedirs(os.path.dirname(team_file), exist_ok=True)
-            os.makedirs(os.path.dirname(player_file), exist_ok=True)
-
             self.logger.log_info(f"attempting to write {len(tstats) / 2} games")
 
-            # Append team if files exist, otherwise create new
-            mode = 'a' if os.path.exists(team_file) else 'w'
-            header = not os.path.exists(team_file)
-            if mode == 'w':
-                filtered_tstats = tstats
-            else:
-                current_tstats = pd.read_csv(team_file, usecols=['GAME_ID','TEAM_ID'], dtype={'GAME_ID': str,'TEAM_ID':int})
-                filtered_tstats = tstats[~tstats[['GAME_ID', 'TEAM_ID']].apply(tuple, 1).isin(current_tstats[['GAME_ID', 'TEAM_ID']].apply(tuple, 1))]
-            filtered_tstats.to_csv(team_file, mode=mode, header=header, index=False)
-
-            # Append player if files exist, otherwise create new
-            mode = 'a' if os.path.exists(player_file) else 'w'
-            header = not os.path.exists(player_file)
-            if mode == 'w':
-                filtered_pstats = pstats
-            else:
-                current_pstats = pd.read_csv(player_file, usecols=['GAME_ID','TEAM_ID','PLAYER_ID'], dtype={'GAME_ID': str,'TEAM_ID':int,'PLAYER_ID':int})
-                filtered_pstats = pstats[~pstats[['GAME_ID', 'TEAM_ID','PLAYER_ID']].apply(tuple, 1).isin(current_pstats[['GAME_ID', 'TEAM_ID','PLAYER_ID']].apply(tuple, 1))]
-            filtered_pstats.to_csv(player_file, mode=mode, header=header, index=False)
-            
+            filtered_tstats = self.append(endpoint_name, 'teams', tstats)
+            filtered_pstats = self.append(endpoint_name, 'players', pstats)
+            if self.metrics:
+                self.metrics.add(rows_out=len(filtered_tstats) + len(filtered_pstats))
+
             self.logger.log_info(f"Data written for {endpoint_name} - {self.season}")
 
             if duckdb:
-                ### maybe input filtered stats?
                 try:
-                    self.write_to_duckdb(endpoint_name,tstats,pstats)
+                    self.write_to_duckdb(endpoint_name,filtered_tstats,filtered_pstats)
                 except Exception as e:
                     self.logger.log_error(f"problem with  write_to_duckdb{endpoint_name} - {self.season}, ERROR: {e}")
 
+            return True
 
         except Exception as e:
             self.logger.log_error(f"UNABLE TO WRITE DATA FOR {endpoint_name} - {self.season}, ERROR: {e}")
+            return False
+
+    def season_path(self, endpoint_name, table_class):
+        """season csv file, or the season directory of the parquet store"""
+        if self.raw_format == 'parquet':
+            return self.store.season_dir(table_class, endpoint_name, self.season)
+        return os.path.join(BASE_PATH, self.data_path, table_class, endpoint_name, f'{endpoint_name}{self.season}.csv')
+
+    def append(self, endpoint_name, table_class, stats):
+        """append the rows not already stored for the season, returns them"""
+        keys = self.key_columns(endpoint_name, table_class)
+        path = self.season_path(endpoint_name, table_class)
+        filtered = self.filter_new_rows(stats, path, keys, endpoint_name, table_class)
+
+        if self.raw_format == 'parquet':
+            self.store.write(table_class, endpoint_name, self.season, stats=filtered)  # one small part file per batch
+        else:
+            ## ensure location exists
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Append if file exists, otherwise create new
+            header = not os.path.exists(path)
+            filtered.to_csv(path, mode='a', header=header, index=False)
+        return filtered
+
+    def get_key_index(self, path, keys, endpoint_name, table_class):
+        """keys already stored for the season, read from disk the first time the season is written to this run"""
+        if path not in self.key_index:
+            index = set()
+            if self.raw_format == 'parquet':
+                current = self.store.read_keys(table_class, endpoint_name, self.season, keys)
+            elif os.path.exists(path):
+                current = pd.read_csv(path, usecols=keys, dtype={k: str if k == 'GAME_ID' else 'int64' for k in keys})
+            else:
+                current = None
+            if current is not None:
+                index.update(self.row_keys(current, keys))
+            self.key_index[path] = index
+        return self.key_index[path]
+
+    def filter_new_rows(self, stats, path, keys, endpoint_name, table_class):
+        """
+        anti join a batch against the season's key index (and itself), then add the surviving keys to the index
+        cost depends on the batch size, not on how big the season file already is
+        """
+        index = self.get_key_index(path, keys, endpoint_name, table_class)
+        row_keys = pd.Series(self.row_keys(stats, keys), index=stats.index, dtype=object)
+        new = ~row_keys.map(index.__contains__).astype(bool) & ~row_keys.duplicated()
+        index.update(row_keys[new])
+        return stats[new]
+
+    @staticmethod
+    def row_keys(stats, keys):
+        """key tuples for every row, GAME_ID zero padded and ids as ints so file rows and api rows compare equal"""
+        columns = [stats[k].astype(str).str.zfill(10) if k == 'GAME_ID' else stats[k].astype('int64') for k in keys]
+        return list(zip(*(column.tolist() for column in columns)))
+
+    @staticmethod
+    def key_columns(endpoint_name, table_class):
+        return ENDPOINT_WRITE_KEYS.get(endpoint_name, {}).get(table_class, WRITE_KEYS[table_class])
 
 
 class DataChecker:
-    def __init__(self, season, logger, data_path='app/data/raw'):
+    def __init__(self, season, logger, data_path=DATA_PATH, raw_format=RAW_FORMAT, store=None):
         self.season = season
         self.logger = logger
         self.data_path = data_path
+        self.raw_format = raw_format
+        self.store = store or (ParquetStore(logger=logger) if raw_format == 'parquet' else None)
+
+    def read_game_ids(self, table_class, endpoint_name):
+        """GAME_IDs stored for the season, zero padded"""
+        if self.raw_format == 'parquet':
+            stats = self.store.read_keys(table_class, endpoint_name, self.season, ['GAME_ID'])
+        else:
+            stats_file = os.path.join(BASE_PATH, self.data_path, table_class, endpoint_name, f'{endpoint_name}{self.season}.csv')
+            stats = pd.read_csv(stats_file, usecols=['GAME_ID'], dtype={'GAME_ID': str}) if os.path.exists(stats_file) else None
+        if stats is None:
+            return set()
+        # Normalize GAME_ID with leading zeros
+        return set(stats['GAME_ID'].astype(str).str.zfill(10))
 
     def get_processed_games(self, endpoint_name):
         """
@@ -211,33 +359,151 @@ class DataChecker:
         player_games = set()
         team_games = set()
 
-        # Check if the player stats file exists
-        player_file = os.path.join(BASE_PATH, self.data_path, 'players', endpoint_name, f'{endpoint_name}{self.season}.csv')
-        if os.path.exists(player_file):
-            try:
-                # Read the player stats CSV
-                pstats = pd.read_csv(player_file, usecols=['GAME_ID'], dtype={'GAME_ID': str})
-                # Normalize GAME_ID with leading zeros and add to player_games set
-                player_games.update(pstats['GAME_ID'].apply(lambda x: x.zfill(10)))
-            except Exception as e:
-                self.logger.log_error(f"Error reading player stats file {endpoint_name}_{self.season}: {e}")
+        try:
+            player_games = self.read_game_ids('players', endpoint_name)
+        except Exception as e:
+            self.logger.log_error(f"Error reading player stats file {endpoint_name}_{self.season}: {e}")
 
-        # Check if the team stats file exists
-        team_file = os.path.join(BASE_PATH, self.data_path, 'teams', endpoint_name, f'{endpoint_name}{self.season}.csv')
-        if os.path.exists(team_file):
-            try:
-                # Read the team stats CSV
-                tstats = pd.read_csv(team_file, usecols=['GAME_ID'], dtype={'GAME_ID': str})
-                # Normalize GAME_ID with leading zeros and add to team_games set
-                team_games.update(tstats['GAME_ID'].apply(lambda x: x.zfill(10)))
-            except Exception as e:
-                self.logger.log_error(f"Error reading team stats file {endpoint_name}_{self.season}: {e}")
+        try:
+            team_games = self.read_game_ids('teams', endpoint_name)
+        except Exception as e:
+            self.logger.log_error(f"Error reading team stats file {endpoint_name}_{self.season}: {e}")
         
+        if endpoint_name == 'summary':  # games without inactive players have no player rows
+            return team_games
+
         # Return the intersection of player_games and team_games
         return player_games & team_games  # Intersection of both sets
 
+    def get_missing_matrix(self, gidset, endpoints):
+        """
+        game x endpoint work matrix for the season, each endpoint's files are read once
+        returns {game_id: [endpoints the game still needs]}, games with nothing missing are left out
+        """
+        missing = dict()
+        for endpoint in endpoints:
+            for gid in gidset - self.get_processed_games(endpoint):
+                missing.setdefault(gid, []).append(endpoint)
+        return missing
+
+class ConcurrentCollector:
+    """
+    fetches many games in flight at once on a bounded thread pool
+
+    one unit of work is one game: a worker fetches every endpoint that game still needs.
+    every worker shares one TokenBucket so the request rate is global, not per thread.
+    results come back to the calling thread, so the DataWriter is only ever used from one thread
+    """
+
+    def __init__(self, data_fetcher, writer, logger, workers=8, buffer_size=100, retry_passes=1, write_duckdb=True, journal=None):
+        self.data_fetcher = data_fetcher
+        self.writer = writer
+        self.logger = logger
+        self.workers = workers
+        self.buffer_size = buffer_size
+        self.retry_passes = retry_passes
+        self.write_duckdb = write_duckdb  # False in season workers, update_duckdb merges their files afterwards
+        self.journal = journal  # CollectionJournal, every result and flush is recorded when given
+        self.attempts = dict()  # (gid, endpoint) -> number of passes that tried it
+
+    def fetch_game(self, gid, endpoints):
+        """unit of work: {endpoint: (pstats, tstats)} for every endpoint the game needs"""
+        return {endpoint: self.data_fetcher.fetch_game_data(endpoint, gid) for endpoint in endpoints}
+
+    def collect(self, jobs):
+        """
+        jobs: {gid: [endpoints still needed]}, from DataChecker.get_missing_matrix
+        buffers and flushes to the writer per endpoint every buffer_size games.
+        (game, endpoint) pairs that fail are re-queued on their own for up to retry_passes more passes
+        returns {(gid, endpoint): 'collected' | 'empty' | 'failed'}
+        """
+        status = dict()
+        buffers = dict()  # endpoint -> ([pstats], [tstats], [gids])
+        start = time.monotonic()
+        games = 0
+        pending = jobs
+
+        for attempt in range(self.retry_passes + 1):
+            if not pending:
+                break
+            if attempt:
+                self.logger.log_info(f"retry pass {attempt}: {sum(len(e) for e in pending.values())} (game, endpoint) pairs")
+            failed = dict()
+
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self.fetch_game, gid, endpoints): gid for gid, endpoints in pending.items()}
+                for future in as_completed(futures):
+                    gid = futures[future]
+                    games += 1
+                    for endpoint, (pstats, tstats) in future.result().items():
+                        self.attempts[(gid, endpoint)] = self.attempts.get((gid, endpoint), 0) + 1
+
+                        if pstats is None or tstats is None:
+                            status[(gid, endpoint)] = 'failed'
+                            failed.setdefault(gid, []).append(endpoint)
+                            continue
+                        if self.data_fetcher.is_empty(endpoint, pstats, tstats):
+                            status[(gid, endpoint)] = 'empty'
+                            self.record(endpoint, [gid], 'empty')
+                            continue
+
+                        status[(gid, endpoint)] = 'collected'
+                        self.record(endpoint, [gid], 'fetched')
+                        pstats_buffer, tstats_buffer, gid_buffer = buffers.setdefault(endpoint, ([], [], []))
+                        pstats_buffer.append(pstats)
+                        tstats_buffer.append(tstats)
+                        gid_buffer.append(gid)
+                        if len(pstats_buffer) == self.buffer_size:
+                            self.flush(endpoint, buffers.pop(endpoint))
+                            self.logger.log_info(f" {games}/{len(jobs)} games attempted, {self.throughput(games, start):.2f} games/s")
+
+            pending = failed
+
+        for endpoint in list(buffers):
+            self.flush(endpoint, buffers.pop(endpoint))
+        for gid, endpoints in pending.items():
+            for endpoint in endpoints:
+                self.record(endpoint, [gid], *self.data_fetcher.failures.get((endpoint, gid), ('failed', None)))
+
+        self.logger.log_info(f"{games} game fetches ({len(jobs)} games) in {time.monotonic() - start:.1f}s, {self.throughput(games, start):.2f} games/s")
+        return status
+
+    def flush(self, endpoint, buffer):
+        pstats_buffer, tstats_buffer, gid_buffer = buffer
+        if pstats_buffer:
+            if self.writer.write_data(endpoint, pd.concat(tstats_buffer), pd.concat(pstats_buffer), duckdb=self.write_duckdb):
+                self.record(endpoint, gid_buffer, 'written')
+
+    def record(self, endpoint, gids, status, reason=None):
+        if self.journal is not None:
+            self.journal.record(self.data_fetcher.season, endpoint, gids, status, reason)
+
+    @staticmethod
+    def throughput(games, start):
+        elapsed = time.monotonic() - start
+        return games / elapsed if elapsed > 0 else 0.0
+
+
+def season_endpoints(season, extra_endpoints=False):
+    """endpoints that exist for a season"""
+    if int(season[:4]) < 1996: # CAN ONLY GET TRADITIONAL THIS FAR BACK
+        return ['traditional']
+    return ENDPOINTS + EXTRA_ENDPOINTS if extra_endpoints else ENDPOINTS
+
+
+def summarize_status(status, logger):
+    """log collected / empty / failed counts per endpoint"""
+    counts = dict()
+    for (gid, endpoint), result in status.items():
+        counts.setdefault(endpoint, {'collected': 0, 'empty': 0, 'failed': 0})[result] += 1
+    for endpoint, count in sorted(counts.items()):
+        logger.log_info(f"{endpoint}: {count['collected']} collected, {count['empty']} empty, {count['failed']} failed")
+        if count['empty']:
+            logger.log_warning(f"{count['empty']} EMPTY GAMES FOR {endpoint}: {[gid for (gid, ep), r in status.items() if ep == endpoint and r == 'empty']}")
+
+
 def update_log(season,logger,data_fetcher):
-    data_path='app/data/raw'
+    data_path=DATA_PATH
     log_games=set()
     log_file = os.path.join(BASE_PATH, data_path, 'log', f'log{season}.csv')
     if os.path.exists(log_file):
@@ -267,108 +533,200 @@ def update_log(season,logger,data_fetcher):
         logger.log_info(f"log{season}.csv is up to date")    
 
 
-def check_data():
+def worker_logger(season):
+    """log files of one season worker, so parallel seasons never share a log file"""
+    return Logger(log_file=f'logs/log.{season}.log', sql_log_file=f'logs/sql.{season}.log')
+
+
+def run_seasons(seasons, season_func, kwargs, parallel_seasons, logger):
+    """
+    season_func(season, **kwargs) for every season, yields (season, result) as they finish
+    parallel_seasons > 1 spreads the seasons over a process pool, each worker logs to logs/log.{season}.log
+    """
+    if parallel_seasons <= 1:
+        for season in seasons:
+            yield season, season_func(season, **kwargs)
+        return
+
+    logger.log_info(f"running {len(seasons)} seasons over {parallel_seasons} processes, season logs in logs/log.{{season}}.log")
+    # spawn: a forked child would inherit the parent's threads, open files and duckdb handles
+    with ProcessPoolExecutor(max_workers=parallel_seasons, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(season_func, season, **kwargs): season for season in seasons}
+        for future in as_completed(futures):
+            season = futures[future]
+            try:
+                yield season, future.result()
+            except Exception as e:
+                logger.log_error(f"season worker for {season} failed: {e}")
+
+
+def check_season(season, cache_mode=DEFAULT_CACHE_MODE, raw_format=RAW_FORMAT, logger=None, cache=None):
+    """update the season's log file and count the games missing per endpoint"""
+    logger = logger or worker_logger(season)
+    cache = cache or ResponseCache(mode=cache_mode)
+
+    # Fetch log data
+    data_fetcher = DataFetcher(season, logger, cache=cache)
+
+    update_log(season,logger, data_fetcher)
+
+    checker = DataChecker(season, logger, raw_format=raw_format)
+
+    # Process data for each endpoint
+    missing = checker.get_missing_matrix(data_fetcher.gidset, ENDPOINTS)
+    return {endpoint: sum(endpoint in endpoints for endpoints in missing.values()) for endpoint in ENDPOINTS}
+
+
+def check_data(cache_mode=DEFAULT_CACHE_MODE, raw_format=RAW_FORMAT, parallel_seasons=1):
     """
     checks most recent log, updates log file
     reads what is in files to see if they are behind the current log
+    parallel_seasons: check that many seasons at once in separate processes
     """
 
     logger = Logger()
     logger.log_info(f"\nCHECKING DATA")
+    shared = dict(logger=logger, cache=ResponseCache(mode=cache_mode)) if parallel_seasons <= 1 else dict()
 
-    for season in SEASONS:
-        # logger.log_info(f"Starting processing for season {season}")
+    for season, missing in run_seasons(SEASONS, check_season, dict(cache_mode=cache_mode, raw_format=raw_format, **shared), parallel_seasons, logger):
+        for endpoint, missing_count in missing.items():
+            if missing_count:
+                logger.log_info(f"MISSING {missing_count} games for {endpoint}{season}.csv")
 
-        # Fetch log data
-        data_fetcher = DataFetcher(season,logger)
+            else:
+                logger.log_info(f"All data present for {endpoint}{season}.csv")
 
-        update_log(season,logger, data_fetcher)
 
-        checker = DataChecker(season,logger)
+def pending_jobs(season, gidset, endpoints, raw_format, logger, journal=None):
+    """
+    {gid: [endpoints]} still to collect. the journal settles what it has seen (written, empty, failed),
+    only the games it does not know are checked against the raw files, and the ones found there are
+    recorded as written so the next run does not read the files for them again.
+    empty games of the current season are tried again once EMPTY_RESPONSE_TTL has passed
+    """
+    if journal is None:
+        return DataChecker(season, logger, raw_format=raw_format).get_missing_matrix(gidset, endpoints)
+
+    empty_ttl = EMPTY_RESPONSE_TTL if season == SEASONS[-1] else None
+    unknown, settled = journal.pending(season, gidset, endpoints, empty_ttl)
+    skipped = sum(status in SKIP_STATUSES for status in settled.values())
+    if skipped:
+        logger.log_info(f"journal: skipping {skipped} empty / failed (game, endpoint) pairs for {season}, `python -m app.scripts.journal requeue` to retry them")
+    if not unknown:
+        return dict()
+
+    # Data checker for existing files
+    missing = DataChecker(season, logger, raw_format=raw_format).get_missing_matrix(set(unknown), endpoints)
+    jobs, on_disk = dict(), dict()
+    for gid, needed in unknown.items():
+        for endpoint in needed:
+            if endpoint in missing.get(gid, []):
+                jobs.setdefault(gid, []).append(endpoint)
+            else:
+                on_disk.setdefault(endpoint, []).append(gid)
+    for endpoint, gids in on_disk.items():
+        journal.record(season, endpoint, gids, 'written', reason='found in raw files')
+    return jobs
 
-        # Process data for each endpoint
-        for endpoint in ENDPOINTS:
-            missing_gids = data_fetcher.gidset - checker.get_processed_games(endpoint)
-            if missing_gids:
-                logger.log_info(f"MISSING {len(missing_gids)} games for {endpoint}{season}.csv")
 
-            else:
-                logger.log_info(f"All data present for {endpoint}{season}.csv")
+def collect_season(season, workers=1, rate=None, extra_endpoints=False, cache_mode=DEFAULT_CACHE_MODE, raw_format=RAW_FORMAT,
+                   logger=None, limiter=None, cache=None, connection=None, write_duckdb=True, use_journal=True):
+    """
+    collect every missing (game, endpoint) of one season
+    called in process by main(), or in a season worker with its own logger / limiter / cache and write_duckdb=False
+    use_journal: resume from the collection journal, games it settles are not looked up in the raw files
+    returns (status, StageMetrics of the season), main() merges the seasons' metrics into the get_data stage
+    """
+    logger = logger or worker_logger(season)
+    limiter = limiter or TokenBucket(rate=rate or STATS_RATE)
+    cache = cache or ResponseCache(mode=cache_mode)
+    hits, requests = cache.hits, cache.requests
+    metrics = StageMetrics(f'get_data:{season}')
+    logger.log_info(f"Starting processing for season {season}")
+
+    # Fetch log data
+    data_fetcher = DataFetcher(season, logger, limiter=limiter, cache=cache, metrics=metrics)
+    update_log(season, logger, data_fetcher)  # raw/log is what update_duckdb / make_tables read the games from
+
+    endpoints = season_endpoints(season, extra_endpoints)
+    journal = CollectionJournal() if use_journal else None
+    jobs = pending_jobs(season, data_fetcher.gidset, endpoints, raw_format, logger, journal)
+
+    status = dict()
+    if jobs:
+        writer = DataWriter(season, logger, raw_format=raw_format, connection=connection, metrics=metrics)
+        logger.log_info(f"Fetching {len(jobs)} games missing {sum(len(e) for e in jobs.values())} endpoint results for {season}")
+        collector = ConcurrentCollector(data_fetcher, writer, logger, workers=workers, write_duckdb=write_duckdb, journal=journal)
+        status = collector.collect(jobs)
+        writer.close()
+        summarize_status(status, logger)
+    else:
+        logger.log_info(f"All data already present for {season}")
+
+    if journal is not None:
+        journal.close()
+    metrics.add(cache_hits=cache.hits - hits, http_calls=cache.requests - requests)
+    return status, metrics
 
-                
-def main():
+
+def main(workers=1, rate=None, extra_endpoints=False, cache_mode=DEFAULT_CACHE_MODE, raw_format=RAW_FORMAT, parallel_seasons=1, use_journal=True,
+         ingest=True):
+    """
+    workers: number of games fetched concurrently (1 keeps the old one at a time behaviour)
+    rate: max requests per second across all workers, NBA_STATS_RATE (8) when None
+    extra_endpoints: also collect summary and matchups
+    cache_mode: 'readwrite' caches responses on disk, 'replay' only reads the cache (no network), 'off' never caches
+    raw_format: write season csv files or the parquet store
+    parallel_seasons: collect that many seasons at once in separate processes. every season only appends to its
+        own season files (its shard) and skips duckdb, update_duckdb merges the new rows into raw.* at the end.
+        rate is split evenly between the processes
+    use_journal: resume from app/data/journal.sqlite and skip games it recorded as empty or failed
+    ingest: False only writes the raw files, getting them into raw.* is left to the caller (the pipeline's ingest stage)
+    """
     # SEASONS = ['2023-24']
 
 
     # Initialize logger
     logger = Logger()
-    logger.log_info(f"\nSTARTING NEW COLLECTION FOR SEASONS {SEASONS}, ENDPOINTS {ENDPOINTS}")
-
-    for season in reversed(SEASONS):
-        logger.log_info(f"Starting processing for season {season}")
-
-        # Fetch log data
-        data_fetcher = DataFetcher(season,logger)
+    logger.log_info(f"\nSTARTING NEW COLLECTION FOR SEASONS {SEASONS}, ENDPOINTS {ENDPOINTS}, EXTRA {extra_endpoints}, WORKERS {workers}, RATE {rate}, PARALLEL SEASONS {parallel_seasons}")
+    options = dict(workers=workers, extra_endpoints=extra_endpoints, cache_mode=cache_mode, raw_format=raw_format, use_journal=use_journal)
 
-        # Data checker for existing files
-        checker = DataChecker(season, logger)
+    connection = None
+    if parallel_seasons > 1:
+        options.update(rate=(rate or STATS_RATE) / parallel_seasons, write_duckdb=False)
+    else:
+        if ingest:
+            connection = ConnectionManager(f'{DATABASE_PATH}/nba.db', logger)  # opened on the first flush, closed after the last season
+        options.update(logger=logger, limiter=TokenBucket(rate=rate or STATS_RATE), cache=ResponseCache(mode=cache_mode),
+                       connection=connection, write_duckdb=ingest)
 
-        # Process data for each endpoint
-        for endpoint in ENDPOINTS:
+    with StageMetrics('get_data', logger) as metrics:
+        for season, (status, season_metrics) in run_seasons(list(reversed(SEASONS)), collect_season, options, parallel_seasons, logger):
+            metrics.merge(season_metrics)
+            if parallel_seasons > 1:
+                logger.log_info(f"season {season} done")
+                summarize_status(status, logger)
 
-            if int(season[:4]) < 1996 and endpoint != 'traditional': # CAN ONLY GET TRADITIONAL THIS FAR BACK
-                continue
+        if connection is not None:
+            connection.close()
+            logger.log_info(f"duckdb: {connection.rows_inserted} rows inserted")
+        logger.log_info(f"response cache ({cache_mode}): {metrics.counts['cache_hits']} hits, {metrics.counts['http_calls']} http calls")
 
-            missing_gids = data_fetcher.gidset - checker.get_processed_games(endpoint)
-            empties = []
-            
-            if missing_gids:
-                writer = DataWriter(season,logger)
-                logger.log_info(f"Fetching {len(missing_gids)} missing games for {season}, {endpoint}")
-                pstats_buffer = []
-                tstats_buffer = []
-                buffer_size = 100
-                count = 0
-                buffers=0
-                for gid in missing_gids:
-                    pstats, tstats = data_fetcher.fetch_game_data(endpoint, gid)
-
-                    if pstats is not None and tstats is not None:
-                        if pstats.empty or tstats.empty:
-                            # logger.log_info(f"EMPTY GAME: {gid}")
-                            empties.append(gid)
-                            continue
-                        pstats_buffer.append(pstats)
-                        tstats_buffer.append(tstats)
-                        count += 1
-                        # logger.log_info(f"Fetched game {gid}")
-                    # else:
-                    #     logger.log_error(f"NO DATA FOR GAME_ID: {gid}")
-
-                    if count > 0 and count % buffer_size == 0:
-                        buffers+=1
-                        # logger.log_info(f"Writing {count} games to disk...")
-                        logger.log_info(f" {buffers*100}/{len(missing_gids)} game collection attempts")
-                        writer.write_data(endpoint, pd.concat(tstats_buffer), pd.concat(pstats_buffer), duckdb=True)
-                        ## TODO: also udate duckdb database
-                        pstats_buffer = []
-                        tstats_buffer = []
-                        count = 0
-                        
-                if len(pstats_buffer):
-                        # logger.log_info(f"Writing remaining {count} games to disk...")
-                        logger.log_info(f" {count+buffers*100}/{len(missing_gids)} games collected, {len(tstats_buffer)} games")
-                        writer.write_data(endpoint, pd.concat(tstats_buffer), pd.concat(pstats_buffer), duckdb=True)
-                else:
-                    logger.log_info(f"EMPTY DATAFRAMES FOR {endpoint}: {empties}")
-                if len(empties):
-                    logger.log_warning(f"{len(empties)} EMPTY GAMES")
-                
-                
-            else:
-                logger.log_info(f"All data already present for {endpoint}{season}.csv")
+    if ingest and connection is None:
+        logger.log_info("merging season files into duckdb")
+        update_duckdb(raw_format=raw_format)  # its own update_duckdb stage
 
 
 if __name__ == "__main__":
-    # check_data()
-    main()
+    parser = argparse.ArgumentParser(description="collect box scores from stats.nba.com")
+    parser.add_argument('--workers', type=int, default=1, help="games fetched concurrently")
+    parser.add_argument('--rate', type=float, default=None, help="max requests per second across all workers, NBA_STATS_RATE (8) by default")
+    parser.add_argument('--extra-endpoints', action='store_true', help=f"also collect {EXTRA_ENDPOINTS}")
+    parser.add_argument('--cache-mode', choices=CACHE_MODES, default=DEFAULT_CACHE_MODE, help="on-disk response cache, replay never touches the network")
+    parser.add_argument('--raw-format', choices=RAW_FORMATS, default=RAW_FORMAT, help="season csv files or the parquet store")
+    parser.add_argument('--parallel-seasons', type=int, default=1, help="seasons collected at once in separate processes")
+    parser.add_argument('--no-journal', action='store_true', help="ignore the collection journal, check every game against the raw files")
+    args = parser.parse_args()
+    # check_data(cache_mode=args.cache_mode, parallel_seasons=args.parallel_seasons)
+    main(workers=args.workers, rate=args.rate, extra_endpoints=args.extra_endpoints, cache_mode=args.cache_mode,
+         raw_format=args.raw_format, parallel_seasons=args.parallel_seasons, use_journal=not args.no_journal)
@@ -0,0 +1,153 @@
+"""
+append-only journal of the collection, one event per (season, endpoint, game)
+
+    fetched   the response came back with data, it sits in a buffer until the next flush
+    empty     the response had no rows
+    failed    permanent error, reason holds the error
+    retry     transient error (retries exhausted, not in the cache in replay mode), collected again on the next run
+    written   flushed to the raw files
+    requeued  put back on purpose (requeue command), the game is collected again on the next run
+
+the latest event of a game decides its state. a restart resumes from the journal: written games are done,
+empty and failed games are skipped until requeued, fetched and retry games are collected again.
+empty games of the current season are only skipped for empty_ttl, a box score may just not be published yet
+
+sqlite so parallel season workers can all append to it (WAL, one writer at a time)
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+from ..utils.logger import Logger
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+JOURNAL_PATH = os.environ.get('NBA_JOURNAL_PATH', os.path.join(BASE_PATH, 'app', 'data', 'journal.sqlite'))
+
+STATUSES = ('fetched', 'empty', 'failed', 'retry', 'written', 'requeued')
+DONE_STATUSES = ('written',)
+SKIP_STATUSES = ('empty', 'failed')
+
+
+class CollectionJournal:
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                recorded_at REAL,
+                season TEXT,
+                endpoint TEXT,
+                game_id TEXT,
+                status TEXT,
+                reason TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS events_game ON events (season, endpoint, game_id, id)")
+        self.conn.commit()
+
+    def record(self, season, endpoint, gids, status, reason=None):
+        """append one event per game, all in one sqlite transaction"""
+        if status not in STATUSES:
+            raise ValueError(f"unknown journal status {status}, expected one of {STATUSES}")
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO events (recorded_at, season, endpoint, game_id, status, reason) VALUES (?, ?, ?, ?, ?, ?)",
+                [(now, season, endpoint, gid, status, reason) for gid in gids]
+            )
+            self.conn.commit()
+
+    def latest(self, season=None, endpoint=None):
+        """{(season, gid, endpoint): (status, reason, recorded_at)} from the last event of every game"""
+        where, params = self.filters(season, endpoint)
+        with self.lock:
+            rows = self.conn.execute(f"""
+                SELECT season, game_id, endpoint, status, reason, recorded_at
+                FROM events
+                WHERE id IN (SELECT MAX(id) FROM events {where} GROUP BY season, endpoint, game_id)
+            """, params).fetchall()
+        return {(s, gid, endpoint): (status, reason, recorded_at) for s, gid, endpoint, status, reason, recorded_at in rows}
+
+    def pending(self, season, gidset, endpoints, empty_ttl=None):
+        """
+        {gid: [endpoints]} still to collect according to the journal alone, plus {(gid, endpoint): status}
+        for the pairs the journal already settles (written, or empty / failed and skipped)
+        empty_ttl: seconds an empty result is skipped for, None skips it until requeued
+        """
+        expired = time.time() - empty_ttl if empty_ttl is not None else None
+        state = {(gid, endpoint): (status, recorded_at) for (s, gid, endpoint), (status, reason, recorded_at) in self.latest(season).items()}
+        jobs, settled = dict(), dict()
+        for gid in sorted(gidset):
+            for endpoint in endpoints:
+                status, recorded_at = state.get((gid, endpoint), (None, None))
+                if status == 'empty' and expired is not None and recorded_at < expired:
+                    status = None
+                if status in DONE_STATUSES or status in SKIP_STATUSES:
+                    settled[(gid, endpoint)] = status
+                else:
+                    jobs.setdefault(gid, []).append(endpoint)
+        return jobs, settled
+
+    def requeue(self, season=None, endpoint=None, statuses=('failed',)):
+        """append a requeued event for every game whose latest status is in statuses, returns how many"""
+        requeued = dict()
+        for (s, gid, ep), (status, reason, recorded_at) in self.latest(season, endpoint).items():
+            if status in statuses:
+                requeued.setdefault((s, ep), []).append(gid)
+        for (s, ep), gids in requeued.items():
+            self.record(s, ep, gids, 'requeued', reason=f"requeued from {'/'.join(statuses)}")
+        return sum(len(gids) for gids in requeued.values())
+
+    def summary(self, season=None, endpoint=None):
+        """[(season, endpoint, status, games)] by latest status"""
+        counts = dict()
+        for (s, gid, ep), (status, reason, recorded_at) in self.latest(season, endpoint).items():
+            counts[(s, ep, status)] = counts.get((s, ep, status), 0) + 1
+        return [(*key, count) for key, count in sorted(counts.items())]
+
+    @staticmethod
+    def filters(season=None, endpoint=None):
+        clauses, params = [], []
+        if season:
+            clauses.append("season = ?")
+            params.append(season)
+        if endpoint:
+            clauses.append("endpoint = ?")
+            params.append(endpoint)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="collection journal: state per (season, endpoint, game)")
+    parser.add_argument('command', choices=['summary', 'requeue'])
+    parser.add_argument('--season', default=None)
+    parser.add_argument('--endpoint', default=None)
+    parser.add_argument('--status', nargs='+', choices=SKIP_STATUSES, default=['failed'], help="latest statuses requeue puts back")
+    args = parser.parse_args()
+
+    logger = Logger()
+    journal = CollectionJournal()
+    if args.command == 'requeue':
+        count = journal.requeue(args.season, args.endpoint, tuple(args.status))
+        logger.log_info(f"requeued {count} {'/'.join(args.status)} games (season {args.season or 'all'}, endpoint {args.endpoint or 'all'})")
+    else:
+        for season, endpoint, status, games in journal.summary(args.season, args.endpoint):
+            print(f"{season}\t{endpoint}\t{status}\t{games}")
+    journal.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,25 @@ import pandas as pd
 import glob
 import duckdb
 import os
+import argparse
 # import sqlmesh
 
 from ..utils.logger import Logger
+from ..utils.metrics import StageMetrics
+from .raw_store import ParquetStore, RAW_FORMAT, RAW_FORMATS
+from .process_raw_line import ingest_lines, LINES_TABLE
 
 
 # Define the base path relative to the project root
 BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 # Your data path
-DATA_PATH = os.path.join(BASE_PATH, 'app', 'data', 'raw')
-DATABASE_PATH = os.path.join(BASE_PATH, 'app', 'database')
+DATA_PATH = os.environ.get('NBA_DATA_PATH', os.path.join(BASE_PATH, 'app', 'data', 'raw'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app', 'database'))
 
 SQLMESH_PATH = os.path.join(BASE_PATH, 'app', 'sql', 'sqlmesh')
+# where the external model yaml of every created table is written, pointed elsewhere when building scratch databases
+EXTERNAL_MODELS_PATH = os.environ.get('NBA_EXTERNAL_MODELS_PATH', os.path.join(SQLMESH_PATH, 'models', 'external_models'))
 # print(f"Data Path: {SQLMESH_PATH}")
 
 
@@ -30,6 +36,13 @@ DATA_TYPE_MAPPINGS = {
     'float64': 'DOUBLE'
 }
 
+# join / sort keys are typed once here instead of cast in every model: the zero padded GAME_ID string
+# ('0022400001') becomes the integer key 22400001 and GAME_DATE text becomes DATE, the inserts cast on the way in
+NORMALIZED_TYPES = {
+    'GAME_ID': 'BIGINT',
+    'GAME_DATE': 'DATE'
+}
+
 PRIMARY_KEYS = {
     'players': ('GAME_ID', 'PLAYER_ID'),
     'teams': ('GAME_ID', 'TEAM_ID'),
@@ -40,14 +53,22 @@ PRIMARY_KEYS = {
 
 class TableGenerator:
 
-    def __init__(self, logger):
+    def __init__(self, logger, raw_format=RAW_FORMAT, metrics=None):
         self.conn = duckdb.connect(f'{DATABASE_PATH}/nba.db')
+        self.metrics = metrics  # StageMetrics, every table's insert is profiled
+        if metrics:
+            metrics.enable_profiling(self.conn)
+        self.raw_format = raw_format  # box score endpoints from csv files or the parquet store, log / lines are always csv
+        self.store = ParquetStore(logger=logger) if raw_format == 'parquet' else None
         self.endpoints = self.get_endpoints()
         self.tables_to_create = self.get_table_paths()
         self.logger = logger
 
     def get_endpoints(self):
         """Fetch common endpoints from both teams and players directories."""
+        if self.store:
+            return self.store.endpoints()
+
         team_table_paths = glob.glob(f'{DATA_PATH}/teams/*')
         team_tables = set([x.split(os.sep)[-1] for x in team_table_paths])
 
@@ -60,14 +81,14 @@ class TableGenerator:
         """Get paths for the tables to be created."""
         table_paths = []
 
-        # Add team and player tables paths
-        for ep in self.endpoints:
-            table_paths.append(f'{DATA_PATH}/teams/{ep}/')
-            table_paths.append(f'{DATA_PATH}/players/{ep}/')
+        # Add team and player tables paths (read from the parquet store by create_table_from_parquet)
+        if not self.store:
+            for ep in self.endpoints:
+                table_paths.append(f'{DATA_PATH}/teams/{ep}/')
+                table_paths.append(f'{DATA_PATH}/players/{ep}/')
 
-        # Always include log and lines directories
+        # Always include the log directory, the lines files go in through process_raw_line after it
         table_paths.append(f'{DATA_PATH}/log/')
-        table_paths.append(f'{DATA_PATH}/lines/')
         
         return table_paths
 
@@ -96,7 +117,6 @@ class TableGenerator:
         else:
             schema, table_class, table_name = csv_split[-3], csv_split[-2], 'table'
 
-        full_table_name = f"{schema}.{table_class}_{table_name}"
         if not self.schema_exists(schema):
             create_schema = f"CREATE SCHEMA {schema};"
             self.conn.execute(create_schema)
@@ -105,33 +125,58 @@ class TableGenerator:
         # Read sample data from the CSV file
         sample = pd.read_csv(csv_files[0])
 
+        file_paths_str = ', '.join([f"'{file}'" for file in csv_files])
+        source = f"read_csv_auto([{file_paths_str}], union_by_name=true, files_to_sniff=-1,nullstr='')"
+        return self.create_table(schema, table_class, table_name, sample, source, f"{len(csv_files)} files")
+
+    def create_table_from_parquet(self, table_class, endpoint):
+        """Creates raw.{table_class}_{endpoint} from the parquet store, types come from the store's fixed schema."""
+        source = self.store.source(table_class, endpoint)
+        if source is None:
+            self.logger.log_error(f'NO PARQUET FILES FOUND FOR {table_class}/{endpoint}')
+            return
+
+        if not self.schema_exists('raw'):
+            create_schema = "CREATE SCHEMA raw;"
+            self.conn.execute(create_schema)
+            self.logger.log_sql(create_schema)
+
+        sample = self.conn.execute(f"SELECT * FROM {source} LIMIT 1000").df()
+        return self.create_table('raw', table_class, endpoint, sample, source, f"{len(self.store.parts(table_class, endpoint))} parquet parts")
+
+    def create_table(self, schema, table_class, table_name, sample, source, described):
+        """create the table from a sample frame's dtypes and fill it from source (a duckdb relation)"""
+        full_table_name = f"{schema}.{table_class}_{table_name}"
+
         # Get table creation statements and external model definition
         table_creation_statement, external_model_definition = self.create_table_definitions(
             sample, schema, table_class, table_name)
 
-        file_paths_str = ', '.join([f"'{file}'" for file in csv_files])
         insert_statement = f"""
-            INSERT INTO {full_table_name}
-            (SELECT * FROM read_csv_auto([{file_paths_str}], union_by_name=true, files_to_sniff=-1,nullstr=''));
+            INSERT INTO {full_table_name} BY NAME
+            (SELECT * FROM {source});
         """
 
         try:
             # Execute table creation and insertion
             self.conn.execute(table_creation_statement)
 
-            self.conn.execute(insert_statement)
+            inserted = self.conn.execute(insert_statement).fetchone()[0]
+            if self.metrics:
+                self.metrics.profile(self.conn, f"insert {full_table_name}")
+                self.metrics.add(rows_in=inserted, rows_out=inserted)
 
             self.logger.log_sql(table_creation_statement)
             self.logger.log_sql(insert_statement)
 
 
-            self.logger.log_info(f"Successfully created and populated {full_table_name} with {len(csv_files)} files.")
+            self.logger.log_info(f"Successfully created and populated {full_table_name} with {described}.")
         except Exception as e:
             self.logger.log_warning(f"Error creating / inserting table {full_table_name}: {e}")
             return
 
         # Write the external model definition to a YAML file
-        yaml_path = os.path.join(SQLMESH_PATH, 'models', 'external_models', f"{schema}_{table_class}_{table_name}.yaml")
+        yaml_path = os.path.join(EXTERNAL_MODELS_PATH, f"{schema}_{table_class}_{table_name}.yaml")
         with open(yaml_path, 'w') as f:
             f.write(external_model_definition)
 
@@ -154,7 +199,7 @@ class TableGenerator:
 
         # Create table columns based on the CSV data types
         for col, c_type in zip(cols, types):
-            duckdb_type = DATA_TYPE_MAPPINGS.get(str(c_type), 'TEXT')  # Default to TEXT if unknown
+            duckdb_type = NORMALIZED_TYPES.get(col) or DATA_TYPE_MAPPINGS.get(str(c_type), 'TEXT')  # Default to TEXT if unknown
             table_creation_statement += f"\t\"{col}\" {duckdb_type},\n"
             external_model_definition += f"\n    {col}: {duckdb_type}"
 
@@ -164,14 +209,27 @@ class TableGenerator:
         return table_creation_statement, external_model_definition
 
 
-def main():
+def main(raw_format=RAW_FORMAT):
     logger = Logger()
-    logger.log_info(f"MAKING ALL TABLES FROM RAW FILES")
-    new = TableGenerator(logger)
-    for pathway in new.tables_to_create:
-        new.create_table_from_csv(pathway)
-    logger.log_info(f"DONE MAKING {len(new.tables_to_create)} tables")
+    logger.log_info(f"MAKING ALL TABLES FROM RAW FILES ({raw_format})")
+    with StageMetrics('make_tables', logger) as metrics:
+        new = TableGenerator(logger, raw_format=raw_format, metrics=metrics)
+        for pathway in new.tables_to_create:
+            new.create_table_from_csv(pathway)
+        if new.store:
+            for ep in sorted(new.endpoints):
+                new.create_table_from_parquet('teams', ep)
+                new.create_table_from_parquet('players', ep)
+        try:
+            ingest_lines(new.conn, rescan=True, logger=logger, metrics=metrics)
+        except Exception as e:
+            logger.log_warning(f"Error creating {LINES_TABLE}: {e}")
+        new.conn.close()
+    logger.log_info(f"DONE MAKING {len(new.tables_to_create) + 2 * len(new.endpoints if new.store else [])} tables")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="create the raw.* tables from the raw files")
+    parser.add_argument('--raw-format', choices=RAW_FORMATS, default=RAW_FORMAT, help="season csv files or the parquet store")
+    args = parser.parse_args()
+    main(raw_format=args.raw_format)
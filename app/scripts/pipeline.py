@@ -0,0 +1,354 @@
+"""
+the whole refresh as one run: a dag of stages with declared inputs and outputs, instead of the manual sequence in
+commands.txt
+
+    collect         get_data, raw files only (always runs, the api decides what is new)
+    player_info     common_data, after collect: it reads the traditional files collect appends to, in --raw-format
+    window_models   the generated aggs window models (sql_generator windows)
+    ingest          raw files -> raw.*: make_tables when the raw tables are missing, update_duckdb otherwise
+    lines           lines files -> raw.lines_table (process_raw_line), after ingest as it joins the log
+    models          sqlmesh: plan --auto-apply when the project changed, run --ignore-cron otherwise. the incremental
+                    models only rebuild the seasons that changed (@stale_seasons), nothing is restated unless asked
+                    with --restate-model
+    datasets        make_datasets export of --format
+
+a stage is skipped when the fingerprint of its inputs (data files: path, size, mtime; code files: content), the
+fingerprints of the stages it depends on and its options match the last successful run (pipeline.stage_state in
+nba.db) and its outputs are there. independent stages run at the same time (--jobs), the stages writing nba.db
+from another process (models) run alone. a failed stage blocks the stages after it, the rest go on.
+
+    python -m app.scripts.pipeline --workers 4 --rate 8
+    python -m app.scripts.pipeline --skip collect player_info --format parquet
+    python -m app.scripts.pipeline --skip collect player_info --restate-model base.players_processed
+"""
+import argparse
+import glob
+import hashlib
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import duckdb
+
+from ..utils.logger import Logger
+from ..utils.metrics import StageMetrics, RUN_ID
+from ..utils.response_cache import CACHE_MODES, DEFAULT_CACHE_MODE
+from .process_raw_line import lines_files, MAPPING_PATH
+from .raw_store import raw_files, DATA_PATH, RAW_FORMAT, RAW_FORMATS
+from .update_duckdb import ENDPOINTS
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app', 'database'))
+DATABASE = os.path.join(DATABASE_PATH, 'nba.db')
+SQLMESH_PATH = os.path.join(BASE_PATH, 'app', 'sql', 'sqlmesh')
+SQLMESH = ['sqlmesh', '--gateway', 'duckdb']
+
+STATE_TABLE = 'pipeline.stage_state'
+DATASET_FORMATS = ('csv', 'parquet', 'graph', 'pt')  # make_datasets.FORMATS
+# stage status in the summary
+RAN, UNCHANGED, SKIPPED, FAILED, BLOCKED = 'ran', 'unchanged', 'skipped', 'failed', 'blocked'
+
+
+def fingerprint(files=(), code=(), extra=()):
+    """sha256 over data files (path, size, mtime), code files (path, content) and extra values"""
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        stat = os.stat(path)
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    for path in sorted(code):
+        digest.update(f"{path}\n".encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    for value in extra:
+        digest.update(f"{value}\n".encode())
+    return digest.hexdigest()
+
+
+def connect():
+    conn = duckdb.connect(DATABASE)
+    conn.execute("SET enable_progress_bar = false")
+    return conn
+
+
+def read_state():
+    """{stage: fingerprint} of the last successful runs, empty when nba.db has none yet"""
+    if not os.path.exists(DATABASE):
+        return dict()
+    conn = connect()
+    try:
+        exists = conn.execute("""
+            SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'pipeline' AND table_name = 'stage_state'
+        """).fetchone()[0]
+        return dict(conn.execute(f"SELECT stage, fingerprint FROM {STATE_TABLE}").fetchall()) if exists else dict()
+    finally:
+        conn.close()
+
+
+def write_state(fingerprints, run_id=RUN_ID):
+    conn = connect()
+    try:
+        conn.execute("CREATE SCHEMA IF NOT EXISTS pipeline")
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+                stage VARCHAR PRIMARY KEY,
+                fingerprint VARCHAR,
+                run_id VARCHAR,
+                finished_at TIMESTAMP
+            )
+        """)
+        conn.executemany(f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES (?, ?, ?, current_timestamp)",
+                         [(stage, value, run_id) for stage, value in fingerprints.items()])
+    finally:
+        conn.close()
+
+
+def tables_exist(tables):
+    """every schema.name of tables is in nba.db"""
+    if not os.path.exists(DATABASE):
+        return False
+    conn = connect()
+    try:
+        found = {f"{schema}.{name}" for schema, name in conn.execute("SELECT table_schema, table_name FROM information_schema.tables").fetchall()}
+    finally:
+        conn.close()
+    return set(tables) <= found
+
+
+def files_exist(paths):
+    return all(os.path.exists(path) for path in paths)
+
+
+def box_score_files(raw_format):
+    return [path for table_class in ('teams', 'players') for endpoint in ENDPOINTS for path in raw_files(table_class, endpoint, raw_format)]
+
+
+def log_files():
+    return sorted(glob.glob(os.path.join(DATA_PATH, 'log', '*.csv')))
+
+
+def sqlmesh_files():
+    """the files sqlmesh plans from: config, models, macros and seeds"""
+    patterns = ['config.yaml', 'models/**/*.sql', 'models/**/*.yaml', 'macros/*.py', 'seeds/*.csv']
+    return sorted(path for pattern in patterns for path in glob.glob(os.path.join(SQLMESH_PATH, pattern), recursive=True))
+
+
+def window_model_files():
+    from ..sql.sql_generator import WINDOW_MODELS
+    return [os.path.join(SQLMESH_PATH, 'models', spec['file']) for spec in WINDOW_MODELS]
+
+
+def dataset_files(format, output_dir):
+    if format in ('csv', 'parquet'):
+        names = [f'{name}.{format}' for name in ('player_nodes', 'team_nodes', 'outcome_nodes', 'player_team_edges', 'team_outcome_edges')]
+    else:
+        names = [os.path.join('graph', 'player_x.npy'), os.path.join('graph', 'team_result.npy')] + (['graph.pt'] if format == 'pt' else [])
+    return [os.path.join(output_dir, name) for name in names]
+
+
+def run_collect(options, logger):
+    from .get_data import main
+    main(workers=options.workers, rate=options.rate, extra_endpoints=options.extra_endpoints, cache_mode=options.cache_mode,
+         raw_format=options.raw_format, parallel_seasons=options.parallel_seasons, ingest=False)
+
+
+def run_player_info(options, logger):
+    from .common_data import main
+    main(cache_mode=options.cache_mode, raw_format=options.raw_format)
+
+
+def run_window_models(options, logger):
+    from ..sql.sql_generator import SQLMeshModelGenerator
+    SQLMeshModelGenerator(logger).write_window_models()
+
+
+def run_ingest(options, logger):
+    if not tables_exist(['raw.players_traditional', 'raw.teams_traditional', 'raw.log_table']):
+        from .make_tables import main
+        main(raw_format=options.raw_format)
+        return
+    from .update_duckdb import update_duckdb
+    if update_duckdb(raw_format=options.raw_format):
+        raise RuntimeError("update_duckdb failed, see its log")
+
+
+def sqlmesh(args, logger):
+    """one sqlmesh command in the project directory, its output goes to the log"""
+    logger.log_info(f"sqlmesh {' '.join(args)}")
+    result = subprocess.run(SQLMESH + args, cwd=SQLMESH_PATH, capture_output=True, text=True)
+    for line in (result.stdout + result.stderr).splitlines():
+        if line.strip():
+            logger.log_info(f"sqlmesh: {line}")
+    if result.returncode:
+        raise RuntimeError(f"sqlmesh {args[0]} exited with {result.returncode}")
+
+
+def run_lines(options, logger):
+    from .process_raw_line import main
+    main()
+
+
+def run_models(options, logger, state):
+    """returns the project fingerprint to store with the stage, a changed project is planned, an unchanged one run"""
+    project = fingerprint(code=sqlmesh_files())
+    with StageMetrics('sqlmesh', logger):
+        if options.restate_model:
+            sqlmesh(['plan', '--auto-apply', '--no-prompts'] + [arg for model in options.restate_model for arg in ('--restate-model', model)], logger)
+        elif state.get('models:project') != project:
+            sqlmesh(['plan', '--auto-apply', '--no-prompts'], logger)
+        else:
+            sqlmesh(['run', '--ignore-cron'], logger)
+    return {'models:project': project}
+
+
+def run_datasets(options, logger):
+    from ..model.make_datasets import export_datasets
+    export_datasets(format=options.format, output_dir=options.output_dir)
+
+
+def stages(options, logger):
+    """
+    {name: stage} in dependency order, a stage is a dict of
+        deps        the stages it runs after
+        inputs      function -> (data files, code files, extra values) it is fingerprinted on, None: always runs
+        outputs     function -> whether what it makes is there
+        run         function(state) doing the work, may return more {key: value} to keep in the stage state
+        exclusive   runs with no other stage at once
+    """
+    common_player_info = os.path.join(DATA_PATH, 'players', 'common', 'common_player_info.csv')
+    return {
+        'collect': dict(deps=[], inputs=None, outputs=lambda: True,
+                        run=lambda state: run_collect(options, logger)),
+        'player_info': dict(deps=['collect'], outputs=lambda: os.path.exists(common_player_info) or not raw_files('players', 'traditional', options.raw_format),
+                            inputs=lambda: (raw_files('players', 'traditional', options.raw_format), [], [options.raw_format]),
+                            run=lambda state: run_player_info(options, logger)),
+        'window_models': dict(deps=[], outputs=lambda: files_exist(window_model_files()),
+                              inputs=lambda: ([], [os.path.join(BASE_PATH, 'app', 'sql', 'sql_generator.py')], []),
+                              run=lambda state: run_window_models(options, logger)),
+        'ingest': dict(deps=['collect'], outputs=lambda: tables_exist(['raw.players_traditional', 'raw.teams_traditional', 'raw.log_table']),
+                       inputs=lambda: (box_score_files(options.raw_format) + log_files(), [], [options.raw_format]),
+                       run=lambda state: run_ingest(options, logger)),
+        'lines': dict(deps=['ingest'], outputs=lambda: tables_exist(['raw.lines_table']),
+                      inputs=lambda: (lines_files() + log_files(), [MAPPING_PATH], []),
+                      run=lambda state: run_lines(options, logger)),
+        'models': dict(deps=['ingest', 'lines', 'window_models'], exclusive=True,
+                       outputs=lambda: tables_exist(['base.players_processed', 'base.teams_processed', 'aggs.player_averages']),
+                       inputs=lambda: ([], sqlmesh_files(), []),
+                       run=lambda state: run_models(options, logger, state)),
+        'datasets': dict(deps=['models'], outputs=lambda: files_exist(dataset_files(options.format, options.output_dir)),
+                         inputs=lambda: ([], [os.path.join(BASE_PATH, 'app', 'model', 'make_datasets.py')], [options.format, options.output_dir]),
+                         run=lambda state: run_datasets(options, logger))
+    }
+
+
+def stage_fingerprint(name, stage, fingerprints):
+    """None for stages that always run"""
+    if stage.get('inputs') is None:
+        return None
+    files, code, extra = stage['inputs']()
+    deps = [f"{dep}={fingerprints.get(dep)}" for dep in stage['deps']]
+    return fingerprint(files, code, [name] + list(extra) + deps)
+
+
+def run(plan, jobs=2, force=(), skip=(), logger=None):
+    """
+    runs the stages of plan (stages()) in dependency order, up to jobs at once
+    returns {stage: (status, seconds)}, status one of ran / unchanged / skipped / failed / blocked
+    """
+    logger = logger or Logger()
+    state = read_state()
+    results, fingerprints, running = dict(), dict(), dict()  # running: future -> (name, fingerprint, start)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while len(results) < len(plan):
+            progress = True
+            while progress:
+                progress = False
+                for name, stage in plan.items():
+                    if name in results or name in {started for started, _, _ in running.values()}:
+                        continue
+                    if not all(dep in results for dep in stage['deps']):
+                        continue
+                    if any(results[dep][0] in (FAILED, BLOCKED) for dep in stage['deps']):
+                        logger.log_warning(f"pipeline: {name} blocked, a stage it needs failed")
+                        results[name], progress = (BLOCKED, 0.0), True
+                        continue
+                    if name in skip:
+                        logger.log_info(f"pipeline: {name} skipped")
+                        results[name], fingerprints[name], progress = (SKIPPED, 0.0), state.get(name), True
+                        continue
+                    exclusive = stage.get('exclusive') or any(plan[started].get('exclusive') for started, _, _ in running.values())
+                    if running and exclusive:
+                        continue
+                    value = stage_fingerprint(name, stage, fingerprints)
+                    if value is not None and name not in force and state.get(name) == value and stage['outputs']():
+                        logger.log_info(f"pipeline: {name} unchanged")
+                        results[name], fingerprints[name], progress = (UNCHANGED, 0.0), value, True
+                        continue
+                    logger.log_info(f"pipeline: {name} started")
+                    running[pool.submit(stage['run'], state)] = (name, value, time.perf_counter())
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, value, start = running.pop(future)
+                seconds = time.perf_counter() - start
+                try:
+                    kept = future.result() or dict()
+                    if not plan[name]['outputs']():
+                        raise RuntimeError("its outputs are missing after the run")
+                except Exception as e:
+                    logger.log_error(f"pipeline: {name} failed after {seconds:.1f}s: {e}")
+                    results[name] = (FAILED, seconds)
+                    continue
+                logger.log_info(f"pipeline: {name} done in {seconds:.1f}s")
+                results[name], fingerprints[name] = (RAN, seconds), value
+                if value is not None:
+                    kept[name] = value
+                if kept:
+                    write_state(kept)
+                    state.update(kept)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run the pipeline stages that have new inputs, independent ones at once")
+    parser.add_argument('--jobs', type=int, default=2, help="stages run at the same time")
+    parser.add_argument('--force', nargs='+', default=[], help="run these stages even when unchanged")
+    parser.add_argument('--skip', nargs='+', default=[], help="leave these stages out, e.g. collect player_info offline")
+    parser.add_argument('--workers', type=int, default=1, help="get_data: games fetched concurrently")
+    parser.add_argument('--rate', type=float, default=None, help="get_data: max requests per second across all workers")
+    parser.add_argument('--extra-endpoints', action='store_true', help="get_data: also collect summary and matchups")
+    parser.add_argument('--parallel-seasons', type=int, default=1, help="get_data: seasons collected at once in separate processes")
+    parser.add_argument('--cache-mode', choices=CACHE_MODES, default=DEFAULT_CACHE_MODE, help="on-disk response cache of the collectors")
+    parser.add_argument('--raw-format', choices=RAW_FORMATS, default=RAW_FORMAT, help="season csv files or the parquet store")
+    parser.add_argument('--restate-model', nargs='+', default=[], help="models restated by sqlmesh plan, e.g. base.players_processed")
+    parser.add_argument('--format', choices=DATASET_FORMATS, default='csv', help="make_datasets export")
+    parser.add_argument('--output-dir', default=os.path.join(BASE_PATH, 'app', 'model', 'data'), help="make_datasets output directory")
+    args = parser.parse_args()
+
+    os.environ.setdefault('NBA_RUN_ID', RUN_ID)  # the sqlmesh subprocess and spawned collectors share the run id
+    logger = Logger()
+    plan = stages(args, logger)
+    unknown = set(args.force + args.skip) - set(plan)
+    if unknown:
+        parser.error(f"unknown stages {sorted(unknown)}, expected some of {list(plan)}")
+    if args.restate_model:
+        args.force.append('models')
+    os.makedirs(DATABASE_PATH, exist_ok=True)
+
+    logger.log_info(f"\nPIPELINE RUN {RUN_ID}, JOBS {args.jobs}, FORCE {args.force}, SKIP {args.skip}")
+    start = time.perf_counter()
+    results = run(plan, args.jobs, set(args.force), set(args.skip), logger)
+    for name, (status, seconds) in results.items():
+        print(f"{name:15} {status:10} {seconds:8.1f}s")
+    logger.log_info(f"pipeline run {RUN_ID} done in {time.perf_counter() - start:.1f}s: "
+                    + ', '.join(f"{name} {status}" for name, (status, _) in results.items()))
+    if any(status in (FAILED, BLOCKED) for status, _ in results.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,132 +6,185 @@ https://sportsdatabase.com/NBA/query.html
 
 using this query
 f"date, team, site, o:team, line, total @season={YYYY}"
-
+saved as app/data/raw/lines/lines{YYYY}.csv
+
+two tables in nba.db:
+    raw.lines_source    the typed rows of every lines file, GAME_DATE parsed with strptime, team names as in the files.
+                        only the files new or changed since the last run (raw.ingest_manifest) are read, all of them
+                        in one multi-file scan
+    raw.lines_table     GAME_ID, GAME_DATE, TEAM_ABBREVIATION, LINE, OU: raw.lines_source mapped to the log's team names
+                        (line_team_mapping seed) and joined once to raw.log_table on (GAME_DATE, TEAM_NAME). rebuilt
+                        after every ingest, lines of games the log does not have yet go in once it does
+
+    python -m app.scripts.process_raw_line
+    python -m app.scripts.process_raw_line --rescan
 """
-
-# %%
-import pandas as pd
+import argparse
 import glob
-import time
-import duckdb
-
-
-
+import os
 
+import duckdb
 
-# %%
-conn = duckdb.connect('firstdb.db')
-
-
-# %%
-"""
-first need to make a mapping table to map team names from raw files(sportsdatabase.com) to team names from log files (nba.stats)
-
-"""
-conn.execute("""CREATE OR REPLACE TABLE LINE_TEAM_MAPPING_TABLE
-             (raw_data_team_name VARCHAR,
-             log_table_team_name VARCHAR)""").df()
-
-conn.execute("""INSERT INTO LINE_TEAM_MAPPING_TABLE (raw_data_team_name,log_table_team_name)
-             VALUES
-('Jazz','Utah Jazz'),
-('Wizards','Washington Wizards'),
-('Spurs','San Antonio Spurs'),
-('Hornets','Charlotte Hornets'),
-('Bucks','Milwaukee Bucks'),
-('Grizzlies','Memphis Grizzlies'),
-('Hawks','Atlanta Hawks'),
-('Pacers','Indiana Pacers'),
-('Pistons','Detroit Pistons'),
-('Timberwolves','Minnesota Timberwolves'),
-('Seventysixers','Philadelphia 76ers'),
-('Nuggets','Denver Nuggets'),
-('Thunder','Oklahoma City Thunder'),
-('Celtics','Boston Celtics'),
-('Raptors','Toronto Raptors'),
-('Cavaliers','Cleveland Cavaliers'),
-('Warriors','Golden State Warriors'),
-('Knicks','New York Knicks'),
-('Mavericks','Dallas Mavericks'),
-('Lakers','Los Angeles Lakers'),
-('Nets','Brooklyn Nets'),
-('Magic','Orlando Magic'),
-('Heat','Miami Heat'),
-('Trailblazers','Portland Trail Blazers'),
-('Suns','Phoenix Suns'),
-('Clippers','LA Clippers'),
-('Rockets','Houston Rockets'),
-('Bulls','Chicago Bulls'),
-('Kings','Sacramento Kings'),
-('Pelicans','New Orleans Pelicans')""").df()
-
-
-
-
-
-# %%
-"""make processed file for each 'raw' file"""
-raw_line_filepath = 'DATA/raw/lines/'
-lines_csv_files = glob.glob(f'{raw_line_filepath}*.csv')
-if not lines_csv_files:
-    print(f'create_line_table error: no file in {raw_line_filepath}')
-
-for file in lines_csv_files:
+from ..utils.logger import Logger
+from ..utils.metrics import StageMetrics
+from .update_duckdb import file_hash, IngestManifest
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DATA_PATH = os.environ.get('NBA_DATA_PATH', os.path.join(BASE_PATH, 'app', 'data', 'raw'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app', 'database'))
+# raw team names (sportsdatabase.com) -> log_table TEAM_NAME (nba.stats), also the sqlmesh seed raw.line_team_mapping_table
+MAPPING_PATH = os.path.join(BASE_PATH, 'app', 'sql', 'sqlmesh', 'seeds', 'line_team_mapping.csv')
+
+LINES_COLUMNS = ['date', 'team', 'site', 'o:team', 'line', 'total']  # the query's columns, in the files
+SOURCE_TABLE = 'raw.lines_source'
+LINES_TABLE = 'raw.lines_table'
+MANIFEST_NAME = 'lines_table'  # table_name of the lines files in raw.ingest_manifest
+
+
+def lines_files(data_path=DATA_PATH):
+    return sorted(glob.glob(os.path.join(data_path, 'lines', '*.csv')))
+
+
+def typed_lines(source, file='filename'):
+    """
+    the typed raw.lines_source columns from source, a relation with the query's columns
+    date is YYYYMMDD, rows whose date does not parse are dropped
+    """
+    return f"""
+        SELECT
+            {file} AS file,
+            try_strptime(CAST(date AS VARCHAR), '%Y%m%d')::DATE AS GAME_DATE,
+            team AS TEAM,
+            site AS SITE,
+            "o:team" AS OPP_TEAM,
+            TRY_CAST(line AS DOUBLE) AS LINE,
+            TRY_CAST(total AS DOUBLE) AS OU
+        FROM {source}
+        WHERE GAME_DATE IS NOT NULL
+    """
+
+
+def files_source(files):
+    """every lines file in one scan, all columns read as text (typed_lines casts them), filename is the file's path"""
+    file_paths_str = ', '.join(f"'{f}'" for f in files)
+    return f"read_csv([{file_paths_str}], header=true, all_varchar=true, union_by_name=true, filename=true, nullstr='')"
+
+
+def create_source_table(conn):
+    conn.execute("CREATE SCHEMA IF NOT EXISTS raw")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SOURCE_TABLE} (
+            file VARCHAR,
+            GAME_DATE DATE,
+            TEAM VARCHAR,
+            SITE VARCHAR,
+            OPP_TEAM VARCHAR,
+            LINE DOUBLE,
+            OU DOUBLE
+        )
+    """)
+
+
+def build_lines_table(conn, mapping_path=MAPPING_PATH):
+    """
+    raw.lines_table from raw.lines_source and raw.log_table, one row per (GAME_ID, TEAM_ABBREVIATION),
+    a game in more than one file keeps the row of the last file. returns its rows
+    """
+    return conn.execute(f"""
+        CREATE OR REPLACE TABLE {LINES_TABLE} AS
+        SELECT
+            lt.GAME_ID,
+            lt.GAME_DATE,
+            lt.TEAM_ABBREVIATION,
+            s.LINE,
+            s.OU
+        FROM {SOURCE_TABLE} s
+        JOIN read_csv('{mapping_path}', header=true, all_varchar=true) mp
+          ON mp.raw_data_team_name = s.TEAM
+        JOIN raw.log_table lt
+          ON lt.GAME_DATE = s.GAME_DATE
+         AND lt.TEAM_NAME = mp.log_table_team_name
+        QUALIFY row_number() OVER (PARTITION BY lt.GAME_ID, lt.TEAM_ABBREVIATION ORDER BY s.file DESC) = 1
+        ORDER BY lt.GAME_ID, lt.TEAM_ABBREVIATION
+    """).fetchone()[0]
+
+
+def unmapped_teams(conn, mapping_path=MAPPING_PATH):
+    """team names in raw.lines_source the mapping does not have, their lines never match the log"""
+    return [row[0] for row in conn.execute(f"""
+        SELECT DISTINCT TEAM FROM {SOURCE_TABLE}
+        WHERE TEAM NOT IN (SELECT raw_data_team_name FROM read_csv('{mapping_path}', header=true, all_varchar=true))
+        ORDER BY TEAM
+    """).fetchall()]
+
+
+def ingest_lines(conn, rescan=False, logger=None, metrics=None, data_path=DATA_PATH):
+    """
+    read the new / changed lines files into raw.lines_source (rows of changed or removed files are replaced),
+    then rebuild raw.lines_table. needs raw.log_table
+    rescan: read every file again
+    metrics: StageMetrics with profiling enabled on conn
+    returns (files read, rows in raw.lines_table)
+    """
+    logger = logger or Logger()
+    files = lines_files(data_path)
+    create_source_table(conn)
+    manifest = IngestManifest(conn)
+
+    changed = dict()
+    for path in files:
+        change = manifest.changed(path)
+        if change is None and not rescan:
+            continue
+        changed[path] = change or (os.stat(path), file_hash(path))
+    gone = [path for path, entry in manifest.entries.items() if entry['table_name'] == MANIFEST_NAME and path not in set(files)]
+
+    conn.execute("BEGIN TRANSACTION")
     try:
-        conn.execute(f"""
-            CREATE OR REPLACE TABLE raw_line_table as
-            SELECT
-            date::VARCHAR as date
-            ,team::VARCHAR as team
-            ,site::VARCHAR as ha
-            ,'o:team'::VARCHAR as other_team
-            ,TRY_CAST(line AS DOUBLE) as line
-            ,TRY_CAST(total AS DOUBLE) as total
-
-            FROM read_csv_auto('{file}')
-        """).df()
-    except Exception as e:
-        print(f"error: {e}")
-
-
-    new_data = conn.execute("""     
-            WITH RAW_DATA AS (
-             
-            SELECT CAST(
-            SUBSTRING(CAST(date AS VARCHAR), 1, 4) || '-' || 
-            SUBSTRING(CAST(date AS VARCHAR), 5, 2) || '-' || 
-            SUBSTRING(CAST(date AS VARCHAR), 7, 2)
-            as DATE
-            )
-            AS P_DATE,
-            
-            team,
-            line,
-            total,
-             
-            from raw_line_table
-             )
-             
-            select
-             lt.GAME_ID::int as GAME_ID,
-             lt.GAME_DATE,
-             lt.TEAM_ABBREVIATION,
-             rd.line as LINE,
-             rd.total as OU
-
-             from RAW_DATA rd
-             join LINE_TEAM_MAPPING_TABLE mp
-                on mp.raw_data_team_name = rd.team
-             inner join log_table lt
-             on lt.GAME_DATE::DATE == rd.P_DATE
-             and lt.TEAM_NAME = mp.log_table_team_name   
-             
-             """).df()
-    new_data.to_csv(f"Data/lines/LinesV1{file[-11:-4]}.csv",index=False)
-    print(f"WROTE FILE: Data/lines/LinesV1{file[-11:-4]}.csv")
-    conn.execute("drop table if exists raw_line_table")
-
-
-# %%
-conn.close()
-# %%
+        if changed or gone:
+            conn.execute(f"DELETE FROM {SOURCE_TABLE} WHERE list_contains(?, file)", [list(changed) + gone])
+        if changed:
+            read = conn.execute(f"INSERT INTO {SOURCE_TABLE} BY NAME {typed_lines(files_source(list(changed)))}").fetchone()[0]
+            if metrics:
+                metrics.profile(conn, f"read {len(changed)} lines files")
+                metrics.add(rows_in=read)
+            counts = dict(conn.execute(f"SELECT file, COUNT(*) FROM {SOURCE_TABLE} WHERE list_contains(?, file) GROUP BY file", [list(changed)]).fetchall())
+            for path, (stat, digest) in changed.items():
+                manifest.record(path, MANIFEST_NAME, stat, digest, 0, counts.get(path, 0), counts.get(path, 0))
+            logger.log_info(f"lines: read {read} rows from {len(changed)} files")
+        manifest.prune(MANIFEST_NAME, set(files))
+
+        rows = build_lines_table(conn)
+        if metrics:
+            metrics.profile(conn, f"build {LINES_TABLE}")
+            metrics.add(rows_out=rows)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    source_rows = conn.execute(f"SELECT COUNT(*) FROM {SOURCE_TABLE}").fetchone()[0]
+    logger.log_info(f"{LINES_TABLE}: {rows} team-games from {source_rows} lines rows")
+    unmapped = unmapped_teams(conn)
+    if unmapped:
+        logger.log_warning(f"lines: teams missing from {os.path.basename(MAPPING_PATH)}: {unmapped}")
+    return len(changed), rows
+
+
+def main(rescan=False):
+    logger = Logger()
+    with StageMetrics('lines', logger) as metrics:
+        conn = duckdb.connect(f"{DATABASE_PATH}/nba.db")
+        try:
+            metrics.enable_profiling(conn)
+            ingest_lines(conn, rescan=rescan, logger=logger, metrics=metrics)
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="lines files -> raw.lines_source -> raw.lines_table")
+    parser.add_argument('--rescan', action='store_true', help="read every lines file again, not only new / changed ones")
+    args = parser.parse_args()
+    main(rescan=args.rescan)
@@ -0,0 +1,270 @@
+"""
+columnar raw storage, an alternative to the per season CSV files
+
+layout: app/data/raw_parquet/{teams,players}/{endpoint}/{season}/part-*.parquet
+    each incremental batch is appended as its own small part file
+    compact() rewrites a season into one deduplicated file
+    _schema.json in every endpoint directory fixes the column types the first time they are seen
+
+readers go through raw_source(), which returns a duckdb relation for either format
+"""
+import argparse
+import fcntl
+import glob
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import duckdb
+
+from ..utils.logger import Logger
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DATA_PATH = os.environ.get('NBA_DATA_PATH', os.path.join(BASE_PATH, 'app', 'data', 'raw'))
+PARQUET_PATH = os.environ.get('NBA_PARQUET_PATH', os.path.join(BASE_PATH, 'app', 'data', 'raw_parquet'))
+
+RAW_FORMATS = ('csv', 'parquet')
+RAW_FORMAT = os.environ.get('NBA_RAW_FORMAT', 'csv')
+
+# key columns always get these types, GAME_ID stays the zero padded string stats.nba.com uses
+KEY_TYPES = {
+    'GAME_ID': 'VARCHAR',
+    'TEAM_ID': 'BIGINT',
+    'PLAYER_ID': 'BIGINT',
+    'DEF_PLAYER_ID': 'BIGINT'
+}
+# other integer columns are stored as DOUBLE, a later batch with a missing value must not change the type
+WIDEN_TYPES = {'TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT'}
+
+TABLE_CLASSES = ('teams', 'players')
+
+
+def csv_files(table_class, endpoint, data_path=DATA_PATH):
+    return sorted(glob.glob(os.path.join(data_path, table_class, endpoint, '*.csv')))
+
+
+def csv_source(files):
+    file_paths_str = ', '.join([f"'{f}'" for f in files])
+    return f"read_csv_auto([{file_paths_str}], union_by_name=true, files_to_sniff=-1, nullstr='')"
+
+
+def file_source(path):
+    """sql relation over a single raw file of either format"""
+    if path.endswith('.parquet'):
+        return f"read_parquet('{path}')"
+    return csv_source([path])
+
+
+def raw_files(table_class, endpoint, raw_format=RAW_FORMAT, data_path=DATA_PATH, parquet_path=PARQUET_PATH):
+    """every file raw_source() would read"""
+    if raw_format == 'parquet':
+        return ParquetStore(parquet_path).parts(table_class, endpoint)
+    return csv_files(table_class, endpoint, data_path)
+
+
+def raw_source(table_class, endpoint, raw_format=RAW_FORMAT, data_path=DATA_PATH, parquet_path=PARQUET_PATH):
+    """sql relation over every stored season of an endpoint, None when nothing is stored"""
+    if raw_format == 'parquet':
+        return ParquetStore(parquet_path).source(table_class, endpoint)
+    files = csv_files(table_class, endpoint, data_path)
+    return csv_source(files) if files else None
+
+
+class ParquetStore:
+
+    def __init__(self, root=PARQUET_PATH, logger=None):
+        self.root = root
+        self.logger = logger
+        self.conn = duckdb.connect()  # in memory, never holds a lock on nba.db
+
+    def endpoint_dir(self, table_class, endpoint):
+        return os.path.join(self.root, table_class, endpoint)
+
+    def season_dir(self, table_class, endpoint, season):
+        return os.path.join(self.endpoint_dir(table_class, endpoint), season)
+
+    def parts(self, table_class, endpoint, season='*'):
+        return sorted(glob.glob(os.path.join(self.season_dir(table_class, endpoint, season), '*.parquet')))
+
+    def seasons(self, table_class, endpoint):
+        return sorted(os.path.basename(os.path.dirname(p)) for p in set(self.parts(table_class, endpoint)))
+
+    def endpoints(self):
+        """endpoints stored for both teams and players"""
+        found = [set(os.listdir(os.path.join(self.root, tc))) if os.path.isdir(os.path.join(self.root, tc)) else set() for tc in TABLE_CLASSES]
+        return found[0] & found[1]
+
+    def source(self, table_class, endpoint, season='*'):
+        """read_parquet relation, None when nothing is stored"""
+        if not self.parts(table_class, endpoint, season):
+            return None
+        pattern = os.path.join(self.season_dir(table_class, endpoint, season), '*.parquet')
+        return f"read_parquet('{pattern}', union_by_name=true)"
+
+    def read_schema(self, table_class, endpoint):
+        path = os.path.join(self.endpoint_dir(table_class, endpoint), '_schema.json')
+        if not os.path.exists(path):
+            return dict()
+        with open(path) as f:
+            return json.load(f)
+
+    def write_schema(self, table_class, endpoint, schema):
+        """through a temp file and os.replace, a reader never sees a half written _schema.json"""
+        path = os.path.join(self.endpoint_dir(table_class, endpoint), '_schema.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(schema, f, indent=1)
+        os.replace(tmp_path, path)
+
+    @contextmanager
+    def schema_lock(self, table_class, endpoint):
+        """exclusive lock of an endpoint's _schema.json, season workers (--parallel-seasons) fix the same schema at once"""
+        endpoint_dir = self.endpoint_dir(table_class, endpoint)
+        os.makedirs(endpoint_dir, exist_ok=True)
+        with open(os.path.join(endpoint_dir, '_schema.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def fix_schema(self, table_class, endpoint, source):
+        """
+        column types for a batch: types already in _schema.json win, new columns are added the first time
+        they hold a value. returns the columns to write, columns that are all NULL so far are left out
+        """
+        described = self.conn.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+        counts = self.conn.execute(
+            "SELECT " + ", ".join(f'COUNT("{col}")' for col, *_ in described) + f" FROM {source}"
+        ).fetchone()
+
+        # read, add the new columns and write under the lock, so no worker loses another one's columns
+        with self.schema_lock(table_class, endpoint):
+            schema = self.read_schema(table_class, endpoint)
+            changed = False
+            for (col, col_type, *_), count in zip(described, counts):
+                if col in schema or not count:
+                    continue
+                if col in KEY_TYPES:
+                    col_type = KEY_TYPES[col]
+                elif col_type in WIDEN_TYPES:
+                    col_type = 'DOUBLE'
+                schema[col] = col_type
+                changed = True
+            if changed:
+                self.write_schema(table_class, endpoint, schema)
+
+        return {col: schema[col] for col, *_ in described if col in schema}
+
+    @staticmethod
+    def typed_select(columns):
+        select = []
+        for col, col_type in columns.items():
+            if col == 'GAME_ID':
+                select.append(f"lpad(CAST(\"{col}\" AS VARCHAR), 10, '0') AS \"{col}\"")
+            else:
+                select.append(f"CAST(\"{col}\" AS {col_type}) AS \"{col}\"")
+        return ",\n\t".join(select)
+
+    def write(self, table_class, endpoint, season, stats=None, source=None):
+        """
+        append a batch as a new part file, either a pandas frame (stats) or a duckdb relation (source)
+        returns the part file path, None for an empty batch
+        """
+        if stats is not None:
+            if stats.empty:
+                return None
+            self.conn.register('batch', stats)
+            source = 'batch'
+
+        columns = self.fix_schema(table_class, endpoint, source)
+        season_dir = self.season_dir(table_class, endpoint, season)
+        os.makedirs(season_dir, exist_ok=True)
+        part = os.path.join(season_dir, f'part-{time.time_ns()}-{os.getpid()}.parquet')
+        self.conn.execute(f"""
+            COPY (SELECT {self.typed_select(columns)} FROM {source})
+            TO '{part}' (FORMAT PARQUET, COMPRESSION ZSTD)
+        """)
+        if stats is not None:
+            self.conn.unregister('batch')
+        return part
+
+    def read_keys(self, table_class, endpoint, season, keys):
+        """key columns of everything stored for a season, as a pandas frame"""
+        source = self.source(table_class, endpoint, season)
+        if source is None:
+            return None
+        cols = ', '.join(f'"{k}"' for k in keys)
+        return self.conn.execute(f"SELECT {cols} FROM {source}").df()
+
+    def compact(self, table_class, endpoint, season, keys):
+        """rewrite a season's part files as one file, keeping one row per key, the one of the newest part"""
+        parts = self.parts(table_class, endpoint, season)
+        if len(parts) < 2:
+            return 0
+        season_dir = self.season_dir(table_class, endpoint, season)
+        tmp_path = os.path.join(season_dir, '_compacted.parquet.tmp')
+        part_list = ', '.join(f"'{p}'" for p in parts)
+        partition = ', '.join(f'"{k}"' for k in keys)
+        self.conn.execute(f"""
+            COPY (
+                SELECT * EXCLUDE (filename) FROM read_parquet([{part_list}], union_by_name=true, filename=true)
+                -- part-{{time_ns}}-{{pid}}.parquet, the part written last wins
+                QUALIFY ROW_NUMBER() OVER (
+                    PARTITION BY {partition}
+                    ORDER BY CAST(split_part(parse_filename(filename), '-', 2) AS BIGINT) DESC, filename DESC
+                ) = 1
+            ) TO '{tmp_path}' (FORMAT PARQUET, COMPRESSION ZSTD)
+        """)
+        # new file first, then drop the parts: a crash in between only leaves duplicates the next compaction removes
+        os.replace(tmp_path, os.path.join(season_dir, f'part-{time.time_ns()}-compacted.parquet'))
+        for part in parts:
+            os.remove(part)
+        return len(parts)
+
+    def compact_all(self):
+        from .get_data import DataWriter  # key columns per endpoint live with the writer
+        for table_class in TABLE_CLASSES:
+            for endpoint in sorted(self.endpoints()):
+                keys = DataWriter.key_columns(endpoint, table_class)
+                for season in self.seasons(table_class, endpoint):
+                    merged = self.compact(table_class, endpoint, season, keys)
+                    if merged and self.logger:
+                        self.logger.log_info(f"compacted {merged} parts for {table_class}/{endpoint}/{season}")
+
+    def migrate_csv(self, data_path=DATA_PATH):
+        """one time copy of every {table_class}/{endpoint}/{endpoint}{season}.csv into the store"""
+        for table_class in TABLE_CLASSES:
+            for endpoint_path in sorted(glob.glob(os.path.join(data_path, table_class, '*'))):
+                endpoint = os.path.basename(endpoint_path)
+                for csv_file in csv_files(table_class, endpoint, data_path):
+                    season = os.path.basename(csv_file)[len(endpoint):-len('.csv')]
+                    if self.parts(table_class, endpoint, season):
+                        if self.logger:
+                            self.logger.log_info(f"{table_class}/{endpoint}/{season} already migrated, skipping")
+                        continue
+                    self.write(table_class, endpoint, season, source=csv_source([csv_file]))
+                    if self.logger:
+                        self.logger.log_info(f"migrated {csv_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="parquet raw store maintenance")
+    parser.add_argument('command', choices=['migrate', 'compact'])
+    args = parser.parse_args()
+
+    logger = Logger()
+    store = ParquetStore(logger=logger)
+    if args.command == 'migrate':
+        logger.log_info(f"MIGRATING {DATA_PATH} TO {PARQUET_PATH}")
+        store.migrate_csv()
+    else:
+        logger.log_info(f"COMPACTING {PARQUET_PATH}")
+        store.compact_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,14 +7,18 @@ this files purpose is to
 import os
 import duckdb
 import glob
+import hashlib
+import argparse
 from ..utils.logger import Logger
+from ..utils.metrics import StageMetrics
+from .raw_store import file_source, raw_files, RAW_FORMAT, RAW_FORMATS
 
 
 
 BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 # Your data path inside the 'collection' directory
-DATA_PATH = os.path.join(BASE_PATH,  'app','data', 'raw')
-DATABASE_PATH = os.path.join(BASE_PATH, 'app','database')
+DATA_PATH = os.environ.get('NBA_DATA_PATH', os.path.join(BASE_PATH,  'app','data', 'raw'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app','database'))
 
 
 
@@ -37,103 +41,203 @@ PRIMARY_KEYS = {
     'lines': ('GAME_ID', 'TEAM_ABBREVIATION')
 }
 
-def update_duckdb():
-    """
-    Check files and update DuckDB database with missing games.
-    """
-    logger = Logger()
-    logger.log_info("Updating DuckDB")
-    conn = None
-    try:
-        conn = duckdb.connect(f"{DATABASE_PATH}/nba.db")
-
-        for endpoint in ENDPOINTS:
-            team_table_exist = conn.sql(f"""
-                SELECT COUNT(*) 
-                FROM INFORMATION_SCHEMA.TABLES 
-                WHERE TABLE_SCHEMA = 'raw' 
-                  AND TABLE_NAME = 'teams_{endpoint}'
-            """).fetchone()[0]
-
-            player_table_exist = conn.sql(f"""
-                SELECT COUNT(*) 
-                FROM INFORMATION_SCHEMA.TABLES 
-                WHERE TABLE_SCHEMA = 'raw' 
-                  AND TABLE_NAME = 'players_{endpoint}'
-            """).fetchone()[0]
+MANIFEST_TABLE = 'raw.ingest_manifest'
+HASH_CHUNK_SIZE = 1 << 20
 
-            if not (team_table_exist and player_table_exist):
-                logger.log_error(f"No {endpoint} table in DuckDB")
-                continue
+def file_hash(path, size=None):
+    """sha256 of the file content, or of its first size bytes"""
+    sha = hashlib.sha256()
+    left = size
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE if left is None else min(HASH_CHUNK_SIZE, left)), b''):
+            sha.update(chunk)
+            if left is not None:
+                left -= len(chunk)
+    return sha.hexdigest()
 
-            team_path = f"{DATA_PATH}/teams/{endpoint}/"
-            player_path = f"{DATA_PATH}/players/{endpoint}/"
-
-            team_csv_files = glob.glob(f"{team_path}*.csv")
-            player_csv_files = glob.glob(f"{player_path}*.csv")
-
-            team_file_paths_str = ", ".join([f"'{file}'" for file in team_csv_files])
-            player_file_paths_str = ", ".join([f"'{file}'" for file in player_csv_files])
 
-            # --- Teams ---
-            team_missing_count = conn.sql(f"""
-                SELECT COUNT(*) AS cnt
-                FROM (
-                    SELECT n.GAME_ID, n.TEAM_ID
-                    FROM read_csv_auto([{team_file_paths_str}], union_by_name=true, files_to_sniff=-1, nullstr='') n
-                    LEFT JOIN raw.teams_{endpoint} t
-                      ON n.GAME_ID = t.GAME_ID
-                     AND n.TEAM_ID = t.TEAM_ID
-                    WHERE t.GAME_ID IS NULL
-                )
-            """).fetchone()[0]
-
-            if team_missing_count > 0:
-                cur = conn.execute(f"""
-                    INSERT INTO raw.teams_{endpoint}
-                    SELECT n.*
-                    FROM read_csv_auto([{team_file_paths_str}], union_by_name=true, files_to_sniff=-1, nullstr='') n
-                    LEFT JOIN raw.teams_{endpoint} t
-                      ON n.GAME_ID = t.GAME_ID
-                     AND n.TEAM_ID = t.TEAM_ID
-                    WHERE t.GAME_ID IS NULL
-                """)
-                logger.log_info(f"{endpoint}: inserted {team_missing_count} new team rows")
-
-            # --- Players ---
-            player_missing_count = conn.sql(f"""
-                SELECT COUNT(*) AS cnt
-                FROM (
-                    SELECT n.GAME_ID, n.PLAYER_ID
-                    FROM read_csv_auto([{player_file_paths_str}], union_by_name=true, files_to_sniff=-1, nullstr='') n
-                    LEFT JOIN raw.players_{endpoint} t
-                      ON n.GAME_ID = t.GAME_ID
-                     AND n.PLAYER_ID = t.PLAYER_ID
-                    WHERE t.GAME_ID IS NULL
-                    AND n.PLAYER_ID IS NOT NULL
-                )
-            """).fetchone()[0]
+class IngestManifest:
+    """
+    raw.ingest_manifest, one row per raw file ingested into duckdb
+        path, size, mtime, sha256 of the content, the table it went into,
+        row_start / row_end: the file rows this ingest covered. a season csv that only had rows appended (its first
+            size bytes still hash to content_hash) is read from the old row_end, the rows before it are not inserted again
+        rows_inserted: rows that were not in the table yet
+
+    a file whose size and mtime match its row is skipped without being opened,
+    the hash is only computed when they differ so a touched but identical file is not re-read
+    """
 
-            if player_missing_count > 0:
-                cur = conn.execute(f"""
-                    INSERT INTO raw.players_{endpoint}
-                    SELECT n.*
-                    FROM read_csv_auto([{player_file_paths_str}], union_by_name=true, files_to_sniff=-1, nullstr='') n
-                    LEFT JOIN raw.players_{endpoint} t
-                      ON n.GAME_ID = t.GAME_ID
-                     AND n.PLAYER_ID = t.PLAYER_ID
-                    WHERE t.GAME_ID IS NULL
-                    AND n.PLAYER_ID IS NOT NULL
-                """)
-                logger.log_info(f"{endpoint}: inserted {player_missing_count} new player rows")
+    def __init__(self, conn):
+        self.conn = conn
+        self.conn.execute("CREATE SCHEMA IF NOT EXISTS raw")
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {MANIFEST_TABLE} (
+                path VARCHAR,
+                table_name VARCHAR,
+                size BIGINT,
+                mtime DOUBLE,
+                content_hash VARCHAR,
+                row_start BIGINT,
+                row_end BIGINT,
+                rows_inserted BIGINT,
+                ingested_at TIMESTAMP
+            )
+        """)
+        cur = self.conn.execute(f"SELECT * FROM {MANIFEST_TABLE}")
+        columns = [d[0] for d in cur.description]
+        self.entries = {row[0]: dict(zip(columns, row)) for row in cur.fetchall()}
+
+    def changed(self, path):
+        """(os.stat_result, content hash) when the file has to be ingested, None when it is unchanged"""
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            return None
+        digest = file_hash(path)
+        if entry and entry['content_hash'] == digest:
+            self.record(path, entry['table_name'], stat, digest, entry['row_start'], entry['row_end'], entry['rows_inserted'])
+            return None
+        return stat, digest
+
+    def row_end(self, path):
+        entry = self.entries.get(path)
+        return entry['row_end'] if entry else 0
+
+    def appended_from(self, path):
+        """the stored row_end when path is a csv the last ingest saw a prefix of (rows were only appended since), 0 otherwise"""
+        entry = self.entries.get(path)
+        if not entry or not path.endswith('.csv') or not entry['row_end'] or os.stat(path).st_size <= entry['size']:
+            return 0
+        return entry['row_end'] if file_hash(path, entry['size']) == entry['content_hash'] else 0
+
+    def record(self, path, table_name, stat, digest, row_start, row_end, rows_inserted):
+        self.conn.execute(f"DELETE FROM {MANIFEST_TABLE} WHERE path = ?", [path])
+        self.conn.execute(
+            f"INSERT INTO {MANIFEST_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, current_timestamp::TIMESTAMP)",
+            [path, table_name, stat.st_size, stat.st_mtime, digest, row_start, row_end, rows_inserted]
+        )
+        self.entries[path] = {
+            'path': path, 'table_name': table_name, 'size': stat.st_size, 'mtime': stat.st_mtime,
+            'content_hash': digest, 'row_start': row_start, 'row_end': row_end, 'rows_inserted': rows_inserted
+        }
+
+    def prune(self, table_name, paths):
+        """drop rows of files that are gone (compacted parquet parts, deleted seasons)"""
+        gone = [p for p, e in self.entries.items() if e['table_name'] == table_name and p not in paths]
+        for path in gone:
+            self.conn.execute(f"DELETE FROM {MANIFEST_TABLE} WHERE path = ?", [path])
+            del self.entries[path]
+        return len(gone)
+
+
+def ingest_file(conn, table_class, endpoint, path, metrics=None, skip_rows=0):
+    """
+    insert the rows of one raw file that are not in raw.{table_class}_{endpoint} yet
+    GAME_ID is already BIGINT in the table (make_tables.NORMALIZED_TYPES), only the file side is cast
+    the file is read once into a temp table, skip_rows: leave out its first rows (already ingested, see
+    IngestManifest.appended_from), only the rest is anti-joined. returns (rows in the file, rows inserted)
+    metrics: StageMetrics with profiling enabled on conn, the file read and the insert are profiled
+    """
+    keys = PRIMARY_KEYS[table_class]
+    join = "\n AND ".join(
+        f"CAST(n.{k} AS BIGINT) = t.{k}" if k == 'GAME_ID' else f"n.{k} = t.{k}" for k in keys
+    )
+    conn.execute(f"CREATE OR REPLACE TEMP TABLE ingest_batch AS SELECT * FROM {file_source(path)} OFFSET {int(skip_rows)}")
+    if metrics:
+        metrics.profile(conn, f"read {os.path.basename(path)}")
+    file_rows = skip_rows + conn.execute("SELECT COUNT(*) FROM ingest_batch").fetchone()[0]
+    inserted = conn.execute(f"""
+        INSERT INTO raw.{table_class}_{endpoint} BY NAME
+        SELECT n.*
+        FROM ingest_batch n
+        LEFT JOIN raw.{table_class}_{endpoint} t
+          ON {join}
+        WHERE t.GAME_ID IS NULL
+        {"AND n.PLAYER_ID IS NOT NULL" if table_class == 'players' else ""}
+    """).fetchone()[0]
+    if metrics:
+        metrics.profile(conn, f"insert {table_class}_{endpoint}")
+        metrics.add(rows_in=file_rows - skip_rows, rows_out=inserted)
+    conn.execute("DROP TABLE ingest_batch")
+    return file_rows, inserted
+
+
+def ingest_files(conn, manifest, table_class, endpoint, files, rescan, logger, metrics=None):
+    """ingest_file for every file of raw.{table_class}_{endpoint} that changed since the manifest saw it"""
+    table_name = f'{table_class}_{endpoint}'
+    for path in files:
+        change = manifest.changed(path)
+        if change is None and not rescan:
+            continue
+        stat, digest = change or (os.stat(path), file_hash(path))
+        row_start = 0 if rescan else manifest.appended_from(path)
+
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            file_rows, inserted = ingest_file(conn, table_class, endpoint, path, metrics, skip_rows=row_start)
+            manifest.record(path, table_name, stat, digest, row_start, file_rows, inserted)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if inserted:
+            logger.log_info(f"{table_name}: inserted {inserted} new rows from {os.path.basename(path)}")
+
+    pruned = manifest.prune(table_name, set(files))
+    if pruned:
+        logger.log_info(f"{table_name}: dropped {pruned} manifest rows for files that no longer exist")
+
+
+def update_duckdb(raw_format=RAW_FORMAT, rescan=False):
+    """
+    Check files and update DuckDB database with missing games.
+    raw_format: read the season csv files or the parquet store (the log files are always csv)
+    rescan: ignore the ingest manifest and anti-join every file again
+    only files that are new or changed since the last run (raw.ingest_manifest) are read
+    the box score endpoints and raw.log_table, the lines files go in through process_raw_line (lines stage)
+    returns 1 when the update failed (logged), 0 otherwise
+    """
+    logger = Logger()
+    logger.log_info(f"Updating DuckDB from {raw_format}")
+    with StageMetrics('update_duckdb', logger) as metrics:
+        conn = None
+        try:
+            conn = duckdb.connect(f"{DATABASE_PATH}/nba.db")
+            metrics.enable_profiling(conn)
+            manifest = IngestManifest(conn)
+            tables = {row[0] for row in conn.execute("""
+                SELECT TABLE_NAME
+                FROM INFORMATION_SCHEMA.TABLES
+                WHERE TABLE_SCHEMA = 'raw'
+            """).fetchall()}
+
+            for endpoint in ENDPOINTS:
+                if not (f'teams_{endpoint}' in tables and f'players_{endpoint}' in tables):
+                    logger.log_error(f"No {endpoint} table in DuckDB")
+                    continue
+
+                for table_class in ('teams', 'players'):
+                    files = raw_files(table_class, endpoint, raw_format)
+                    if not files:
+                        logger.log_warning(f"No {raw_format} files for {table_class}_{endpoint}")
+                        continue
+                    ingest_files(conn, manifest, table_class, endpoint, files, rescan, logger, metrics)
+
+            # the season logs are rewritten whole by get_data.update_log, new games are anti-joined in like box scores
+            if 'log_table' in tables:
+                ingest_files(conn, manifest, 'log', 'table', sorted(glob.glob(os.path.join(DATA_PATH, 'log', '*.csv'))), rescan, logger, metrics)
+            else:
+                logger.log_error("No log_table in DuckDB")
 
-        conn.close()
-    except Exception as e:
-        logger.log_error(f"Updating DuckDB failed: {e}")
-        if conn:
             conn.close()
+        except Exception as e:
+            logger.log_error(f"Updating DuckDB failed: {e}")
+            metrics.error = f"{type(e).__name__}: {e}"
+            if conn:
+                conn.close()
 
-    return 0
+    return 1 if metrics.error else 0
 
 
 def test_update_duckdb():
@@ -222,5 +326,9 @@ WHERE t.GAME_ID IS NULL;
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="insert rows from the raw files that are not in duckdb yet")
+    parser.add_argument('--raw-format', choices=RAW_FORMATS, default=RAW_FORMAT, help="season csv files or the parquet store")
+    parser.add_argument('--rescan', action='store_true', help="ignore the ingest manifest and check every file")
+    args = parser.parse_args()
     # test_update_duckdb()
-    update_duckdb()
+    update_duckdb(raw_format=args.raw_format, rescan=args.rescan)
@@ -0,0 +1,122 @@
+"""
+equality check for the incremental (INCREMENTAL_BY_PARTITION on SEASON_ID) sqlmesh models
+
+every model's query is evaluated again as a FULL model would be (the @stale_seasons filter replaced by TRUE)
+and compared to what the incremental runs left in the table, row for row (EXCEPT ALL both ways).
+the query is also run as a `sqlmesh run` evaluates it, with the condition @stale_seasons renders against the
+model's table, so a condition that does not bind fails here too. its rows are the ones the next run recomputes
+
+run after `sqlmesh run` / `sqlmesh plan` against the same database:
+    python -m app.sql.incremental_check
+    python -m app.sql.incremental_check --model aggs.player_averages --season 22024
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import duckdb
+
+from .sqlmesh.macros.schedule import games_in_last_days_sql
+from .sqlmesh.macros.seasons import stale_seasons_sql
+from ..utils.logger import Logger
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app', 'database'))
+MODELS_PATH = os.path.join(BASE_PATH, 'app', 'sql', 'sqlmesh', 'models')
+
+# model name -> file, upstream models first
+INCREMENTAL_MODELS = {
+    'base.players_processed': 'base/players_processed.sql',
+    'base.teams_processed': 'base/teams_processed.sql',
+    'aggs.player_averages': 'aggs/player_averages.sql',
+    'aggs.player_averages_last_10': 'aggs/player_averages_L10.sql',
+    'aggs.player_averages_ewma': 'aggs/player_averages_ewma.sql',
+    'aggs.player_sums': 'aggs/player_sums.sql',
+    'aggs.team_averages': 'aggs/team_averages.sql',
+    'aggs.team_averages_last_10': 'aggs/team_averages_L10.sql',
+    'aggs.team_averages_ewma': 'aggs/team_averages_ewma.sql',
+    'fantasy.base_data': 'fantasy/base.sql',
+    'fantasy.z_scores': 'fantasy/z_scores.sql'
+}
+
+MACRO_CALL = re.compile(r'@stale_seasons\(([^)]*)\)', re.IGNORECASE)
+GAMES_IN_LAST_DAYS_CALL = re.compile(r'@games_in_last_days\(([^)]*)\)', re.IGNORECASE)
+
+
+def games_in_last_days(match):
+    days, date_column, *partition_by = [arg.strip() for arg in match.group(1).split(',')]
+    return games_in_last_days_sql(days, date_column, partition_by or ('TEAM_ID', 'SEASON_ID'))
+
+
+def full_query(model_file, models_path=MODELS_PATH, model_name=None):
+    """
+    the model's query with the MODEL block dropped and the incremental filter turned off,
+    model_name: the filter rendered as on a `sqlmesh run` of that table instead
+    """
+    with open(os.path.join(models_path, model_file)) as f:
+        sql = f.read()
+    sql = sql[sql.index(');', sql.upper().index('MODEL (')) + 2:]  # MODEL ( ... );
+    sql = GAMES_IN_LAST_DAYS_CALL.sub(games_in_last_days, sql)
+    stale = (lambda match: stale_seasons(match, model_name)) if model_name else 'TRUE'
+    return MACRO_CALL.sub(stale, sql).strip().rstrip(';')
+
+
+def stale_seasons(match, model_name):
+    """@stale_seasons(source[, match_games := FALSE]) as the macro renders it when evaluating model_name"""
+    source, *options = [arg.strip() for arg in match.group(1).split(',')]
+    match_games = not any(re.fullmatch(r'match_games\s*:=\s*false', option, re.IGNORECASE) for option in options)
+    return f"({stale_seasons_sql(source, model_name, match_games)})"
+
+
+def stale_rows(conn, model_name, model_file):
+    """rows the next run's query returns (the stale seasons), raises when the rendered query does not bind"""
+    return conn.execute(f"SELECT COUNT(*) FROM ({full_query(model_file, model_name=model_name)})").fetchone()[0]
+
+
+def compare(conn, model_name, model_file, seasons=None):
+    """(rows only in the FULL evaluation, rows only in the incremental table, seconds)"""
+    season_filter = ""
+    if seasons:
+        season_filter = "WHERE CAST(SEASON_ID AS VARCHAR) IN (" + ', '.join(f"'{s}'" for s in seasons) + ")"
+    start = time.perf_counter()
+    conn.execute(f"CREATE OR REPLACE TEMP TABLE full_result AS SELECT * FROM ({full_query(model_file)}) {season_filter}")
+    conn.execute(f"CREATE OR REPLACE TEMP TABLE incremental_result AS SELECT * FROM {model_name} {season_filter}")
+    only_full = conn.execute("SELECT COUNT(*) FROM (SELECT * FROM full_result EXCEPT ALL SELECT * FROM incremental_result)").fetchone()[0]
+    only_incremental = conn.execute("SELECT COUNT(*) FROM (SELECT * FROM incremental_result EXCEPT ALL SELECT * FROM full_result)").fetchone()[0]
+    return only_full, only_incremental, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="check the incremental sqlmesh models against a FULL evaluation of their query")
+    parser.add_argument('--db', default=os.path.join(DATABASE_PATH, 'nba.db'))
+    parser.add_argument('--model', nargs='+', choices=list(INCREMENTAL_MODELS), default=list(INCREMENTAL_MODELS))
+    parser.add_argument('--season', nargs='+', default=None, help="only compare these SEASON_IDs")
+    args = parser.parse_args()
+
+    logger = Logger()
+    conn = duckdb.connect(args.db, read_only=True)
+    mismatched = []
+    for model_name in args.model:
+        try:
+            stale = stale_rows(conn, model_name, INCREMENTAL_MODELS[model_name])
+        except duckdb.Error as e:
+            logger.log_error(f"{model_name}: the query of a sqlmesh run fails: {e}")
+            print(f"{'ERROR':9} {model_name}: the query of a sqlmesh run fails: {e}")
+            mismatched.append(model_name)
+            continue
+        logger.log_info(f"{model_name}: {stale} rows in stale seasons")
+        only_full, only_incremental, seconds = compare(conn, model_name, INCREMENTAL_MODELS[model_name], args.season)
+        result = "OK" if not (only_full or only_incremental) else "MISMATCH"
+        logger.log_info(f"{model_name}: {result}, {only_full} rows only in FULL, {only_incremental} only in incremental ({seconds:.1f}s)")
+        print(f"{result:9} {model_name}: {only_full} rows only in FULL, {only_incremental} rows only in incremental")
+        if result != "OK":
+            mismatched.append(model_name)
+    conn.close()
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import glob
 import time
@@ -5,6 +6,8 @@ import duckdb
 import os
 
 from ..utils.logger import Logger
+from ..utils.metrics import StageMetrics
+from ..scripts.make_tables import PRIMARY_KEYS
 
 ## import sqlmesh stuff or just write out to sqlmesh model folder
 
@@ -12,10 +15,17 @@ from ..utils.logger import Logger
 BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 # Your data path inside the 'collection' directory
-DATA_PATH = os.path.join(BASE_PATH,  'app','data', 'raw')
-DATABASE_PATH = os.path.join(BASE_PATH, 'app','database')
-SQLMESH_PATH = os.path.join(BASE_PATH, 'app', 'sqlmesh')
-SQL_PATH = os.path.join(BASE_PATH, 'app', 'sql','sql')
+DATA_PATH = os.environ.get('NBA_DATA_PATH', os.path.join(BASE_PATH,  'app','data', 'raw'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app','database'))
+SQLMESH_PATH = os.path.join(BASE_PATH, 'app', 'sql', 'sqlmesh')
+SQL_PATH = os.environ.get('NBA_SQL_PATH', os.path.join(BASE_PATH, 'app', 'sql','sql'))
+# per schema tables of CombinedGenerator incremental refreshes: a fingerprint of every (raw source, game) each table
+# was last written from, and the raw rowid each source was read up to. raw box score / log tables only grow (update_duckdb
+# and get_data insert), a refresh only hashes the games of the rows past the watermark and redoes the ones that differ
+SOURCES_TABLE = 'refresh_sources'
+WATERMARK_TABLE = 'refresh_watermarks'
+# rebuilt whole on every ingest (process_raw_line), no rowid watermark, two rows a game so hashed whole every refresh
+REBUILT_SOURCES = ('lines_table',)
 
 
 # print(f"Data Path: {SQLMESH_PATH}")
@@ -25,21 +35,154 @@ SQL_PATH = os.path.join(BASE_PATH, 'app', 'sql','sql')
 # print(f"Data Path: {DATABASE_PATH}")
 
 
+# aggs window models: python -m app.sql.sql_generator windows writes one sqlmesh model per entry of WINDOW_MODELS
+PLAYER_COLUMNS = [
+    'PLAYER_ID', 'SEASON_ID', 'TEAM_ID', 'GAME_ID', 'NEXT_GAME_ID', 'GAME_DATE', 'PLAYER_NAME', 'TEAM_NAME',
+    'TEAM_ABBREVIATION', 'GAME_COUNT', 'GAMES_PLAYED', 'PLAYED_FLAG', 'IS_LAST_GAME'
+]
+TEAM_COLUMNS = [
+    'SEASON_ID', 'SEASON_TYPE', 'TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_NAME', 'TEAM_CITY', 'NEXT_GAME_ID', 'GAME_ID',
+    'GAME_NUMBER', 'IS_LAST_TEAM_GAME', 'GAME_DATE', 'MATCHUP', 'HOME_TEAM', 'AWAY_TEAM', 'IS_HOME', 'LINE', 'OU', 'WL',
+    'SCORE_DIFF', 'OPP_PTS', 'COVER_RESULT', 'OU_RESULT', 'WINS_SO_FAR', 'LOSSES_SO_FAR', 'LAST_10_WIN_PCT',
+    'WINS_VS_OPPONENT', 'LOSSES_VS_OPPONENT'
+]
+# box score columns shared by players and teams (advanced, misc, scoring endpoints)
+BOX_SCORE_METRICS = [
+    'E_OFF_RATING', 'OFF_RATING', 'E_DEF_RATING', 'DEF_RATING', 'E_NET_RATING', 'NET_RATING', 'AST_PCT', 'AST_TOV',
+    'AST_RATIO', 'OREB_PCT', 'DREB_PCT', 'REB_PCT', 'TM_TOV_PCT', 'EFG_PCT', 'TS_PCT', 'USG_PCT', 'E_USG_PCT', 'E_PACE',
+    'PACE', 'PACE_PER40', 'POSS', 'PIE', 'FTA_RATE', 'OPP_EFG_PCT', 'OPP_FTA_RATE', 'OPP_TOV_PCT', 'OPP_OREB_PCT',
+    'PTS_OFF_TOV', 'PTS_2ND_CHANCE', 'PTS_FB', 'PTS_PAINT', 'OPP_PTS_OFF_TOV', 'OPP_PTS_2ND_CHANCE', 'OPP_PTS_FB',
+    'OPP_PTS_PAINT', 'BLKA', 'PFD', 'PCT_FGA_2PT', 'PCT_FGA_3PT', 'PCT_PTS_2PT', 'PCT_PTS_2PT_MR', 'PCT_PTS_3PT',
+    'PCT_PTS_FB', 'PCT_PTS_FT', 'PCT_PTS_OFF_TOV', 'PCT_PTS_PAINT', 'PCT_AST_2PM', 'PCT_UAST_2PM', 'PCT_AST_3PM',
+    'PCT_UAST_3PM', 'PCT_AST_FGM', 'PCT_UAST_FGM'
+]
+PLAYER_METRICS = ['MINUTES', 'PLUS_MINUS', 'PTS', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'PF'] + BOX_SCORE_METRICS
+TEAM_METRICS = ['PTS', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PLUS_MINUS'] + BOX_SCORE_METRICS
+
+PLAYER_WINDOW = dict(source='base.players_processed', partition=['PLAYER_ID', 'SEASON_ID'], columns=PLAYER_COLUMNS,
+                     metrics=PLAYER_METRICS, played='PLAYED_FLAG = 1')
+TEAM_WINDOW = dict(source='base.teams_processed', partition=['SEASON_ID', 'TEAM_ID'], columns=TEAM_COLUMNS,
+                   metrics=TEAM_METRICS, played=None)
+
+# variant: 'cumulative' (season to date), 'last' (last n games, DNPs count as games) or 'ewma' (span n, weights decay per game)
+WINDOW_MODELS = [
+    dict(PLAYER_WINDOW, name='aggs.player_averages', file='aggs/player_averages.sql', variant='cumulative'),
+    dict(PLAYER_WINDOW, name='aggs.player_averages_last_10', file='aggs/player_averages_L10.sql', variant='last', n=10),
+    dict(PLAYER_WINDOW, name='aggs.player_averages_ewma', file='aggs/player_averages_ewma.sql', variant='ewma', n=10),
+    dict(TEAM_WINDOW, name='aggs.team_averages', file='aggs/team_averages.sql', variant='cumulative'),
+    dict(TEAM_WINDOW, name='aggs.team_averages_last_10', file='aggs/team_averages_L10.sql', variant='last', n=10),
+    dict(TEAM_WINDOW, name='aggs.team_averages_ewma', file='aggs/team_averages_ewma.sql', variant='ewma', n=10),
+]
+
+
 class  SQLMeshModelGenerator():
+    """
+    writes window models from a column spec (WINDOW_MODELS) instead of hand expanded sql
+
+    every metric is aggregated over one named WINDOW, so the model reads as one window definition
+    and duckdb sorts each partition once
+    """
 
     def __init__(self, logger):
         self.logger = logger
-    
-    def create_model(self, schema, sql_code):
-        return None
+
+    @staticmethod
+    def frame(spec):
+        if spec['variant'] == 'last':
+            return f"ROWS BETWEEN {spec['n'] - 1} PRECEDING AND CURRENT ROW"
+        return "ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW"
+
+    @staticmethod
+    def value(spec, metric):
+        """the metric, NULL for games the player did not play"""
+        if spec['played']:
+            return f"CASE WHEN {spec['played']} THEN {metric} END"
+        return metric
+
+    def aggregate(self, spec, metric, named_window=True):
+        over = "w" if named_window else f"({self.window(spec)})"
+        value = self.value(spec, metric)
+        if spec['variant'] == 'ewma':
+            # weights grow by 1 / (1 - alpha) per game, so the newest game weighs the most; the decay cancels out of the ratio
+            counted = ' AND '.join(([spec['played']] if spec['played'] else []) + [f"{metric} IS NOT NULL"])
+            return (f"SUM(CASE WHEN {counted} THEN {metric} * EWMA_WEIGHT END) OVER {over}\n"
+                    f"        / SUM(CASE WHEN {counted} THEN EWMA_WEIGHT END) OVER {over} AS EWMA_{metric}")
+        return f"AVG({value}) OVER {over} AS AVG_{metric}"
+
+    @staticmethod
+    def order(spec):
+        return "GAME_DATE"  # DATE since raw ingest (make_tables.NORMALIZED_TYPES)
+
+    def window(self, spec):
+        return f"PARTITION BY {', '.join(spec['partition'])} ORDER BY {self.order(spec)} {self.frame(spec)}"
+
+    def window_query(self, spec, source_filter=None, named_window=True):
+        """
+        select for one WINDOW_MODELS entry
+        source_filter: WHERE condition on the source, defaults to the incremental @stale_seasons filter
+        named_window: False writes the window out in every OVER (), the hand expanded form, for benchmarks
+        """
+        source_filter = source_filter or f"@stale_seasons({spec['source']})"
+        select = ",\n    ".join(spec['columns'] + [self.aggregate(spec, m, named_window) for m in spec['metrics']])
+
+        if spec['variant'] == 'ewma':
+            alpha = 2 / (spec['n'] + 1)
+            source = f"""(
+    SELECT
+        *,
+        POWER({1 / (1 - alpha):.10f}, ROW_NUMBER() OVER (PARTITION BY {', '.join(spec['partition'])} ORDER BY {self.order(spec)})) AS EWMA_WEIGHT
+    FROM {spec['source']}
+    WHERE {source_filter}
+) AS weighted"""
+            where = ""
+        else:
+            source = spec['source']
+            where = f"\nWHERE {source_filter}"
+
+        window = ""
+        if named_window:
+            window = f"""
+WINDOW w AS (
+    PARTITION BY {', '.join(spec['partition'])}
+    ORDER BY {self.order(spec)}
+    {self.frame(spec)}
+)"""
+        return f"""SELECT
+    {select}
+FROM {source}{where}{window}"""
+
+    def window_model(self, spec):
+        return f"""MODEL (
+  name {spec['name']},
+  kind INCREMENTAL_BY_PARTITION,
+  partitioned_by SEASON_ID
+);
+-- generated by `python -m app.sql.sql_generator windows` from WINDOW_MODELS in app/sql/sql_generator.py, edit the spec there
+
+{self.window_query(spec)};
+"""
+
+    def create_model(self, model_file, sql_code):
+        path = os.path.join(SQLMESH_PATH, 'models', model_file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(sql_code)
+        self.logger.log_info(f"wrote sqlmesh model {model_file}")
+
+    def write_window_models(self, specs=WINDOW_MODELS):
+        for spec in specs:
+            self.create_model(spec['file'], self.window_model(spec))
 
 
 
 class SQLGenerator():
 
-    def __init__(self, logger):
+    def __init__(self, logger, metrics=None):
         self.logger = logger
         self.conn = duckdb.connect(f'{DATABASE_PATH}/nba.db')
+        self.metrics = metrics  # StageMetrics, every table build / refresh is profiled
+        if metrics:
+            metrics.enable_profiling(self.conn)
     
 
     def schema_exists(self, schema_name):
@@ -51,7 +194,15 @@ class SQLGenerator():
         """).fetchall()
         return len(result) > 0
 
-    def write_sql(self, schema, name, sql):
+    def table_exists(self, schema, name):
+        return self.conn.execute(f"""
+            SELECT COUNT(*)
+            FROM information_schema.tables
+            WHERE table_schema = '{schema}' AND table_name = '{name}'
+        """).fetchone()[0] > 0
+
+    def write_sql(self, schema, name, sql, sources=()):
+        """sources: raw tables sql reads, fingerprinted for the next incremental refresh (see refresh_games)"""
         schema_dir = os.path.join(SQL_PATH, schema)
         os.makedirs(schema_dir, exist_ok=True)
         if not self.schema_exists(schema):
@@ -62,7 +213,142 @@ class SQLGenerator():
         self.logger.log_info(f'writing new table {schema}.{name}')
         with open(os.path.join(SQL_PATH, schema, name+'.sql'), 'w') as f:
             f.write(f"""CREATE OR REPLACE TABLE {schema}.{name} AS\n{sql}""")
-            self.conn.execute(f"""CREATE OR REPLACE TABLE {schema}.{name} AS\n{sql}""")
+            rows = self.conn.execute(f"""CREATE OR REPLACE TABLE {schema}.{name} AS\n{sql}""").fetchone()[0]
+        if self.metrics:
+            self.metrics.profile(self.conn, f"create {schema}.{name}", scanned=True)
+            self.metrics.add(rows_out=rows)
+        if sources:
+            self.source_fingerprints({source: None for source in sources})
+            self.record_sources(schema, name)
+
+    def source_scopes(self, schema, name, sources):
+        """
+        {source: rowid past which its rows are new, None: hash it whole} for the sources with rows schema.name was not
+        written from: never fingerprinted, smaller than at the last refresh, or in REBUILT_SOURCES. unchanged sources are left out
+        """
+        marks = dict()
+        if self.table_exists(schema, WATERMARK_TABLE):
+            marks = dict(self.conn.execute(f"SELECT source, max_rowid FROM {schema}.{WATERMARK_TABLE} WHERE table_name = '{name}'").fetchall())
+        scopes = dict()
+        for source in sources:
+            mark = marks.get(source)
+            if mark is None or source in REBUILT_SOURCES:
+                scopes[source] = None
+                continue
+            current = self.conn.execute(f"SELECT COALESCE(MAX(rowid), -1) FROM raw.{source}").fetchone()[0]
+            if current < mark:
+                scopes[source] = None
+            elif current > mark:
+                scopes[source] = mark
+        return scopes
+
+    def source_fingerprints(self, scopes):
+        """
+        temp table source_fingerprints: rows and a hash of their content per (raw source, GAME_ID), for the games of
+        every source in scopes (source_scopes), temp table source_marks: the rowid each source is read up to
+        """
+        scans, marks = [], []
+        for source, mark in scopes.items():
+            games = f"WHERE GAME_ID IN (SELECT GAME_ID FROM raw.{source} WHERE rowid > {int(mark)}) " if mark is not None else ""
+            scans.append(f"SELECT '{source}' AS source, CAST(GAME_ID AS VARCHAR) AS GAME_ID, COUNT(*) AS rows, SUM(hash(t)) AS fingerprint FROM raw.{source} t {games}GROUP BY ALL")
+            marks.append(f"SELECT '{source}' AS source, {'TRUE' if mark is None else 'FALSE'} AS whole, COALESCE(MAX(rowid), -1) AS max_rowid FROM raw.{source}")
+        if not scans:
+            scans = ["SELECT NULL::VARCHAR AS source, NULL::VARCHAR AS GAME_ID, NULL::BIGINT AS rows, NULL::HUGEINT AS fingerprint WHERE FALSE"]
+            marks = ["SELECT NULL::VARCHAR AS source, NULL::BOOLEAN AS whole, NULL::BIGINT AS max_rowid WHERE FALSE"]
+        self.conn.execute("CREATE OR REPLACE TEMP TABLE source_fingerprints AS\n" + "\nUNION ALL\n".join(scans))
+        self.conn.execute("CREATE OR REPLACE TEMP TABLE source_marks AS\n" + "\nUNION ALL\n".join(marks))
+
+    def record_sources(self, schema, name):
+        """source_fingerprints / source_marks are what schema.name now holds, only rows past the marks are looked at next refresh"""
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {schema}.{SOURCES_TABLE} (
+                table_name VARCHAR,
+                source VARCHAR,
+                GAME_ID VARCHAR,
+                rows BIGINT,
+                fingerprint HUGEINT
+            )
+        """)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {schema}.{WATERMARK_TABLE} (
+                table_name VARCHAR,
+                source VARCHAR,
+                max_rowid BIGINT,
+                refreshed_at TIMESTAMP
+            )
+        """)
+        # sources hashed whole lose every old fingerprint, the others only the ones of the games hashed again
+        self.conn.execute(f"""
+            DELETE FROM {schema}.{SOURCES_TABLE} r
+            WHERE table_name = '{name}'
+              AND (source IN (SELECT source FROM source_marks WHERE whole)
+                   OR EXISTS (SELECT 1 FROM source_fingerprints f WHERE f.source = r.source AND f.GAME_ID = r.GAME_ID))
+        """)
+        self.conn.execute(f"""
+            INSERT INTO {schema}.{SOURCES_TABLE}
+            SELECT '{name}', source, GAME_ID, rows, fingerprint FROM source_fingerprints
+        """)
+        self.conn.execute(f"DELETE FROM {schema}.{WATERMARK_TABLE} WHERE table_name = '{name}' AND source IN (SELECT source FROM source_marks)")
+        self.conn.execute(f"""
+            INSERT INTO {schema}.{WATERMARK_TABLE}
+            SELECT '{name}', source, max_rowid, current_localtimestamp() FROM source_marks
+        """)
+
+    def refresh_games(self, schema, name, sources):
+        """
+        temp table refresh_games: raw.log_table games missing from schema.name, or with rows added, removed or changed
+        in any of its raw sources since it was written (box score endpoints can land long after the log row).
+        only the games of raw rows past the source's watermark are hashed (source_scopes), not whole seasons
+        returns the number of games
+        """
+        self.source_fingerprints(self.source_scopes(schema, name, sources))
+        recorded = f"{schema}.{SOURCES_TABLE}" if self.table_exists(schema, SOURCES_TABLE) else \
+            "(SELECT NULL::VARCHAR AS table_name, NULL::VARCHAR AS source, NULL::VARCHAR AS GAME_ID, NULL::BIGINT AS rows, NULL::HUGEINT AS fingerprint WHERE FALSE)"
+        self.conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE refresh_games AS
+            WITH was AS (
+                SELECT * FROM {recorded}
+                WHERE table_name = '{name}' AND source IN (SELECT source FROM source_marks)
+            ),
+            changed AS (
+                SELECT now.GAME_ID
+                FROM source_fingerprints now
+                LEFT JOIN was
+                  ON was.source = now.source AND was.GAME_ID = now.GAME_ID
+                WHERE now.rows IS DISTINCT FROM was.rows OR now.fingerprint IS DISTINCT FROM was.fingerprint
+                UNION
+                -- games gone from a source hashed whole
+                SELECT was.GAME_ID
+                FROM was
+                WHERE was.source IN (SELECT source FROM source_marks WHERE whole)
+                  AND NOT EXISTS (SELECT 1 FROM source_fingerprints now WHERE now.source = was.source AND now.GAME_ID = was.GAME_ID)
+            )
+            SELECT DISTINCT log.GAME_ID
+            FROM raw.log_table log
+            WHERE NOT EXISTS (SELECT 1 FROM {schema}.{name} t WHERE t.GAME_ID = log.GAME_ID)
+               OR CAST(log.GAME_ID AS VARCHAR) IN (SELECT GAME_ID FROM changed)
+        """)
+        return self.conn.execute("SELECT COUNT(*) FROM refresh_games").fetchone()[0]
+
+    def refresh_sql(self, schema, name, sql):
+        """
+        incremental write_sql: sql must only produce the games in refresh_games (see refresh_games), their rows
+        are deleted and inserted again in one transaction, a failure leaves schema.name as it was
+        """
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            deleted = self.conn.execute(f"DELETE FROM {schema}.{name} WHERE GAME_ID IN (SELECT GAME_ID FROM refresh_games)").fetchone()[0]
+            inserted = self.conn.execute(f"INSERT INTO {schema}.{name} BY NAME\n{sql}").fetchone()[0]
+            if self.metrics:
+                self.metrics.profile(self.conn, f"refresh {schema}.{name}", scanned=True)
+                self.metrics.add(rows_out=inserted)
+            self.record_sources(schema, name)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.logger.log_info(f'refreshed {schema}.{name}: {deleted} rows deleted, {inserted} inserted')
+        return deleted, inserted
 
 
     def make_sql_model(self,schema,name,sql,kind='FULL'):
@@ -96,7 +382,21 @@ class CombinedGenerator(SQLGenerator):
 
         return col_dict
 
-    def sql_create_player_combination(self,col_dict):
+    @staticmethod
+    def deduplicated_sources(tables, games=None):
+        """
+        WITH clause with every raw table kept once per primary key (PRIMARY_KEYS of its table class), repeated
+        inserts leave copies in raw.*, deduplicating the sources lets the joins run without a DISTINCT over the result
+        games: table of GAME_IDs to keep (refresh_games), every source is filtered before the joins
+        """
+        game_filter = f"WHERE GAME_ID IN (SELECT GAME_ID FROM {games}) " if games else ""
+        ctes = []
+        for table in tables:
+            keys = ', '.join(PRIMARY_KEYS[table.split('_')[0]])
+            ctes.append(f"{table} AS (\n    SELECT * FROM raw.{table}\n    WHERE rowid IN (SELECT MIN(rowid) FROM raw.{table} {game_filter}GROUP BY {keys})\n)")
+        return "WITH " + ",\n".join(ctes)
+
+    def sql_create_player_combination(self,col_dict,games=None):
         """
         reads through col_dict generated from get_column_sources to make the players_combined 
         updated to coalesce values when there are multiple tables with the column
@@ -122,28 +422,24 @@ class CombinedGenerator(SQLGenerator):
                 col_dict[col_name] = col_dict[col_name][1:]
             if len(col_dict[col_name]) == 1:
                 # print(f"COLUMN:{col_name}, TABLES: {og_tables}, statement: {col_dict[col_name][0]}.{col_name},")
-                col_sql+=f"\n\traw.{col_dict[col_name][0]}.{col_name},"
+                col_sql+=f"\n\t{col_dict[col_name][0]}.\"{col_name}\","
             else:
                 coalesce_statement = ""
                 for table_name in col_dict[col_name]:
-                    coalesce_statement+=f"raw.{table_name}.{col_name},"
+                    coalesce_statement+=f"{table_name}.\"{col_name}\","
                 coalesce_statement = coalesce_statement[:-1]
                 # print(f"COLUMN:{col_name}, TABLES: {og_tables}, statement: COALESCE({coalesce_statement}) as {col_name},")
-                col_sql+=f"\n\tCOALESCE({coalesce_statement}) as {col_name},"
-
-        join_sql = "FROM raw.log_table"
-        first = True
-        last_table = 'log_table'
-        for i in spec_col_set:
-            if first:
-                join_sql+=f"\nleft join raw.{i} on raw.{last_table}.GAME_ID::int = raw.{i}.GAME_ID::int and raw.{last_table}.TEAM_ABBREVIATION = raw.{i}.TEAM_ABBREVIATION"
-                first = False
-                last_table = i
-            else:
-                join_sql+=f"\nleft join raw.{i} on raw.{last_table}.GAME_ID::int = raw.{i}.GAME_ID::int and raw.{last_table}.PLAYER_NAME = raw.{i}.PLAYER_NAME"
-                last_table=i
+                col_sql+=f"\n\tCOALESCE({coalesce_statement}) as \"{col_name}\","
 
-        combined_f_string =f"""SELECT DISTINCT
+        # log_table x the first player endpoint (traditional when present) is the game / team / player spine,
+        # the other endpoints join to it on their primary key
+        spine = 'players_traditional' if 'players_traditional' in spec_col_set else sorted(spec_col_set)[0]
+        join_sql = f"FROM log_table\nleft join {spine} on log_table.GAME_ID = {spine}.GAME_ID and log_table.TEAM_ID = {spine}.TEAM_ID"
+        for i in sorted(spec_col_set - {spine}):
+            join_sql+=f"\nleft join {i} on {spine}.GAME_ID = {i}.GAME_ID and {spine}.PLAYER_ID = {i}.PLAYER_ID"
+
+        combined_f_string =f"""{self.deduplicated_sources(['log_table'] + sorted(spec_col_set), games)}
+        SELECT
             {col_sql}
         {join_sql}"""
 
@@ -151,7 +447,7 @@ class CombinedGenerator(SQLGenerator):
 
 
 
-    def sql_create_team_combination(self,col_dict):
+    def sql_create_team_combination(self,col_dict,games=None):
 
         order_map = {'log_table':0,'teams_fourfactors':1}
 
@@ -160,59 +456,98 @@ class CombinedGenerator(SQLGenerator):
             spec_col_set.update(value_list)
         spec_col_set.discard('log_table')
 
-        col_sql = ""
+        col_sql = ""  # column names are quoted, a raw file header can be anything
         for col_name in col_dict.keys():
             col_dict[col_name] = sorted(col_dict[col_name], key=lambda x: order_map.get(x, float('inf')))
             if len(col_dict[col_name]) == 1:
                 # print(f"COLUMN:{col_name}, TABLES: {og_tables}, statement: {col_dict[col_name][0]}.{col_name},")
-                col_sql+=f"\n\traw.{col_dict[col_name][0]}.{col_name},"
+                col_sql+=f"\n\t{col_dict[col_name][0]}.\"{col_name}\","
             else:
                 coalesce_statement = ""
-                if col_name in ['GAME_ID','MIN']:### COLUMNS WITH DIFFERENT TYPES: TODO: MAKE THIS AUTOMATIC?
+                if col_name in ['MIN']:### COLUMNS WITH DIFFERENT TYPES: TODO: MAKE THIS AUTOMATIC?
                     for table_name in col_dict[col_name]:
-                        coalesce_statement+=f"CAST(raw.{table_name}.{col_name} AS VARCHAR),"
+                        coalesce_statement+=f"CAST({table_name}.\"{col_name}\" AS VARCHAR),"
                 else:
                     for table_name in col_dict[col_name]:
-                        coalesce_statement+=f"raw.{table_name}.{col_name},"
+                        coalesce_statement+=f"{table_name}.\"{col_name}\","
                 coalesce_statement = coalesce_statement[:-1]
                 # print(f"COLUMN:{col_name}, TABLES: {og_tables}, statement: COALESCE({coalesce_statement}) as {col_name},")
-                col_sql+=f"\n\tCOALESCE({coalesce_statement}) as {col_name},"
+                col_sql+=f"\n\tCOALESCE({coalesce_statement}) as \"{col_name}\","
 
-        join_sql = "FROM raw.log_table"
-        first = True
-        last_table = 'log_table'
-        for i in spec_col_set:
-            join_sql+=f"\nleft join raw.{i} on raw.{last_table}.GAME_ID::int = raw.{i}.GAME_ID::int and raw.{last_table}.TEAM_ABBREVIATION = raw.{i}.TEAM_ABBREVIATION"
-            # last_table=i
+        # every source joins the log_table spine on its own primary key
+        join_sql = "FROM log_table"
+        for i in sorted(spec_col_set):
+            on = ' and '.join(f"log_table.{key} = {i}.{key}" for key in PRIMARY_KEYS[i.split('_')[0]])
+            join_sql+=f"\nleft join {i} on {on}"
 
-        combined_f_string =f"""
-            SELECT DISTINCT
+        combined_f_string =f"""{self.deduplicated_sources(['log_table'] + sorted(spec_col_set), games)}
+            SELECT
             {col_sql}
         {join_sql}"""
 
         return combined_f_string
 
 
-    def generate_sql(self):
-        playerandlog_columns = self.conn.execute("SELECT table_name, column_name FROM information_schema.columns WHERE (table_name ilike '%players%'  or table_name in ('log_table')) and table_schema = 'raw'").df()
-        teamandlog_columns = self.conn.execute("SELECT table_name, column_name FROM information_schema.columns WHERE (table_name ilike '%teams%' or table_name in ('log_table', 'lines_table')) and table_schema = 'raw'").df()
+    def source_columns(self):
+        """(players, teams) information_schema columns of the raw tables each combined table reads"""
+        # summary / matchups are collected with get_data --extra-endpoints but are not one row per player-game, keep them out
+        exclude = "and table_name not ilike '%summary' and table_name not ilike '%matchups'"
+        playerandlog_columns = self.conn.execute(f"SELECT table_name, column_name FROM information_schema.columns WHERE (table_name ilike '%players%'  or table_name in ('log_table')) and table_schema = 'raw' {exclude}").df()
+        teamandlog_columns = self.conn.execute(f"SELECT table_name, column_name FROM information_schema.columns WHERE (table_name ilike '%teams%' or table_name in ('log_table', 'lines_table')) and table_schema = 'raw' {exclude}").df()
+        return playerandlog_columns, teamandlog_columns
+
+    def generate_sql(self, games=None):
+        playerandlog_columns, teamandlog_columns = self.source_columns()
 
         players_dict = self.get_column_sources(playerandlog_columns)
-        player_sql = self.sql_create_player_combination(players_dict)
+        player_sql = self.sql_create_player_combination(players_dict, games)
 
         team_dict = self.get_column_sources(teamandlog_columns)
-        team_sql = self.sql_create_team_combination(team_dict)
+        team_sql = self.sql_create_team_combination(team_dict, games)
 
         return {'teams_combined':team_sql,'players_combined':player_sql}
 
+    def model_sources(self):
+        """{combined table: [raw tables it reads]}"""
+        playerandlog_columns, teamandlog_columns = self.source_columns()
+        return {'teams_combined': sorted(set(teamandlog_columns['table_name'])), 'players_combined': sorted(set(playerandlog_columns['table_name']))}
+
+    def refresh(self, schema='base', full=False):
+        """
+        full: rebuild every combined table (write_sql)
+        otherwise only the games refresh_games finds are deleted and inserted, tables that do not exist yet are built in full
+        """
+        full_sql = self.generate_sql()
+        sources = self.model_sources()
+        for model_name in full_sql:
+            if full or not self.table_exists(schema, model_name):
+                self.write_sql(schema, model_name, full_sql[model_name], sources[model_name])
+                continue
+            games = self.refresh_games(schema, model_name, sources[model_name])
+            if not games:
+                self.record_sources(schema, model_name)  # new raw rows that changed no game, not looked at again
+                self.logger.log_info(f'{schema}.{model_name} is up to date')
+                continue
+            self.logger.log_info(f'refreshing {games} games in {schema}.{model_name}')
+            self.refresh_sql(schema, model_name, self.generate_sql(games='refresh_games')[model_name])
 
 
 def main():
+    parser = argparse.ArgumentParser(description="generate sql from the duckdb schema / the window model spec")
+    parser.add_argument('command', nargs='?', choices=['combined', 'windows'], default='combined',
+                        help="combined: base players / teams tables, windows: aggs window models from WINDOW_MODELS")
+    parser.add_argument('--full', action='store_true',
+                        help="combined: rebuild the tables instead of refreshing the new / changed games")
+    args = parser.parse_args()
+
     logger = Logger()
-    x = CombinedGenerator(logger)
-    sql = x.generate_sql()
-    for model_name in sql:
-        x.write_sql('base',model_name,sql[model_name])
+    if args.command == 'windows':
+        SQLMeshModelGenerator(logger).write_window_models()
+        return
+    with StageMetrics('sql_generator:combined', logger) as metrics:
+        x = CombinedGenerator(logger, metrics)
+        x.refresh('base', full=args.full)
+        x.conn.close()
         
 
 if __name__ == "__main__":
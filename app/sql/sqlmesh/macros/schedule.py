@@ -0,0 +1,22 @@
+from sqlglot import exp, parse_one
+from sqlmesh import macro
+
+
+def games_in_last_days_sql(days, date_column='GAME_DATE', partition_by=('TEAM_ID', 'SEASON_ID')):
+    """
+    COUNT(*) of the games in the days days ending on this row's date (this game included)
+
+    a RANGE frame over a DATE column: one sorted pass per partition instead of a correlated
+    COUNT(*) per row, which grew with the square of the team season length
+    """
+    return (
+        f"COUNT(*) OVER (PARTITION BY {', '.join(partition_by)} ORDER BY {date_column} "
+        f"RANGE BETWEEN INTERVAL {int(days) - 1} DAY PRECEDING AND CURRENT ROW)"
+    )
+
+
+@macro()
+def games_in_last_days(evaluator, days: int, date_column: exp.Column, *partition_by: exp.Column):
+    """@games_in_last_days(4, GAME_DATE, TEAM_ID, SEASON_ID) AS GAMES_LAST_4_DAYS, 3 of them means 3 in 4 nights"""
+    partition = [column.sql(dialect='duckdb') for column in partition_by] or ['TEAM_ID', 'SEASON_ID']
+    return parse_one(games_in_last_days_sql(days, date_column.sql(dialect='duckdb'), partition), dialect='duckdb')
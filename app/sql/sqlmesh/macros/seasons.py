@@ -0,0 +1,56 @@
+import os
+
+from sqlglot import exp, parse_one
+from sqlmesh import macro
+
+
+# NBA_RESTATE_SEASONS=22023,42023 recomputes those SEASON_IDs on the next run even if nothing changed upstream
+RESTATE_SEASONS_ENV = 'NBA_RESTATE_SEASONS'
+
+
+def stale_seasons_sql(source_sql, this_model, match_games=True, restate=()):
+    """
+    the condition @stale_seasons renders for source_sql and this_model (both table names)
+    GAME_ID is only counted with match_games: a model without the column (fantasy.z_scores) would bind it
+    to the outer row and put an aggregate in the WHERE clause
+    """
+    games = ", COUNT(DISTINCT GAME_ID) AS GAMES" if match_games else ""
+    game_check = "OR s.GAMES <> t.GAMES" if match_games else ""
+    condition = f"""
+        SEASON_ID IN (
+            SELECT s.SEASON_ID
+            FROM (
+                SELECT SEASON_ID, MAX(GAME_DATE) AS LAST_GAME{games}
+                FROM {source_sql}
+                GROUP BY SEASON_ID
+            ) s
+            LEFT JOIN (
+                SELECT SEASON_ID, MAX(GAME_DATE) AS LAST_GAME{games}
+                FROM {this_model}
+                GROUP BY SEASON_ID
+            ) t ON s.SEASON_ID = t.SEASON_ID
+            WHERE t.SEASON_ID IS NULL OR s.LAST_GAME <> t.LAST_GAME {game_check}
+        )
+    """
+    if restate:
+        season_list = ', '.join(f"'{season}'" for season in restate)
+        condition = f"({condition} OR CAST(SEASON_ID AS VARCHAR) IN ({season_list}))"
+    return condition
+
+
+@macro()
+def stale_seasons(evaluator, source: exp.Table, match_games: bool = True):
+    """
+    WHERE condition for the INCREMENTAL_BY_PARTITION models partitioned by SEASON_ID
+
+    keeps the seasons of source that are missing from this model, whose last GAME_DATE changed or, with
+    match_games, whose number of distinct games changed. every window in these models is partitioned by
+    SEASON_ID, so a closed season never has to be recomputed and a nightly run only rebuilds the season being played
+    use match_games := FALSE for models that keep one row per player and season (fantasy.z_scores)
+    """
+    if evaluator.runtime_stage != 'evaluating':
+        return exp.true()  # loading / creating / testing render the whole query
+
+    restate = [season.strip() for season in os.environ.get(RESTATE_SEASONS_ENV, '').split(',') if season.strip()]
+    condition = stale_seasons_sql(source.sql(dialect='duckdb'), evaluator.this_model, match_games, restate)
+    return parse_one(condition, dialect='duckdb')
@@ -0,0 +1,175 @@
+MODEL (
+  name aggs.player_averages_ewma,
+  kind INCREMENTAL_BY_PARTITION,
+  partitioned_by SEASON_ID
+);
+-- generated by `python -m app.sql.sql_generator windows` from WINDOW_MODELS in app/sql/sql_generator.py, edit the spec there
+
+SELECT
+    PLAYER_ID,
+    SEASON_ID,
+    TEAM_ID,
+    GAME_ID,
+    NEXT_GAME_ID,
+    GAME_DATE,
+    PLAYER_NAME,
+    TEAM_NAME,
+    TEAM_ABBREVIATION,
+    GAME_COUNT,
+    GAMES_PLAYED,
+    PLAYED_FLAG,
+    IS_LAST_GAME,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND MINUTES IS NOT NULL THEN MINUTES * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND MINUTES IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_MINUTES,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PLUS_MINUS IS NOT NULL THEN PLUS_MINUS * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PLUS_MINUS IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PLUS_MINUS,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PTS IS NOT NULL THEN PTS * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PTS IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PTS,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND FGM IS NOT NULL THEN FGM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND FGM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FGM,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND FGA IS NOT NULL THEN FGA * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND FGA IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FGA,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND FG_PCT IS NOT NULL THEN FG_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND FG_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FG_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND FG3M IS NOT NULL THEN FG3M * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND FG3M IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FG3M,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND FG3A IS NOT NULL THEN FG3A * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND FG3A IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FG3A,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND FG3_PCT IS NOT NULL THEN FG3_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND FG3_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FG3_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND FTM IS NOT NULL THEN FTM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND FTM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FTM,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND FTA IS NOT NULL THEN FTA * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND FTA IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FTA,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND FT_PCT IS NOT NULL THEN FT_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND FT_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FT_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OREB IS NOT NULL THEN OREB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OREB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OREB,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND DREB IS NOT NULL THEN DREB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND DREB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_DREB,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND REB IS NOT NULL THEN REB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND REB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_REB,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND AST IS NOT NULL THEN AST * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND AST IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_AST,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND STL IS NOT NULL THEN STL * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND STL IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_STL,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND BLK IS NOT NULL THEN BLK * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND BLK IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_BLK,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PF IS NOT NULL THEN PF * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PF IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PF,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND E_OFF_RATING IS NOT NULL THEN E_OFF_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND E_OFF_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_E_OFF_RATING,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OFF_RATING IS NOT NULL THEN OFF_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OFF_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OFF_RATING,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND E_DEF_RATING IS NOT NULL THEN E_DEF_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND E_DEF_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_E_DEF_RATING,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND DEF_RATING IS NOT NULL THEN DEF_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND DEF_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_DEF_RATING,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND E_NET_RATING IS NOT NULL THEN E_NET_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND E_NET_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_E_NET_RATING,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND NET_RATING IS NOT NULL THEN NET_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND NET_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_NET_RATING,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND AST_PCT IS NOT NULL THEN AST_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND AST_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_AST_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND AST_TOV IS NOT NULL THEN AST_TOV * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND AST_TOV IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_AST_TOV,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND AST_RATIO IS NOT NULL THEN AST_RATIO * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND AST_RATIO IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_AST_RATIO,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OREB_PCT IS NOT NULL THEN OREB_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OREB_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OREB_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND DREB_PCT IS NOT NULL THEN DREB_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND DREB_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_DREB_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND REB_PCT IS NOT NULL THEN REB_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND REB_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_REB_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND TM_TOV_PCT IS NOT NULL THEN TM_TOV_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND TM_TOV_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_TM_TOV_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND EFG_PCT IS NOT NULL THEN EFG_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND EFG_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_EFG_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND TS_PCT IS NOT NULL THEN TS_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND TS_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_TS_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND USG_PCT IS NOT NULL THEN USG_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND USG_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_USG_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND E_USG_PCT IS NOT NULL THEN E_USG_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND E_USG_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_E_USG_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND E_PACE IS NOT NULL THEN E_PACE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND E_PACE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_E_PACE,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PACE IS NOT NULL THEN PACE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PACE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PACE,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PACE_PER40 IS NOT NULL THEN PACE_PER40 * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PACE_PER40 IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PACE_PER40,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND POSS IS NOT NULL THEN POSS * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND POSS IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_POSS,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PIE IS NOT NULL THEN PIE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PIE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PIE,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND FTA_RATE IS NOT NULL THEN FTA_RATE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND FTA_RATE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FTA_RATE,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_EFG_PCT IS NOT NULL THEN OPP_EFG_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_EFG_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_EFG_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_FTA_RATE IS NOT NULL THEN OPP_FTA_RATE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_FTA_RATE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_FTA_RATE,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_TOV_PCT IS NOT NULL THEN OPP_TOV_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_TOV_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_TOV_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_OREB_PCT IS NOT NULL THEN OPP_OREB_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_OREB_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_OREB_PCT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PTS_OFF_TOV IS NOT NULL THEN PTS_OFF_TOV * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PTS_OFF_TOV IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PTS_OFF_TOV,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PTS_2ND_CHANCE IS NOT NULL THEN PTS_2ND_CHANCE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PTS_2ND_CHANCE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PTS_2ND_CHANCE,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PTS_FB IS NOT NULL THEN PTS_FB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PTS_FB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PTS_FB,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PTS_PAINT IS NOT NULL THEN PTS_PAINT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PTS_PAINT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PTS_PAINT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_PTS_OFF_TOV IS NOT NULL THEN OPP_PTS_OFF_TOV * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_PTS_OFF_TOV IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_PTS_OFF_TOV,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_PTS_2ND_CHANCE IS NOT NULL THEN OPP_PTS_2ND_CHANCE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_PTS_2ND_CHANCE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_PTS_2ND_CHANCE,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_PTS_FB IS NOT NULL THEN OPP_PTS_FB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_PTS_FB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_PTS_FB,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_PTS_PAINT IS NOT NULL THEN OPP_PTS_PAINT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND OPP_PTS_PAINT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_PTS_PAINT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND BLKA IS NOT NULL THEN BLKA * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND BLKA IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_BLKA,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PFD IS NOT NULL THEN PFD * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PFD IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PFD,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_FGA_2PT IS NOT NULL THEN PCT_FGA_2PT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_FGA_2PT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_FGA_2PT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_FGA_3PT IS NOT NULL THEN PCT_FGA_3PT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_FGA_3PT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_FGA_3PT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_2PT IS NOT NULL THEN PCT_PTS_2PT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_2PT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_2PT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_2PT_MR IS NOT NULL THEN PCT_PTS_2PT_MR * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_2PT_MR IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_2PT_MR,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_3PT IS NOT NULL THEN PCT_PTS_3PT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_3PT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_3PT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_FB IS NOT NULL THEN PCT_PTS_FB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_FB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_FB,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_FT IS NOT NULL THEN PCT_PTS_FT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_FT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_FT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_OFF_TOV IS NOT NULL THEN PCT_PTS_OFF_TOV * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_OFF_TOV IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_OFF_TOV,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_PAINT IS NOT NULL THEN PCT_PTS_PAINT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_PTS_PAINT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_PAINT,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_AST_2PM IS NOT NULL THEN PCT_AST_2PM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_AST_2PM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_AST_2PM,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_UAST_2PM IS NOT NULL THEN PCT_UAST_2PM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_UAST_2PM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_UAST_2PM,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_AST_3PM IS NOT NULL THEN PCT_AST_3PM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_AST_3PM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_AST_3PM,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_UAST_3PM IS NOT NULL THEN PCT_UAST_3PM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_UAST_3PM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_UAST_3PM,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_AST_FGM IS NOT NULL THEN PCT_AST_FGM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_AST_FGM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_AST_FGM,
+    SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_UAST_FGM IS NOT NULL THEN PCT_UAST_FGM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLAYED_FLAG = 1 AND PCT_UAST_FGM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_UAST_FGM
+FROM (
+    SELECT
+        *,
+        POWER(1.2222222222, ROW_NUMBER() OVER (PARTITION BY PLAYER_ID, SEASON_ID ORDER BY GAME_DATE)) AS EWMA_WEIGHT
+    FROM base.players_processed
+    WHERE @stale_seasons(base.players_processed)
+) AS weighted
+WINDOW w AS (
+    PARTITION BY PLAYER_ID, SEASON_ID
+    ORDER BY GAME_DATE
+    ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+);
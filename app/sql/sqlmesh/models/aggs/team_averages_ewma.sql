@@ -0,0 +1,189 @@
+MODEL (
+  name aggs.team_averages_ewma,
+  kind INCREMENTAL_BY_PARTITION,
+  partitioned_by SEASON_ID
+);
+-- generated by `python -m app.sql.sql_generator windows` from WINDOW_MODELS in app/sql/sql_generator.py, edit the spec there
+
+SELECT
+    SEASON_ID,
+    SEASON_TYPE,
+    TEAM_ID,
+    TEAM_ABBREVIATION,
+    TEAM_NAME,
+    TEAM_CITY,
+    NEXT_GAME_ID,
+    GAME_ID,
+    GAME_NUMBER,
+    IS_LAST_TEAM_GAME,
+    GAME_DATE,
+    MATCHUP,
+    HOME_TEAM,
+    AWAY_TEAM,
+    IS_HOME,
+    LINE,
+    OU,
+    WL,
+    SCORE_DIFF,
+    OPP_PTS,
+    COVER_RESULT,
+    OU_RESULT,
+    WINS_SO_FAR,
+    LOSSES_SO_FAR,
+    LAST_10_WIN_PCT,
+    WINS_VS_OPPONENT,
+    LOSSES_VS_OPPONENT,
+    SUM(CASE WHEN PTS IS NOT NULL THEN PTS * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PTS IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PTS,
+    SUM(CASE WHEN FGM IS NOT NULL THEN FGM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN FGM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FGM,
+    SUM(CASE WHEN FGA IS NOT NULL THEN FGA * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN FGA IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FGA,
+    SUM(CASE WHEN FG_PCT IS NOT NULL THEN FG_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN FG_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FG_PCT,
+    SUM(CASE WHEN FG3M IS NOT NULL THEN FG3M * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN FG3M IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FG3M,
+    SUM(CASE WHEN FG3A IS NOT NULL THEN FG3A * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN FG3A IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FG3A,
+    SUM(CASE WHEN FG3_PCT IS NOT NULL THEN FG3_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN FG3_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FG3_PCT,
+    SUM(CASE WHEN FTM IS NOT NULL THEN FTM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN FTM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FTM,
+    SUM(CASE WHEN FTA IS NOT NULL THEN FTA * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN FTA IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FTA,
+    SUM(CASE WHEN FT_PCT IS NOT NULL THEN FT_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN FT_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FT_PCT,
+    SUM(CASE WHEN OREB IS NOT NULL THEN OREB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OREB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OREB,
+    SUM(CASE WHEN DREB IS NOT NULL THEN DREB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN DREB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_DREB,
+    SUM(CASE WHEN REB IS NOT NULL THEN REB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN REB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_REB,
+    SUM(CASE WHEN AST IS NOT NULL THEN AST * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN AST IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_AST,
+    SUM(CASE WHEN STL IS NOT NULL THEN STL * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN STL IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_STL,
+    SUM(CASE WHEN BLK IS NOT NULL THEN BLK * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN BLK IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_BLK,
+    SUM(CASE WHEN TOV IS NOT NULL THEN TOV * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN TOV IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_TOV,
+    SUM(CASE WHEN PF IS NOT NULL THEN PF * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PF IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PF,
+    SUM(CASE WHEN PLUS_MINUS IS NOT NULL THEN PLUS_MINUS * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PLUS_MINUS IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PLUS_MINUS,
+    SUM(CASE WHEN E_OFF_RATING IS NOT NULL THEN E_OFF_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN E_OFF_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_E_OFF_RATING,
+    SUM(CASE WHEN OFF_RATING IS NOT NULL THEN OFF_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OFF_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OFF_RATING,
+    SUM(CASE WHEN E_DEF_RATING IS NOT NULL THEN E_DEF_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN E_DEF_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_E_DEF_RATING,
+    SUM(CASE WHEN DEF_RATING IS NOT NULL THEN DEF_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN DEF_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_DEF_RATING,
+    SUM(CASE WHEN E_NET_RATING IS NOT NULL THEN E_NET_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN E_NET_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_E_NET_RATING,
+    SUM(CASE WHEN NET_RATING IS NOT NULL THEN NET_RATING * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN NET_RATING IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_NET_RATING,
+    SUM(CASE WHEN AST_PCT IS NOT NULL THEN AST_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN AST_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_AST_PCT,
+    SUM(CASE WHEN AST_TOV IS NOT NULL THEN AST_TOV * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN AST_TOV IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_AST_TOV,
+    SUM(CASE WHEN AST_RATIO IS NOT NULL THEN AST_RATIO * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN AST_RATIO IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_AST_RATIO,
+    SUM(CASE WHEN OREB_PCT IS NOT NULL THEN OREB_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OREB_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OREB_PCT,
+    SUM(CASE WHEN DREB_PCT IS NOT NULL THEN DREB_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN DREB_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_DREB_PCT,
+    SUM(CASE WHEN REB_PCT IS NOT NULL THEN REB_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN REB_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_REB_PCT,
+    SUM(CASE WHEN TM_TOV_PCT IS NOT NULL THEN TM_TOV_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN TM_TOV_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_TM_TOV_PCT,
+    SUM(CASE WHEN EFG_PCT IS NOT NULL THEN EFG_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN EFG_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_EFG_PCT,
+    SUM(CASE WHEN TS_PCT IS NOT NULL THEN TS_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN TS_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_TS_PCT,
+    SUM(CASE WHEN USG_PCT IS NOT NULL THEN USG_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN USG_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_USG_PCT,
+    SUM(CASE WHEN E_USG_PCT IS NOT NULL THEN E_USG_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN E_USG_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_E_USG_PCT,
+    SUM(CASE WHEN E_PACE IS NOT NULL THEN E_PACE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN E_PACE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_E_PACE,
+    SUM(CASE WHEN PACE IS NOT NULL THEN PACE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PACE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PACE,
+    SUM(CASE WHEN PACE_PER40 IS NOT NULL THEN PACE_PER40 * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PACE_PER40 IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PACE_PER40,
+    SUM(CASE WHEN POSS IS NOT NULL THEN POSS * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN POSS IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_POSS,
+    SUM(CASE WHEN PIE IS NOT NULL THEN PIE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PIE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PIE,
+    SUM(CASE WHEN FTA_RATE IS NOT NULL THEN FTA_RATE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN FTA_RATE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_FTA_RATE,
+    SUM(CASE WHEN OPP_EFG_PCT IS NOT NULL THEN OPP_EFG_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OPP_EFG_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_EFG_PCT,
+    SUM(CASE WHEN OPP_FTA_RATE IS NOT NULL THEN OPP_FTA_RATE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OPP_FTA_RATE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_FTA_RATE,
+    SUM(CASE WHEN OPP_TOV_PCT IS NOT NULL THEN OPP_TOV_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OPP_TOV_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_TOV_PCT,
+    SUM(CASE WHEN OPP_OREB_PCT IS NOT NULL THEN OPP_OREB_PCT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OPP_OREB_PCT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_OREB_PCT,
+    SUM(CASE WHEN PTS_OFF_TOV IS NOT NULL THEN PTS_OFF_TOV * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PTS_OFF_TOV IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PTS_OFF_TOV,
+    SUM(CASE WHEN PTS_2ND_CHANCE IS NOT NULL THEN PTS_2ND_CHANCE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PTS_2ND_CHANCE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PTS_2ND_CHANCE,
+    SUM(CASE WHEN PTS_FB IS NOT NULL THEN PTS_FB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PTS_FB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PTS_FB,
+    SUM(CASE WHEN PTS_PAINT IS NOT NULL THEN PTS_PAINT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PTS_PAINT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PTS_PAINT,
+    SUM(CASE WHEN OPP_PTS_OFF_TOV IS NOT NULL THEN OPP_PTS_OFF_TOV * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OPP_PTS_OFF_TOV IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_PTS_OFF_TOV,
+    SUM(CASE WHEN OPP_PTS_2ND_CHANCE IS NOT NULL THEN OPP_PTS_2ND_CHANCE * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OPP_PTS_2ND_CHANCE IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_PTS_2ND_CHANCE,
+    SUM(CASE WHEN OPP_PTS_FB IS NOT NULL THEN OPP_PTS_FB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OPP_PTS_FB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_PTS_FB,
+    SUM(CASE WHEN OPP_PTS_PAINT IS NOT NULL THEN OPP_PTS_PAINT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN OPP_PTS_PAINT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_OPP_PTS_PAINT,
+    SUM(CASE WHEN BLKA IS NOT NULL THEN BLKA * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN BLKA IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_BLKA,
+    SUM(CASE WHEN PFD IS NOT NULL THEN PFD * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PFD IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PFD,
+    SUM(CASE WHEN PCT_FGA_2PT IS NOT NULL THEN PCT_FGA_2PT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_FGA_2PT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_FGA_2PT,
+    SUM(CASE WHEN PCT_FGA_3PT IS NOT NULL THEN PCT_FGA_3PT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_FGA_3PT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_FGA_3PT,
+    SUM(CASE WHEN PCT_PTS_2PT IS NOT NULL THEN PCT_PTS_2PT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_PTS_2PT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_2PT,
+    SUM(CASE WHEN PCT_PTS_2PT_MR IS NOT NULL THEN PCT_PTS_2PT_MR * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_PTS_2PT_MR IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_2PT_MR,
+    SUM(CASE WHEN PCT_PTS_3PT IS NOT NULL THEN PCT_PTS_3PT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_PTS_3PT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_3PT,
+    SUM(CASE WHEN PCT_PTS_FB IS NOT NULL THEN PCT_PTS_FB * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_PTS_FB IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_FB,
+    SUM(CASE WHEN PCT_PTS_FT IS NOT NULL THEN PCT_PTS_FT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_PTS_FT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_FT,
+    SUM(CASE WHEN PCT_PTS_OFF_TOV IS NOT NULL THEN PCT_PTS_OFF_TOV * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_PTS_OFF_TOV IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_OFF_TOV,
+    SUM(CASE WHEN PCT_PTS_PAINT IS NOT NULL THEN PCT_PTS_PAINT * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_PTS_PAINT IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_PTS_PAINT,
+    SUM(CASE WHEN PCT_AST_2PM IS NOT NULL THEN PCT_AST_2PM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_AST_2PM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_AST_2PM,
+    SUM(CASE WHEN PCT_UAST_2PM IS NOT NULL THEN PCT_UAST_2PM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_UAST_2PM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_UAST_2PM,
+    SUM(CASE WHEN PCT_AST_3PM IS NOT NULL THEN PCT_AST_3PM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_AST_3PM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_AST_3PM,
+    SUM(CASE WHEN PCT_UAST_3PM IS NOT NULL THEN PCT_UAST_3PM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_UAST_3PM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_UAST_3PM,
+    SUM(CASE WHEN PCT_AST_FGM IS NOT NULL THEN PCT_AST_FGM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_AST_FGM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_AST_FGM,
+    SUM(CASE WHEN PCT_UAST_FGM IS NOT NULL THEN PCT_UAST_FGM * EWMA_WEIGHT END) OVER w
+        / SUM(CASE WHEN PCT_UAST_FGM IS NOT NULL THEN EWMA_WEIGHT END) OVER w AS EWMA_PCT_UAST_FGM
+FROM (
+    SELECT
+        *,
+        POWER(1.2222222222, ROW_NUMBER() OVER (PARTITION BY SEASON_ID, TEAM_ID ORDER BY GAME_DATE)) AS EWMA_WEIGHT
+    FROM base.teams_processed
+    WHERE @stale_seasons(base.teams_processed)
+) AS weighted
+WINDOW w AS (
+    PARTITION BY SEASON_ID, TEAM_ID
+    ORDER BY GAME_DATE
+    ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+);
@@ -3,118 +3,145 @@ MODEL (
   kind FULL
 );
 
-SELECT DISTINCT
+-- every raw table deduplicated on its primary key (make_tables.PRIMARY_KEYS) before the joins, repeated inserts
+-- leave copies in raw.*; log_table x players_traditional is the (game, team, player) spine and the other
+-- endpoints join straight to it on GAME_ID, PLAYER_ID, so no DISTINCT over the wide result
+WITH log_table AS (
+    SELECT * FROM raw.log_table
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.log_table GROUP BY GAME_ID, TEAM_ID)
+),
+players_traditional AS (
+    SELECT * FROM raw.players_traditional
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.players_traditional GROUP BY GAME_ID, PLAYER_ID)
+),
+players_advanced AS (
+    SELECT * FROM raw.players_advanced
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.players_advanced GROUP BY GAME_ID, PLAYER_ID)
+),
+players_fourfactors AS (
+    SELECT * FROM raw.players_fourfactors
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.players_fourfactors GROUP BY GAME_ID, PLAYER_ID)
+),
+players_scoring AS (
+    SELECT * FROM raw.players_scoring
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.players_scoring GROUP BY GAME_ID, PLAYER_ID)
+),
+players_misc AS (
+    SELECT * FROM raw.players_misc
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.players_misc GROUP BY GAME_ID, PLAYER_ID)
+)
+SELECT
     -- 1. Information / Metadata
-    raw.log_table.SEASON_ID,
-    raw.log_table.TEAM_ID,
-    raw.log_table.TEAM_ABBREVIATION,
-    raw.log_table.TEAM_NAME,
-    raw.log_table.GAME_ID,
-    raw.log_table.GAME_DATE,
-    COALESCE(raw.players_fourfactors.TEAM_CITY, raw.players_advanced.TEAM_CITY, raw.players_misc.TEAM_CITY, raw.players_scoring.TEAM_CITY, raw.players_traditional.TEAM_CITY) AS TEAM_CITY,
-    COALESCE(raw.players_fourfactors.PLAYER_ID, raw.players_advanced.PLAYER_ID, raw.players_misc.PLAYER_ID, raw.players_scoring.PLAYER_ID, raw.players_traditional.PLAYER_ID) AS PLAYER_ID,
-    COALESCE(raw.players_fourfactors.PLAYER_NAME, raw.players_advanced.PLAYER_NAME, raw.players_misc.PLAYER_NAME, raw.players_scoring.PLAYER_NAME, raw.players_traditional.PLAYER_NAME) AS PLAYER_NAME,
-    COALESCE(raw.players_fourfactors.NICKNAME, raw.players_advanced.NICKNAME, raw.players_misc.NICKNAME, raw.players_scoring.NICKNAME, raw.players_traditional.NICKNAME) AS NICKNAME,
-    COALESCE(raw.players_fourfactors.START_POSITION, raw.players_advanced.START_POSITION, raw.players_misc.START_POSITION, raw.players_scoring.START_POSITION, raw.players_traditional.START_POSITION) AS START_POSITION,
-    COALESCE(raw.players_fourfactors.COMMENT, raw.players_advanced.COMMENT, raw.players_misc.COMMENT, raw.players_scoring.COMMENT, raw.players_traditional.COMMENT) AS COMMENT,
-    raw.log_table.MATCHUP,
+    log_table.SEASON_ID,
+    log_table.TEAM_ID,
+    log_table.TEAM_ABBREVIATION,
+    log_table.TEAM_NAME,
+    log_table.GAME_ID,
+    log_table.GAME_DATE,
+    COALESCE(players_fourfactors.TEAM_CITY, players_advanced.TEAM_CITY, players_misc.TEAM_CITY, players_scoring.TEAM_CITY, players_traditional.TEAM_CITY) AS TEAM_CITY,
+    players_traditional.PLAYER_ID,
+    COALESCE(players_fourfactors.PLAYER_NAME, players_advanced.PLAYER_NAME, players_misc.PLAYER_NAME, players_scoring.PLAYER_NAME, players_traditional.PLAYER_NAME) AS PLAYER_NAME,
+    COALESCE(players_fourfactors.NICKNAME, players_advanced.NICKNAME, players_misc.NICKNAME, players_scoring.NICKNAME, players_traditional.NICKNAME) AS NICKNAME,
+    COALESCE(players_fourfactors.START_POSITION, players_advanced.START_POSITION, players_misc.START_POSITION, players_scoring.START_POSITION, players_traditional.START_POSITION) AS START_POSITION,
+    COALESCE(players_fourfactors.COMMENT, players_advanced.COMMENT, players_misc.COMMENT, players_scoring.COMMENT, players_traditional.COMMENT) AS COMMENT,
+    log_table.MATCHUP,
 
     -- 2. Outcome Stats
-    raw.log_table.WL,
-    raw.players_traditional.PLUS_MINUS,
+    log_table.WL,
+    players_traditional.PLUS_MINUS,
 
     -- 3. Core Box Score Stats
-    COALESCE(raw.players_fourfactors.MIN, raw.players_advanced.MIN, raw.players_misc.MIN, raw.players_scoring.MIN, raw.players_traditional.MIN) AS MIN,
-    raw.players_traditional.PTS,
-    raw.players_traditional.FGM,
-    raw.players_traditional.FGA,
-    raw.players_traditional.FG_PCT,
-    raw.players_traditional.FG3M,
-    raw.players_traditional.FG3A,
-    raw.players_traditional.FG3_PCT,
-    raw.players_traditional.FTM,
-    raw.players_traditional.FTA,
-    raw.players_traditional.FT_PCT,
-    raw.players_traditional.OREB,
-    raw.players_traditional.DREB,
-    raw.players_traditional.REB,
-    raw.players_traditional.AST,
-    raw.players_traditional.STL,
-    COALESCE(raw.players_misc.BLK, raw.players_traditional.BLK) AS BLK,
-    COALESCE(raw.players_misc.PF, raw.players_traditional.PF) AS PF,
-    raw.players_traditional.TO,
+    COALESCE(players_fourfactors.MIN, players_advanced.MIN, players_misc.MIN, players_scoring.MIN, players_traditional.MIN) AS MIN,
+    players_traditional.PTS,
+    players_traditional.FGM,
+    players_traditional.FGA,
+    players_traditional.FG_PCT,
+    players_traditional.FG3M,
+    players_traditional.FG3A,
+    players_traditional.FG3_PCT,
+    players_traditional.FTM,
+    players_traditional.FTA,
+    players_traditional.FT_PCT,
+    players_traditional.OREB,
+    players_traditional.DREB,
+    players_traditional.REB,
+    players_traditional.AST,
+    players_traditional.STL,
+    COALESCE(players_misc.BLK, players_traditional.BLK) AS BLK,
+    COALESCE(players_misc.PF, players_traditional.PF) AS PF,
+    players_traditional.TO,
 
     -- 4. Advanced Metrics
-    raw.players_advanced.E_OFF_RATING,
-    raw.players_advanced.OFF_RATING,
-    raw.players_advanced.E_DEF_RATING,
-    raw.players_advanced.DEF_RATING,
-    raw.players_advanced.E_NET_RATING,
-    raw.players_advanced.NET_RATING,
-    raw.players_advanced.AST_PCT,
-    raw.players_advanced.AST_TOV,
-    raw.players_advanced.AST_RATIO,
-    COALESCE(raw.players_fourfactors.OREB_PCT, raw.players_advanced.OREB_PCT) AS OREB_PCT,
-    raw.players_advanced.DREB_PCT,
-    raw.players_advanced.REB_PCT,
-    COALESCE(raw.players_fourfactors.TM_TOV_PCT, raw.players_advanced.TM_TOV_PCT) AS TM_TOV_PCT,
-    COALESCE(raw.players_fourfactors.EFG_PCT, raw.players_advanced.EFG_PCT) AS EFG_PCT,
-    raw.players_advanced.TS_PCT,
-    raw.players_advanced.USG_PCT,
-    raw.players_advanced.E_USG_PCT,
-    raw.players_advanced.E_PACE,
-    raw.players_advanced.PACE,
-    raw.players_advanced.PACE_PER40,
-    raw.players_advanced.POSS,
-    raw.players_advanced.PIE,
+    players_advanced.E_OFF_RATING,
+    players_advanced.OFF_RATING,
+    players_advanced.E_DEF_RATING,
+    players_advanced.DEF_RATING,
+    players_advanced.E_NET_RATING,
+    players_advanced.NET_RATING,
+    players_advanced.AST_PCT,
+    players_advanced.AST_TOV,
+    players_advanced.AST_RATIO,
+    COALESCE(players_fourfactors.OREB_PCT, players_advanced.OREB_PCT) AS OREB_PCT,
+    players_advanced.DREB_PCT,
+    players_advanced.REB_PCT,
+    COALESCE(players_fourfactors.TM_TOV_PCT, players_advanced.TM_TOV_PCT) AS TM_TOV_PCT,
+    COALESCE(players_fourfactors.EFG_PCT, players_advanced.EFG_PCT) AS EFG_PCT,
+    players_advanced.TS_PCT,
+    players_advanced.USG_PCT,
+    players_advanced.E_USG_PCT,
+    players_advanced.E_PACE,
+    players_advanced.PACE,
+    players_advanced.PACE_PER40,
+    players_advanced.POSS,
+    players_advanced.PIE,
 
     -- 5. Misc / Derived Stats
-    raw.players_fourfactors.FTA_RATE,
-    raw.players_fourfactors.OPP_EFG_PCT,
-    raw.players_fourfactors.OPP_FTA_RATE,
-    raw.players_fourfactors.OPP_TOV_PCT,
-    raw.players_fourfactors.OPP_OREB_PCT,
-    raw.players_misc.PTS_OFF_TOV,
-    raw.players_misc.PTS_2ND_CHANCE,
-    raw.players_misc.PTS_FB,
-    raw.players_misc.PTS_PAINT,
-    raw.players_misc.OPP_PTS_OFF_TOV,
-    raw.players_misc.OPP_PTS_2ND_CHANCE,
-    raw.players_misc.OPP_PTS_FB,
-    raw.players_misc.OPP_PTS_PAINT,
-    raw.players_misc.BLKA,
-    raw.players_misc.PFD,
+    players_fourfactors.FTA_RATE,
+    players_fourfactors.OPP_EFG_PCT,
+    players_fourfactors.OPP_FTA_RATE,
+    players_fourfactors.OPP_TOV_PCT,
+    players_fourfactors.OPP_OREB_PCT,
+    players_misc.PTS_OFF_TOV,
+    players_misc.PTS_2ND_CHANCE,
+    players_misc.PTS_FB,
+    players_misc.PTS_PAINT,
+    players_misc.OPP_PTS_OFF_TOV,
+    players_misc.OPP_PTS_2ND_CHANCE,
+    players_misc.OPP_PTS_FB,
+    players_misc.OPP_PTS_PAINT,
+    players_misc.BLKA,
+    players_misc.PFD,
 
     -- 6. Scoring Percentages
-    raw.players_scoring.PCT_FGA_2PT,
-    raw.players_scoring.PCT_FGA_3PT,
-    raw.players_scoring.PCT_PTS_2PT,
-    raw.players_scoring.PCT_PTS_2PT_MR,
-    raw.players_scoring.PCT_PTS_3PT,
-    raw.players_scoring.PCT_PTS_FB,
-    raw.players_scoring.PCT_PTS_FT,
-    raw.players_scoring.PCT_PTS_OFF_TOV,
-    raw.players_scoring.PCT_PTS_PAINT,
-    raw.players_scoring.PCT_AST_2PM,
-    raw.players_scoring.PCT_UAST_2PM,
-    raw.players_scoring.PCT_AST_3PM,
-    raw.players_scoring.PCT_UAST_3PM,
-    raw.players_scoring.PCT_AST_FGM,
-    raw.players_scoring.PCT_UAST_FGM
+    players_scoring.PCT_FGA_2PT,
+    players_scoring.PCT_FGA_3PT,
+    players_scoring.PCT_PTS_2PT,
+    players_scoring.PCT_PTS_2PT_MR,
+    players_scoring.PCT_PTS_3PT,
+    players_scoring.PCT_PTS_FB,
+    players_scoring.PCT_PTS_FT,
+    players_scoring.PCT_PTS_OFF_TOV,
+    players_scoring.PCT_PTS_PAINT,
+    players_scoring.PCT_AST_2PM,
+    players_scoring.PCT_UAST_2PM,
+    players_scoring.PCT_AST_3PM,
+    players_scoring.PCT_UAST_3PM,
+    players_scoring.PCT_AST_FGM,
+    players_scoring.PCT_UAST_FGM
 
-FROM raw.log_table
-LEFT JOIN raw.players_traditional
-    ON raw.log_table.GAME_ID::INT = raw.players_traditional.GAME_ID::INT
-    AND raw.log_table.TEAM_ABBREVIATION = raw.players_traditional.TEAM_ABBREVIATION
-LEFT JOIN raw.players_advanced
-    ON raw.players_traditional.GAME_ID::INT = raw.players_advanced.GAME_ID::INT
-    AND raw.players_traditional.PLAYER_ID = raw.players_advanced.PLAYER_ID
-LEFT JOIN raw.players_fourfactors
-    ON raw.players_advanced.GAME_ID::INT = raw.players_fourfactors.GAME_ID::INT
-    AND raw.players_advanced.PLAYER_ID = raw.players_fourfactors.PLAYER_ID
-LEFT JOIN raw.players_scoring
-    ON raw.players_fourfactors.GAME_ID::INT = raw.players_scoring.GAME_ID::INT
-    AND raw.players_fourfactors.PLAYER_ID = raw.players_scoring.PLAYER_ID
-LEFT JOIN raw.players_misc
-    ON raw.players_scoring.GAME_ID::INT = raw.players_misc.GAME_ID::INT
-    AND raw.players_scoring.PLAYER_ID = raw.players_misc.PLAYER_ID;
+FROM log_table
+LEFT JOIN players_traditional
+    ON players_traditional.GAME_ID = log_table.GAME_ID
+    AND players_traditional.TEAM_ID = log_table.TEAM_ID
+LEFT JOIN players_advanced
+    ON players_advanced.GAME_ID = players_traditional.GAME_ID
+    AND players_advanced.PLAYER_ID = players_traditional.PLAYER_ID
+LEFT JOIN players_fourfactors
+    ON players_fourfactors.GAME_ID = players_traditional.GAME_ID
+    AND players_fourfactors.PLAYER_ID = players_traditional.PLAYER_ID
+LEFT JOIN players_scoring
+    ON players_scoring.GAME_ID = players_traditional.GAME_ID
+    AND players_scoring.PLAYER_ID = players_traditional.PLAYER_ID
+LEFT JOIN players_misc
+    ON players_misc.GAME_ID = players_traditional.GAME_ID
+    AND players_misc.PLAYER_ID = players_traditional.PLAYER_ID;
@@ -1,15 +1,17 @@
 MODEL (
     name base.players_processed,
-    kind FULL
+    kind INCREMENTAL_BY_PARTITION,
+    partitioned_by SEASON_ID
 );
 WITH MINUTE_TABLE AS (
   SELECT *,
   CASE WHEN MIN IS NULL THEN '00:00'
   WHEN MIN = '' THEN '00:00'
   else MIN end as MINUTES
-  FROM base.players_combined 
-)
-WITH player_games AS (
+  FROM base.players_combined
+  WHERE @stale_seasons(base.players_combined)
+),
+player_games AS (
   SELECT 
     *,
 CASE 
@@ -164,4 +166,6 @@ pct_ast_fgm,
 pct_uast_fgm
 
 FROM ranked_games
-WHERE PLAYER_ID is not null;
+WHERE PLAYER_ID is not null
+-- written clustered: zone maps on SEASON_ID / PLAYER_ID skip row groups and the per player windows read sorted runs
+ORDER BY SEASON_ID, PLAYER_ID, GAME_DATE;
@@ -3,150 +3,172 @@ MODEL (
     kind FULL
 );
 
-SELECT DISTINCT
+-- every source deduplicated on its primary key (make_tables.PRIMARY_KEYS) before the joins, repeated inserts
+-- leave copies in raw.*; each one then joins straight to the log_table spine, so no DISTINCT
+WITH log_table AS (
+    SELECT * FROM raw.log_table
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.log_table GROUP BY GAME_ID, TEAM_ID)
+),
+teams_advanced AS (
+    SELECT * FROM raw.teams_advanced
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.teams_advanced GROUP BY GAME_ID, TEAM_ID)
+),
+teams_fourfactors AS (
+    SELECT * FROM raw.teams_fourfactors
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.teams_fourfactors GROUP BY GAME_ID, TEAM_ID)
+),
+teams_traditional AS (
+    SELECT * FROM raw.teams_traditional
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.teams_traditional GROUP BY GAME_ID, TEAM_ID)
+),
+teams_scoring AS (
+    SELECT * FROM raw.teams_scoring
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.teams_scoring GROUP BY GAME_ID, TEAM_ID)
+),
+teams_misc AS (
+    SELECT * FROM raw.teams_misc
+    WHERE rowid IN (SELECT MIN(rowid) FROM raw.teams_misc GROUP BY GAME_ID, TEAM_ID)
+),
+lines_table AS (
+    -- a sqlmesh model, read through its environment view which has no rowid
+    SELECT DISTINCT ON (GAME_ID, TEAM_ABBREVIATION) * FROM base.lines_table
+)
+SELECT
     -- 1. Information / Metadata
+    log_table.GAME_ID,
+    COALESCE(log_table.GAME_DATE, lines_table.GAME_DATE) AS GAME_DATE,
     COALESCE(
-        CAST(raw.log_table.GAME_ID AS VARCHAR),
-        CAST(raw.teams_fourfactors.GAME_ID AS VARCHAR),
-        CAST(base.lines_table.GAME_ID AS VARCHAR),
-        CAST(raw.teams_advanced.GAME_ID AS VARCHAR),
-        CAST(raw.teams_misc.GAME_ID AS VARCHAR),
-        CAST(raw.teams_scoring.GAME_ID AS VARCHAR),
-        CAST(raw.teams_traditional.GAME_ID AS VARCHAR)
-    ) AS GAME_ID,
-    COALESCE(raw.log_table.GAME_DATE, base.lines_table.GAME_DATE) AS GAME_DATE,
-    COALESCE(
-        raw.log_table.TEAM_ABBREVIATION,
-        raw.teams_fourfactors.TEAM_ABBREVIATION,
-        base.lines_table.TEAM_ABBREVIATION,
-        raw.teams_advanced.TEAM_ABBREVIATION,
-        raw.teams_misc.TEAM_ABBREVIATION,
-        raw.teams_scoring.TEAM_ABBREVIATION,
-        raw.teams_traditional.TEAM_ABBREVIATION
+        log_table.TEAM_ABBREVIATION,
+        teams_fourfactors.TEAM_ABBREVIATION,
+        lines_table.TEAM_ABBREVIATION,
+        teams_advanced.TEAM_ABBREVIATION,
+        teams_misc.TEAM_ABBREVIATION,
+        teams_scoring.TEAM_ABBREVIATION,
+        teams_traditional.TEAM_ABBREVIATION
     ) AS TEAM_ABBREVIATION,
-    raw.log_table.SEASON_ID,
+    log_table.SEASON_ID,
     COALESCE(
-        raw.log_table.TEAM_ID,
-        raw.teams_fourfactors.TEAM_ID,
-        raw.teams_advanced.TEAM_ID,
-        raw.teams_misc.TEAM_ID,
-        raw.teams_scoring.TEAM_ID,
-        raw.teams_traditional.TEAM_ID
+        log_table.TEAM_ID,
+        teams_fourfactors.TEAM_ID,
+        teams_advanced.TEAM_ID,
+        teams_misc.TEAM_ID,
+        teams_scoring.TEAM_ID,
+        teams_traditional.TEAM_ID
     ) AS TEAM_ID,
     COALESCE(
-        raw.log_table.TEAM_NAME,
-        raw.teams_fourfactors.TEAM_NAME,
-        raw.teams_advanced.TEAM_NAME,
-        raw.teams_misc.TEAM_NAME,
-        raw.teams_scoring.TEAM_NAME,
-        raw.teams_traditional.TEAM_NAME
+        log_table.TEAM_NAME,
+        teams_fourfactors.TEAM_NAME,
+        teams_advanced.TEAM_NAME,
+        teams_misc.TEAM_NAME,
+        teams_scoring.TEAM_NAME,
+        teams_traditional.TEAM_NAME
     ) AS TEAM_NAME,
-    COALESCE(raw.teams_fourfactors.TEAM_CITY, raw.teams_advanced.TEAM_CITY, raw.teams_misc.TEAM_CITY, raw.teams_scoring.TEAM_CITY, raw.teams_traditional.TEAM_CITY) AS TEAM_CITY,
-    raw.log_table.MATCHUP,
+    COALESCE(teams_fourfactors.TEAM_CITY, teams_advanced.TEAM_CITY, teams_misc.TEAM_CITY, teams_scoring.TEAM_CITY, teams_traditional.TEAM_CITY) AS TEAM_CITY,
+    log_table.MATCHUP,
 
     -- 2. Outcome Stats
-    raw.log_table.WL,
-    COALESCE(raw.log_table.PLUS_MINUS, raw.teams_traditional.PLUS_MINUS) AS PLUS_MINUS,
-    base.lines_table.LINE,
-    base.lines_table.OU,
+    log_table.WL,
+    COALESCE(log_table.PLUS_MINUS, teams_traditional.PLUS_MINUS) AS PLUS_MINUS,
+    lines_table.LINE,
+    lines_table.OU,
 
     -- 3. Core Box Score Stats (Numeric)
-    COALESCE(CAST(raw.log_table.MIN AS VARCHAR),CAST(raw.teams_fourfactors.MIN AS VARCHAR),CAST(raw.teams_advanced.MIN AS VARCHAR),CAST(raw.teams_misc.MIN AS VARCHAR),CAST(raw.teams_scoring.MIN AS VARCHAR),CAST(raw.teams_traditional.MIN AS VARCHAR)) as MIN,
-    COALESCE(raw.log_table.PTS, raw.teams_traditional.PTS) AS PTS,
-    COALESCE(raw.log_table.FGM, raw.teams_traditional.FGM) AS FGM,
-    COALESCE(raw.log_table.FGA, raw.teams_traditional.FGA) AS FGA,
-    COALESCE(raw.log_table.FG3M, raw.teams_traditional.FG3M) AS FG3M,
-    COALESCE(raw.log_table.FG3A, raw.teams_traditional.FG3A) AS FG3A,
-    COALESCE(raw.log_table.FTM, raw.teams_traditional.FTM) AS FTM,
-    COALESCE(raw.log_table.FTA, raw.teams_traditional.FTA) AS FTA,
-    COALESCE(raw.log_table.OREB, raw.teams_traditional.OREB) AS OREB,
-    COALESCE(raw.log_table.DREB, raw.teams_traditional.DREB) AS DREB,
-    COALESCE(raw.log_table.REB, raw.teams_traditional.REB) AS REB,
-    COALESCE(raw.log_table.AST, raw.teams_traditional.AST) AS AST,
-    COALESCE(raw.log_table.STL, raw.teams_traditional.STL) AS STL,
-    COALESCE(raw.log_table.BLK, raw.teams_misc.BLK, raw.teams_traditional.BLK) AS BLK,
-    raw.log_table.TOV,
-    COALESCE(raw.log_table.PF, raw.teams_misc.PF, raw.teams_traditional.PF) AS PF,
-    raw.teams_traditional.TO,
+    COALESCE(CAST(log_table.MIN AS VARCHAR),CAST(teams_fourfactors.MIN AS VARCHAR),CAST(teams_advanced.MIN AS VARCHAR),CAST(teams_misc.MIN AS VARCHAR),CAST(teams_scoring.MIN AS VARCHAR),CAST(teams_traditional.MIN AS VARCHAR)) as MIN,
+    COALESCE(log_table.PTS, teams_traditional.PTS) AS PTS,
+    COALESCE(log_table.FGM, teams_traditional.FGM) AS FGM,
+    COALESCE(log_table.FGA, teams_traditional.FGA) AS FGA,
+    COALESCE(log_table.FG3M, teams_traditional.FG3M) AS FG3M,
+    COALESCE(log_table.FG3A, teams_traditional.FG3A) AS FG3A,
+    COALESCE(log_table.FTM, teams_traditional.FTM) AS FTM,
+    COALESCE(log_table.FTA, teams_traditional.FTA) AS FTA,
+    COALESCE(log_table.OREB, teams_traditional.OREB) AS OREB,
+    COALESCE(log_table.DREB, teams_traditional.DREB) AS DREB,
+    COALESCE(log_table.REB, teams_traditional.REB) AS REB,
+    COALESCE(log_table.AST, teams_traditional.AST) AS AST,
+    COALESCE(log_table.STL, teams_traditional.STL) AS STL,
+    COALESCE(log_table.BLK, teams_misc.BLK, teams_traditional.BLK) AS BLK,
+    log_table.TOV,
+    COALESCE(log_table.PF, teams_misc.PF, teams_traditional.PF) AS PF,
+    teams_traditional.TO,
 
     -- 4. Misc Scoring
-    raw.teams_misc.PTS_OFF_TOV,
-    raw.teams_misc.PTS_2ND_CHANCE,
-    raw.teams_misc.PTS_FB,
-    raw.teams_misc.PTS_PAINT,
-    raw.teams_misc.OPP_PTS_OFF_TOV,
-    raw.teams_misc.OPP_PTS_2ND_CHANCE,
-    raw.teams_misc.OPP_PTS_FB,
-    raw.teams_misc.OPP_PTS_PAINT,
-    raw.teams_misc.BLKA,
-    raw.teams_misc.PFD,
+    teams_misc.PTS_OFF_TOV,
+    teams_misc.PTS_2ND_CHANCE,
+    teams_misc.PTS_FB,
+    teams_misc.PTS_PAINT,
+    teams_misc.OPP_PTS_OFF_TOV,
+    teams_misc.OPP_PTS_2ND_CHANCE,
+    teams_misc.OPP_PTS_FB,
+    teams_misc.OPP_PTS_PAINT,
+    teams_misc.BLKA,
+    teams_misc.PFD,
 
     -- 5. Percentages / Advanced
-    COALESCE(raw.log_table.FG_PCT, raw.teams_traditional.FG_PCT) AS FG_PCT,
-    COALESCE(raw.log_table.FG3_PCT, raw.teams_traditional.FG3_PCT) AS FG3_PCT,
-    COALESCE(raw.log_table.FT_PCT, raw.teams_traditional.FT_PCT) AS FT_PCT,
-    raw.teams_advanced.E_OFF_RATING,
-    raw.teams_advanced.OFF_RATING,
-    raw.teams_advanced.E_DEF_RATING,
-    raw.teams_advanced.DEF_RATING,
-    raw.teams_advanced.E_NET_RATING,
-    raw.teams_advanced.NET_RATING,
-    raw.teams_advanced.AST_PCT,
-    raw.teams_advanced.AST_TOV,
-    raw.teams_advanced.AST_RATIO,
-    COALESCE(raw.teams_fourfactors.OREB_PCT, raw.teams_advanced.OREB_PCT) AS OREB_PCT,
-    raw.teams_advanced.DREB_PCT,
-    raw.teams_advanced.REB_PCT,
-    raw.teams_advanced.E_TM_TOV_PCT,
-    COALESCE(raw.teams_fourfactors.TM_TOV_PCT, raw.teams_advanced.TM_TOV_PCT) AS TM_TOV_PCT,
-    COALESCE(raw.teams_fourfactors.EFG_PCT, raw.teams_advanced.EFG_PCT) AS EFG_PCT,
-    raw.teams_advanced.TS_PCT,
-    raw.teams_advanced.USG_PCT,
-    raw.teams_advanced.E_USG_PCT,
-    raw.teams_advanced.E_PACE,
-    raw.teams_advanced.PACE,
-    raw.teams_advanced.PACE_PER40,
-    raw.teams_advanced.POSS,
-    raw.teams_advanced.PIE,
-    raw.teams_fourfactors.FTA_RATE,
-    raw.teams_fourfactors.OPP_EFG_PCT,
-    raw.teams_fourfactors.OPP_FTA_RATE,
-    raw.teams_fourfactors.OPP_TOV_PCT,
-    raw.teams_fourfactors.OPP_OREB_PCT,
+    COALESCE(log_table.FG_PCT, teams_traditional.FG_PCT) AS FG_PCT,
+    COALESCE(log_table.FG3_PCT, teams_traditional.FG3_PCT) AS FG3_PCT,
+    COALESCE(log_table.FT_PCT, teams_traditional.FT_PCT) AS FT_PCT,
+    teams_advanced.E_OFF_RATING,
+    teams_advanced.OFF_RATING,
+    teams_advanced.E_DEF_RATING,
+    teams_advanced.DEF_RATING,
+    teams_advanced.E_NET_RATING,
+    teams_advanced.NET_RATING,
+    teams_advanced.AST_PCT,
+    teams_advanced.AST_TOV,
+    teams_advanced.AST_RATIO,
+    COALESCE(teams_fourfactors.OREB_PCT, teams_advanced.OREB_PCT) AS OREB_PCT,
+    teams_advanced.DREB_PCT,
+    teams_advanced.REB_PCT,
+    teams_advanced.E_TM_TOV_PCT,
+    COALESCE(teams_fourfactors.TM_TOV_PCT, teams_advanced.TM_TOV_PCT) AS TM_TOV_PCT,
+    COALESCE(teams_fourfactors.EFG_PCT, teams_advanced.EFG_PCT) AS EFG_PCT,
+    teams_advanced.TS_PCT,
+    teams_advanced.USG_PCT,
+    teams_advanced.E_USG_PCT,
+    teams_advanced.E_PACE,
+    teams_advanced.PACE,
+    teams_advanced.PACE_PER40,
+    teams_advanced.POSS,
+    teams_advanced.PIE,
+    teams_fourfactors.FTA_RATE,
+    teams_fourfactors.OPP_EFG_PCT,
+    teams_fourfactors.OPP_FTA_RATE,
+    teams_fourfactors.OPP_TOV_PCT,
+    teams_fourfactors.OPP_OREB_PCT,
 
     -- 6. Scoring Percent Breakdown
-    raw.teams_scoring.PCT_FGA_2PT,
-    raw.teams_scoring.PCT_FGA_3PT,
-    raw.teams_scoring.PCT_PTS_2PT,
-    raw.teams_scoring.PCT_PTS_2PT_MR,
-    raw.teams_scoring.PCT_PTS_3PT,
-    raw.teams_scoring.PCT_PTS_FB,
-    raw.teams_scoring.PCT_PTS_FT,
-    raw.teams_scoring.PCT_PTS_OFF_TOV,
-    raw.teams_scoring.PCT_PTS_PAINT,
-    raw.teams_scoring.PCT_AST_2PM,
-    raw.teams_scoring.PCT_UAST_2PM,
-    raw.teams_scoring.PCT_AST_3PM,
-    raw.teams_scoring.PCT_UAST_3PM,
-    raw.teams_scoring.PCT_AST_FGM,
-    raw.teams_scoring.PCT_UAST_FGM,
+    teams_scoring.PCT_FGA_2PT,
+    teams_scoring.PCT_FGA_3PT,
+    teams_scoring.PCT_PTS_2PT,
+    teams_scoring.PCT_PTS_2PT_MR,
+    teams_scoring.PCT_PTS_3PT,
+    teams_scoring.PCT_PTS_FB,
+    teams_scoring.PCT_PTS_FT,
+    teams_scoring.PCT_PTS_OFF_TOV,
+    teams_scoring.PCT_PTS_PAINT,
+    teams_scoring.PCT_AST_2PM,
+    teams_scoring.PCT_UAST_2PM,
+    teams_scoring.PCT_AST_3PM,
+    teams_scoring.PCT_UAST_3PM,
+    teams_scoring.PCT_AST_FGM,
+    teams_scoring.PCT_UAST_FGM,
 
-FROM raw.log_table
-LEFT JOIN raw.teams_advanced
-    ON raw.log_table.GAME_ID::int = raw.teams_advanced.GAME_ID::int
-    AND raw.log_table.TEAM_ABBREVIATION = raw.teams_advanced.TEAM_ABBREVIATION
-LEFT JOIN raw.teams_fourfactors
-    ON raw.log_table.GAME_ID::int = raw.teams_fourfactors.GAME_ID::int
-    AND raw.log_table.TEAM_ABBREVIATION = raw.teams_fourfactors.TEAM_ABBREVIATION
-LEFT JOIN raw.teams_traditional
-    ON raw.log_table.GAME_ID::int = raw.teams_traditional.GAME_ID::int
-    AND raw.log_table.TEAM_ABBREVIATION = raw.teams_traditional.TEAM_ABBREVIATION
-LEFT JOIN raw.teams_scoring
-    ON raw.log_table.GAME_ID::int = raw.teams_scoring.GAME_ID::int
-    AND raw.log_table.TEAM_ABBREVIATION = raw.teams_scoring.TEAM_ABBREVIATION
-LEFT JOIN raw.teams_misc
-    ON raw.log_table.GAME_ID::int = raw.teams_misc.GAME_ID::int
-    AND raw.log_table.TEAM_ABBREVIATION = raw.teams_misc.TEAM_ABBREVIATION
-LEFT JOIN base.lines_table
-    ON raw.log_table.GAME_ID::int = base.lines_table.GAME_ID::int
-    AND raw.log_table.TEAM_ABBREVIATION = base.lines_table.TEAM_ABBREVIATION;
+FROM log_table
+LEFT JOIN teams_advanced
+    ON teams_advanced.GAME_ID = log_table.GAME_ID
+    AND teams_advanced.TEAM_ID = log_table.TEAM_ID
+LEFT JOIN teams_fourfactors
+    ON teams_fourfactors.GAME_ID = log_table.GAME_ID
+    AND teams_fourfactors.TEAM_ID = log_table.TEAM_ID
+LEFT JOIN teams_traditional
+    ON teams_traditional.GAME_ID = log_table.GAME_ID
+    AND teams_traditional.TEAM_ID = log_table.TEAM_ID
+LEFT JOIN teams_scoring
+    ON teams_scoring.GAME_ID = log_table.GAME_ID
+    AND teams_scoring.TEAM_ID = log_table.TEAM_ID
+LEFT JOIN teams_misc
+    ON teams_misc.GAME_ID = log_table.GAME_ID
+    AND teams_misc.TEAM_ID = log_table.TEAM_ID
+LEFT JOIN lines_table
+    ON lines_table.GAME_ID = log_table.GAME_ID
+    AND lines_table.TEAM_ABBREVIATION = log_table.TEAM_ABBREVIATION;
@@ -1,6 +1,7 @@
 MODEL (
     name base.teams_processed,
-    kind FULL
+    kind INCREMENTAL_BY_PARTITION,
+    partitioned_by SEASON_ID
 );
 
 WITH base_data AS (
@@ -22,8 +23,10 @@ WITH base_data AS (
           CASE WHEN MATCHUP ILIKE '%vs.%' THEN SPLIT_PART(MATCHUP, 'vs.', 2)
                ELSE SPLIT_PART(MATCHUP, '@', 1)
           END
-        ) AS AWAY_TEAM
+        ) AS AWAY_TEAM,
+        REGEXP_REPLACE(MATCHUP, '.*(vs\\.|@) ', '') AS OPP_TEAM_ABBR
     FROM base.teams_combined
+    WHERE @stale_seasons(base.teams_combined)
 ),
 with_opponent AS (
     SELECT
@@ -53,127 +56,49 @@ outcomes AS (
     FROM with_opponent
 ),
 
-ranked_games AS (
+-- every schedule and record feature in one pass over outcomes, no correlated counts and no rejoins
+team_games AS (
     SELECT
         *,
-        ROW_NUMBER() OVER (
-            PARTITION BY TEAM_ID, SEASON_ID 
-            ORDER BY GAME_DATE
-        ) AS GAME_NUMBER,
-        MAX(GAME_DATE) OVER (
+        ROW_NUMBER() OVER team_season AS GAME_NUMBER,
+        LEAD(GAME_ID) OVER team_season AS NEXT_GAME_ID,
+        MAX(GAME_DATE) OVER (PARTITION BY TEAM_ID, SEASON_ID) AS LAST_TEAM_GAME_DATE,
+        DATE_DIFF('day', LAG(GAME_DATE) OVER team_season, GAME_DATE) AS DAYS_SINCE_LAST_GAME,
+
+        -- schedule density: 3 in 4 nights, 4 in 6 nights
+        @games_in_last_days(4, GAME_DATE, TEAM_ID, SEASON_ID) AS GAMES_LAST_4_DAYS,
+        @games_in_last_days(6, GAME_DATE, TEAM_ID, SEASON_ID) AS GAMES_LAST_6_DAYS,
+
+        -- SEASON_TYPE follows from SEASON_ID, so team_season is also the per season type record
+        SUM(CASE WHEN WL = 'W' THEN 1 ELSE 0 END) OVER team_season AS WINS_SO_FAR,
+        SUM(CASE WHEN WL = 'L' THEN 1 ELSE 0 END) OVER team_season AS LOSSES_SO_FAR,
+        SUM(CASE WHEN WL = 'W' THEN 1 ELSE 0 END) OVER last_10_games AS WINS_LAST_10,
+
+        -- THIS MAY NEED WORK:: TODO
+        SUM(CASE WHEN WL = 'W' THEN 1 ELSE 0 END) OVER vs_opponent AS WINS_VS_OPPONENT,
+        SUM(CASE WHEN WL = 'L' THEN 1 ELSE 0 END) OVER vs_opponent AS LOSSES_VS_OPPONENT
+    FROM outcomes
+    WINDOW
+        team_season AS (
             PARTITION BY TEAM_ID, SEASON_ID
-        ) AS LAST_TEAM_GAME_DATE,
-
-        -- Days since last game
-        DATE_DIFF(
-            'day',
-            CAST(LAG(GAME_DATE) OVER (
-                PARTITION BY TEAM_ID, SEASON_ID
-                ORDER BY GAME_DATE
-            ) AS DATE),
-            CAST(GAME_DATE AS DATE)
-        ) AS DAYS_SINCE_LAST_GAME,
-
-
-        -- Back-to-back flag
-        CASE 
-            WHEN DATE_DIFF(
-                'day',
-                CAST(LAG(GAME_DATE) OVER (
-                    PARTITION BY TEAM_ID, SEASON_ID
-                    ORDER BY GAME_DATE
-                ) AS DATE),
-                CAST(GAME_DATE AS DATE)
-            ) = 1 THEN 1 ELSE 0
-        END AS IS_BACK_TO_BACK,
-
-
-        -- 3 games in 4 nights
-        (
-            SELECT COUNT(*)
-            FROM outcomes o2
-            WHERE o2.TEAM_ID = o1.TEAM_ID
-            AND o2.SEASON_ID = o1.SEASON_ID
-            AND CAST(o2.GAME_DATE AS DATE) 
-                BETWEEN (CAST(o1.GAME_DATE AS DATE) - INTERVAL 3 DAY) 
-                    AND CAST(o1.GAME_DATE AS DATE)
-        ) AS GAMES_LAST_4_DAYS,
-
-        (
-            SELECT COUNT(*)
-            FROM outcomes o3
-            WHERE o3.TEAM_ID = o1.TEAM_ID
-            AND o3.SEASON_ID = o1.SEASON_ID
-            AND CAST(o3.GAME_DATE AS DATE) 
-                BETWEEN (CAST(o1.GAME_DATE AS DATE) - INTERVAL 5 DAY) 
-                    AND CAST(o1.GAME_DATE AS DATE)
-        ) AS GAMES_LAST_6_DAYS
-
-
-    FROM outcomes o1
-),
-
-
-
-record_agg AS (
-    SELECT
-        TEAM_ID,
-        SEASON_ID,
-        SEASON_TYPE,
-        GAME_ID,
-        GAME_DATE,
-        SUM(CASE WHEN WL = 'W' THEN 1 ELSE 0 END) OVER (
-            PARTITION BY TEAM_ID, SEASON_ID, SEASON_TYPE
             ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
-        ) AS WINS_SO_FAR,
-        SUM(CASE WHEN WL = 'L' THEN 1 ELSE 0 END) OVER (
-            PARTITION BY TEAM_ID, SEASON_ID, SEASON_TYPE
+        ),
+        last_10_games AS (
+            PARTITION BY TEAM_ID, SEASON_ID
+            ORDER BY GAME_DATE
+            ROWS BETWEEN 9 PRECEDING AND CURRENT ROW
+        ),
+        vs_opponent AS (
+            PARTITION BY TEAM_ID, OPP_TEAM_ABBR, SEASON_ID
             ORDER BY GAME_DATE
-            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
-        ) AS LOSSES_SO_FAR,
-        ROUND(
-            SUM(CASE WHEN WL = 'W' THEN 1 ELSE 0 END) OVER (
-                PARTITION BY TEAM_ID, SEASON_ID, SEASON_TYPE
-                ORDER BY GAME_DATE
-                ROWS BETWEEN 9 PRECEDING AND CURRENT ROW
-            ) * 1.0
-            /
-            LEAST(10, ROW_NUMBER() OVER (
-                PARTITION BY TEAM_ID, SEASON_ID, SEASON_TYPE
-                ORDER BY GAME_DATE
-            )),
-            3
-        ) AS LAST_10_WIN_PCT
-    FROM ranked_games
-),
--- THIS MAY NEED WORK:: TODO
-vs_opponent_record AS (
-    SELECT
-        r.TEAM_ID,
-        r.SEASON_ID,
-        r.SEASON_TYPE,
-        r.GAME_ID,
-        REGEXP_REPLACE(r.MATCHUP, '.*(vs\\.|@) ', '') AS OPP_TEAM_ABBR,
-        SUM(CASE WHEN r.WL = 'W' THEN 1 ELSE 0 END) OVER (
-            PARTITION BY r.TEAM_ID, OPP_TEAM_ABBR, r.SEASON_ID, r.SEASON_TYPE
-            ORDER BY r.GAME_DATE
-            ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
-        ) AS WINS_VS_OPPONENT,
-        SUM(CASE WHEN r.WL = 'L' THEN 1 ELSE 0 END) OVER (
-            PARTITION BY r.TEAM_ID, OPP_TEAM_ABBR, r.SEASON_ID, r.SEASON_TYPE
-            ORDER BY r.GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
-        ) AS LOSSES_VS_OPPONENT
-    FROM ranked_games AS r
+        )
 )
 SELECT
     -- 1. Metadata / Identifiers
     t1.GAME_ID,
-    LEAD(t1.game_id) OVER (
-      PARTITION BY t1.season_id, t1.team_id
-      ORDER BY t1.game_date
-    ) AS next_game_id,
+    t1.NEXT_GAME_ID,
     t1.GAME_DATE,
     t1.SEASON_ID,
     t1.SEASON_TYPE,
@@ -187,7 +112,7 @@ SELECT
     t1.MATCHUP,
     t1.GAME_NUMBER,
     t1.DAYS_SINCE_LAST_GAME,
-    t1.IS_BACK_TO_BACK,
+    CASE WHEN t1.DAYS_SINCE_LAST_GAME = 1 THEN 1 ELSE 0 END AS IS_BACK_TO_BACK,
     CASE WHEN t1.GAMES_LAST_4_DAYS >= 3 THEN 1 ELSE 0 END AS IS_3_IN_4,
     CASE WHEN t1.GAMES_LAST_6_DAYS >= 4 THEN 1 ELSE 0 END AS IS_4_IN_6,
     CASE WHEN t1.GAME_DATE = t1.LAST_TEAM_GAME_DATE THEN 1 ELSE 0 END AS IS_LAST_TEAM_GAME,
@@ -202,11 +127,11 @@ SELECT
     t1.OU_RESULT,
 
     -- 3. Betting Record & Rolling Performance
-    r.WINS_SO_FAR,
-    r.LOSSES_SO_FAR,
-    r.LAST_10_WIN_PCT,
-    v.WINS_VS_OPPONENT,
-    v.LOSSES_VS_OPPONENT,
+    t1.WINS_SO_FAR,
+    t1.LOSSES_SO_FAR,
+    ROUND(t1.WINS_LAST_10 * 1.0 / LEAST(10, t1.GAME_NUMBER), 3) AS LAST_10_WIN_PCT,
+    t1.WINS_VS_OPPONENT,
+    t1.LOSSES_VS_OPPONENT,
 
     -- 4. Core Box Score Stats
     t1.PTS,
@@ -287,8 +212,6 @@ SELECT
     t1.PCT_AST_FGM,
     t1.PCT_UAST_FGM
 
-FROM ranked_games t1
-LEFT JOIN record_agg r
-    ON t1.TEAM_ID = r.TEAM_ID AND t1.GAME_ID = r.GAME_ID
-LEFT JOIN vs_opponent_record v
-    ON t1.TEAM_ID = v.TEAM_ID AND t1.GAME_ID = v.GAME_ID;
\ No newline at end of file
+FROM team_games t1
+-- written clustered, see players_processed
+ORDER BY t1.SEASON_ID, t1.TEAM_ID, t1.GAME_DATE;
@@ -1,6 +1,7 @@
 MODEL (
   name fantasy.base_data,
-  kind FULL,
+  kind INCREMENTAL_BY_PARTITION,
+  partitioned_by SEASON_ID,
   description "fantasy basketball stats"
 );
 SELECT
@@ -28,4 +29,5 @@ SELECT
   ELSE 0
   END AS DOUBLE_DOUBLE
     
-FROM BASE.players_processed
\ No newline at end of file
+FROM BASE.players_processed
+WHERE @stale_seasons(base.players_processed)
\ No newline at end of file
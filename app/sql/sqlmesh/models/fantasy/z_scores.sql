@@ -1,6 +1,7 @@
 MODEL (
   name fantasy.z_scores,
-  kind FULL,
+  kind INCREMENTAL_BY_PARTITION,
+  partitioned_by SEASON_ID,
   description """fantasy basketball stats cumulative z scores
                  z scores calculated for each season dataset"""
 );
@@ -17,49 +18,49 @@ select
   
 SUM(MINUTES) OVER (
     PARTITION BY PLAYER_ID, SEASON_ID
-    ORDER BY CAST(GAME_DATE AS DATE)
+    ORDER BY GAME_DATE
     ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
 ) AS MINUTES_CUMULATIVE,
 
 SUM(POINTS) OVER (
     PARTITION BY PLAYER_ID, SEASON_ID
-    ORDER BY CAST(GAME_DATE AS DATE)
+    ORDER BY GAME_DATE
     ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
 ) AS POINTS_CUMULATIVE,
 
 SUM(ASSISTS) OVER (
     PARTITION BY PLAYER_ID, SEASON_ID
-    ORDER BY CAST(GAME_DATE AS DATE)
+    ORDER BY GAME_DATE
     ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
 ) AS ASSISTS_CUMULATIVE,
 
 SUM(STEALS) OVER (
     PARTITION BY PLAYER_ID, SEASON_ID
-    ORDER BY CAST(GAME_DATE AS DATE)
+    ORDER BY GAME_DATE
     ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
 ) AS STEALS_CUMULATIVE,
 
 SUM(BLOCKS) OVER (
     PARTITION BY PLAYER_ID, SEASON_ID
-    ORDER BY CAST(GAME_DATE AS DATE)
+    ORDER BY GAME_DATE
     ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
 ) AS BLOCKS_CUMULATIVE,
 
 SUM(REBOUNDS) OVER (
     PARTITION BY PLAYER_ID, SEASON_ID
-    ORDER BY CAST(GAME_DATE AS DATE)
+    ORDER BY GAME_DATE
     ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
 ) AS REBOUNDS_CUMULATIVE,
 
 SUM(THREES) OVER (
     PARTITION BY PLAYER_ID, SEASON_ID
-    ORDER BY CAST(GAME_DATE AS DATE)
+    ORDER BY GAME_DATE
     ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
 ) AS THREES_CUMULATIVE,
 
 SUM(DOUBLE_DOUBLE) OVER (
     PARTITION BY PLAYER_ID, SEASON_ID
-    ORDER BY CAST(GAME_DATE AS DATE)
+    ORDER BY GAME_DATE
     ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
 ) AS DOUBLE_DOUBLE_CUMULATIVE,
 
@@ -70,7 +71,7 @@ CASE
 END
 ) OVER (
 PARTITION BY PLAYER_ID, SEASON_ID
-ORDER BY CAST(GAME_DATE AS DATE)
+ORDER BY GAME_DATE
 ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
 ) AS AVG_EFG_PCT,
 
@@ -81,11 +82,12 @@ CASE
 END
 ) OVER (
 PARTITION BY PLAYER_ID, SEASON_ID
-ORDER BY CAST(GAME_DATE AS DATE)
+ORDER BY GAME_DATE
 ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
 ) AS AVG_FT_PCT
 
 FROM fantasy.base_data
+WHERE @stale_seasons(fantasy.base_data, match_games := FALSE)
 
 )
 , season_totals as (
@@ -1,6 +1,6 @@
 MODEL (
   name fantasy.z_scores_all,
-  kind FULL,
+  kind FULL, -- z scores over every season at once, a new game changes all of them
   description """fantasy basketball stats cumulative z scores
                  z scores calculated with entire dataset"""
 );
@@ -19,49 +19,49 @@ cumulative AS (
         -- Cumulative stats
         SUM(MINUTES) OVER (
             PARTITION BY PLAYER_ID, SEASON_ID
-            ORDER BY CAST(GAME_DATE AS DATE)
+            ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
         ) AS MINUTES_CUMULATIVE,
 
         SUM(POINTS) OVER (
             PARTITION BY PLAYER_ID, SEASON_ID
-            ORDER BY CAST(GAME_DATE AS DATE)
+            ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
         ) AS POINTS_CUMULATIVE,
 
         SUM(ASSISTS) OVER (
             PARTITION BY PLAYER_ID, SEASON_ID
-            ORDER BY CAST(GAME_DATE AS DATE)
+            ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
         ) AS ASSISTS_CUMULATIVE,
 
         SUM(STEALS) OVER (
             PARTITION BY PLAYER_ID, SEASON_ID
-            ORDER BY CAST(GAME_DATE AS DATE)
+            ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
         ) AS STEALS_CUMULATIVE,
 
         SUM(BLOCKS) OVER (
             PARTITION BY PLAYER_ID, SEASON_ID
-            ORDER BY CAST(GAME_DATE AS DATE)
+            ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
         ) AS BLOCKS_CUMULATIVE,
 
         SUM(REBOUNDS) OVER (
             PARTITION BY PLAYER_ID, SEASON_ID
-            ORDER BY CAST(GAME_DATE AS DATE)
+            ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
         ) AS REBOUNDS_CUMULATIVE,
 
         SUM(THREES) OVER (
             PARTITION BY PLAYER_ID, SEASON_ID
-            ORDER BY CAST(GAME_DATE AS DATE)
+            ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
         ) AS THREES_CUMULATIVE,
 
         SUM(DOUBLE_DOUBLE) OVER (
             PARTITION BY PLAYER_ID, SEASON_ID
-            ORDER BY CAST(GAME_DATE AS DATE)
+            ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
         ) AS DOUBLE_DOUBLE_CUMULATIVE,
 
@@ -72,7 +72,7 @@ cumulative AS (
             END
         ) OVER (
             PARTITION BY PLAYER_ID, SEASON_ID
-            ORDER BY CAST(GAME_DATE AS DATE)
+            ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
         ) AS AVG_EFG_PCT,
 
@@ -83,7 +83,7 @@ cumulative AS (
             END
         ) OVER (
             PARTITION BY PLAYER_ID, SEASON_ID
-            ORDER BY CAST(GAME_DATE AS DATE)
+            ORDER BY GAME_DATE
             ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
         ) AS AVG_FT_PCT
 
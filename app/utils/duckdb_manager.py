@@ -0,0 +1,86 @@
+import threading
+
+import duckdb
+import pyarrow as pa
+
+
+class ConnectionManager:
+    """
+    one duckdb connection for a whole collection run, shared by every DataWriter
+
+    the raw tables and their column order are read once (one information_schema query) and cached,
+    batches go in as arrow tables, one transaction per flush so teams and players land together
+
+    duckdb allows a single writing process, the connection holds the lock on nba.db until close()
+    """
+
+    def __init__(self, database_path, logger=None, schema='raw'):
+        self.database_path = database_path
+        self.logger = logger
+        self.schema = schema
+        self.conn = None
+        self.columns = None  # table name -> column names in table order
+        self.rows_inserted = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = duckdb.connect(self.database_path)
+            self.load_columns()
+        return self.conn
+
+    def load_columns(self):
+        rows = self.conn.execute("""
+            SELECT TABLE_NAME, COLUMN_NAME
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = ?
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """, [self.schema]).fetchall()
+        self.columns = dict()
+        for table_name, column_name in rows:
+            self.columns.setdefault(table_name, []).append(column_name)
+
+    def table_columns(self, table_name):
+        """column names of schema.table_name in table order, None when the table does not exist"""
+        self.connect()
+        return self.columns.get(table_name)
+
+    def insert(self, batches):
+        """
+        batches: list of (table_name, pandas frame)
+        all batches go in one transaction, columns missing from a frame are NULL, columns missing from the table are dropped
+        returns rows inserted per table, tables that do not exist are skipped (and not in the result)
+        """
+        inserted = dict()
+        with self.lock:
+            conn = self.connect()
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                for table_name, stats in batches:
+                    columns = self.table_columns(table_name)
+                    if columns is None:
+                        if self.logger:
+                            self.logger.log_warning(f"duckdb insert: no table found for {self.schema}.{table_name}")
+                        continue
+                    if stats is None or stats.empty:
+                        inserted[table_name] = 0
+                        continue
+                    shared = [c for c in columns if c in stats.columns]
+                    conn.register('batch', pa.Table.from_pandas(stats[shared], preserve_index=False))
+                    column_list = ', '.join(f'"{c}"' for c in shared)
+                    conn.execute(f'INSERT INTO {self.schema}.{table_name} ({column_list}) SELECT {column_list} FROM batch')
+                    conn.unregister('batch')
+                    inserted[table_name] = len(stats)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self.rows_inserted += sum(inserted.values())
+        return inserted
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+                self.columns = None
@@ -1,48 +1,142 @@
+import json
 import logging
-import inspect
+import multiprocessing.util
+import os
+import queue
+import random
+import threading
+import atexit
+from logging.handlers import QueueHandler, QueueListener
+
+
+# NBA_LOG_FORMAT=json writes one json object per line instead of the | separated text lines
+LOG_FORMAT = os.environ.get('NBA_LOG_FORMAT', 'text')
+# log_sql keeps this fraction of statements and cuts each one to this many characters (0, the default, keeps them whole)
+SQL_SAMPLE_RATE = float(os.environ.get('NBA_SQL_LOG_SAMPLE', '1.0'))
+SQL_MAX_CHARS = int(os.environ.get('NBA_SQL_LOG_MAX_CHARS', '0'))
+
+TEXT_FORMAT = '%(asctime)s | %(levelname)s | Function %(funcName)s | %(message)s | %(filename)s:%(lineno)d'
+SQL_FORMAT = '%(asctime)s | SQL | %(message)s'
+
+# logger name -> QueueListener writing its file, one background writer thread per file and process
+_listeners = dict()
+_listeners_lock = threading.Lock()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """one json object per record, keyword fields given to log_info / log_warning / log_error become keys"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'function': record.funcName,
+            'file': record.filename,
+            'line': record.lineno,
+            'pid': record.process,
+            'message': record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def stop_listeners():
+    """flush and stop every background writer, runs at exit (also in multiprocessing workers, which skip atexit)"""
+    with _listeners_lock:
+        for listener in _listeners.values():
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+        _listeners.clear()
+
+
+atexit.register(stop_listeners)
+multiprocessing.util.Finalize(None, stop_listeners, exitpriority=100)
 
 
 class Logger:
-    def __init__(self, log_file='logs/log.log', sql_log_file='logs/sql.log'):
-        self.logger = logging.getLogger('StatLogger')
+    """
+    log_info / log_warning / log_error / log_sql, used everywhere in the pipeline
+
+    the caller's function, file and line come from logging itself (stacklevel), records go through a
+    QueueHandler and a background QueueListener writes the file, so a log call never waits on disk
+    """
+
+    def __init__(self, log_file='logs/log.log', sql_log_file='logs/sql.log', log_format=None, sql_sample_rate=None, sql_max_chars=None):
+        self.log_format = log_format or LOG_FORMAT
+        self.sql_sample_rate = SQL_SAMPLE_RATE if sql_sample_rate is None else sql_sample_rate
+        self.sql_max_chars = SQL_MAX_CHARS if sql_max_chars is None else sql_max_chars
+
+        # one logging.Logger per file, format and process: Loggers on different files don't share a handler, a json
+        # Logger never writes through a text handler (it would drop the fields), and a forked worker never writes
+        # through the handler it inherited from its parent
+        self.logger = logging.getLogger(self.logger_name('StatLogger', log_file, self.log_format))
         self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
         self.log_file = log_file
 
-        self.sql_logger = logging.getLogger('SQLLogger')
+        self.sql_logger = logging.getLogger(self.logger_name('SQLLogger', sql_log_file, self.log_format))
         self.sql_logger.setLevel(logging.INFO)
+        self.sql_logger.propagate = False
         self.sql_log_file = sql_log_file
 
         self.setup_logger()
         self.setup_sql_logger()
 
+    @staticmethod
+    def logger_name(name, log_file, log_format):
+        return f"{name}:{os.getpid()}:{log_format}:{os.path.abspath(log_file).replace('.', '_')}"
+
     def setup_logger(self):
-        file_handler = logging.FileHandler(self.log_file)
-        file_handler.setLevel(logging.INFO)
-        formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(message)s | %(filename)s | %(funcName)s')
-        file_handler.setFormatter(formatter)
-        # Prevent adding multiple handlers if already set
-        if not self.logger.handlers:
-            self.logger.addHandler(file_handler)
+        formatter = JsonLinesFormatter() if self.log_format == 'json' else logging.Formatter(TEXT_FORMAT)
+        self.attach(self.logger, self.log_file, formatter)
 
     def setup_sql_logger(self):
-        file_handler = logging.FileHandler(self.sql_log_file)
-        file_handler.setLevel(logging.INFO)
-        formatter = logging.Formatter('%(asctime)s | SQL | %(message)s')
-        file_handler.setFormatter(formatter)
-        if not self.sql_logger.handlers:
-            self.sql_logger.addHandler(file_handler)
+        formatter = JsonLinesFormatter() if self.log_format == 'json' else logging.Formatter(SQL_FORMAT)
+        self.attach(self.sql_logger, self.sql_log_file, formatter)
+
+    @staticmethod
+    def attach(logger, log_file, formatter):
+        # Prevent adding multiple handlers if already set
+        with _listeners_lock:
+            if logger.name in _listeners:
+                return
+            os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+            file_handler = logging.FileHandler(log_file)
+            file_handler.setLevel(logging.INFO)
+            file_handler.setFormatter(formatter)
+            records = queue.SimpleQueue()
+            listener = QueueListener(records, file_handler, respect_handler_level=True)
+            listener.start()
+            logger.handlers = [QueueHandler(records)]
+            _listeners[logger.name] = listener
+
+    def log(self, level, message, fields):
+        if not self.logger.isEnabledFor(level):
+            return
+        extra = None
+        if fields:
+            if self.log_format == 'json':
+                extra = {'fields': fields}
+            else:
+                message = f"{message} | " + ' '.join(f'{key}={value}' for key, value in fields.items())
+        # stacklevel 3: the function that called log_info / log_warning / log_error
+        self.logger.log(level, message, extra=extra, stacklevel=3)
 
-    def log_info(self, message):
-        caller_function = inspect.stack()[1].function
-        self.logger.info(f'Function {caller_function} | {message}')
+    def log_info(self, message, **fields):
+        self.log(logging.INFO, message, fields)
 
-    def log_warning(self, message):
-        caller_function = inspect.stack()[1].function
-        self.logger.warning(f'Function {caller_function} | {message}')
+    def log_warning(self, message, **fields):
+        self.log(logging.WARNING, message, fields)
 
-    def log_error(self, message):
-        caller_function = inspect.stack()[1].function
-        self.logger.error(f'Function {caller_function} | {message}')
+    def log_error(self, message, **fields):
+        self.log(logging.ERROR, message, fields)
 
     def log_sql(self, message):
+        if self.sql_sample_rate < 1 and random.random() >= self.sql_sample_rate:
+            return
+        if self.sql_max_chars and len(message) > self.sql_max_chars:
+            message = f"{message[:self.sql_max_chars]} ... [{len(message) - self.sql_max_chars} more characters]"
         self.sql_logger.info(message)
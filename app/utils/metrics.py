@@ -0,0 +1,305 @@
+"""
+stage level metrics of the pipeline, one row per stage run in metrics.run_history of nba.db
+
+    wall time, rows in / out, bytes read, http calls, cache hits, retries and the error a stage failed with
+    duckdb query profiles of the heavy statements (profile()), one row each in metrics.query_profiles
+
+every stage of one run shares its run_id: NBA_RUN_ID when set (a pipeline run sets it for every step), a new one
+per process otherwise. NBA_METRICS=off records nothing and leaves query profiling off
+
+    python -m app.utils.metrics report
+    python -m app.utils.metrics report --runs 20 --stage update_duckdb
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import duckdb
+
+from .logger import Logger
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DATABASE_PATH = os.environ.get('NBA_DATABASE_PATH', os.path.join(BASE_PATH, 'app', 'database'))
+METRICS_ENABLED = os.environ.get('NBA_METRICS', 'on') != 'off'
+RUN_ID = os.environ.get('NBA_RUN_ID') or f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+RUN_HISTORY_TABLE = 'metrics.run_history'
+QUERY_PROFILES_TABLE = 'metrics.query_profiles'
+COUNTERS = ('rows_in', 'rows_out', 'bytes_read', 'http_calls', 'cache_hits', 'retries')
+# profiled statements are kept to this many characters, longer ones are written whole to the sql log
+QUERY_CHARS = 300
+
+
+class StageMetrics:
+    """
+    counters and wall time of one stage, add() is thread safe so fetch workers can share it
+
+        with StageMetrics('update_duckdb', logger) as metrics:
+            metrics.add(rows_in=n)
+            metrics.profile(conn, 'insert')   # right after the statement to profile
+
+    on exit the stage is recorded into metrics.run_history (with its error when it raised, the error still propagates).
+    a stage that runs in worker processes merge()s their metrics, they pickle without their lock
+    """
+
+    def __init__(self, stage, logger=None, run_id=RUN_ID, enabled=METRICS_ENABLED, database_path=DATABASE_PATH):
+        self.stage = stage
+        self.logger = logger
+        self.run_id = run_id
+        self.enabled = enabled
+        self.database_path = database_path
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.profiles = []
+        self.started_at = None
+        self.seconds = None
+        self.error = None
+        self.start = None
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock'], state['logger']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state, lock=threading.Lock(), logger=None)
+
+    def __enter__(self):
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(f"{exc_type.__name__}: {exc}" if exc_type else None)
+        self.record()
+        return False
+
+    def add(self, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                self.counts[name] += value or 0
+
+    def merge(self, other):
+        """add another StageMetrics' counters and profiles (a season worker's) to this one"""
+        self.add(**other.counts)
+        with self.lock:
+            self.profiles.extend(other.profiles)
+
+    def enable_profiling(self, conn):
+        """profile every statement of conn from now on, profile() reads the last one"""
+        if self.enabled:
+            conn.execute("PRAGMA enable_profiling='no_output'")
+
+    def profile(self, conn, label, scanned=False):
+        """
+        keep the duckdb profile of the statement conn just ran (enable_profiling first), its bytes read count in
+        bytes_read, scanned: its rows scanned count in rows_in (sql stages with no other count of what they read)
+        returns the profile dict, None when metrics are off
+        """
+        if not self.enabled:
+            return None
+        try:
+            info = json.loads(conn.get_profiling_information(format='json'))
+        except Exception as e:
+            if self.logger:
+                self.logger.log_warning(f"no query profile for {self.stage} {label}: {e}")
+            return None
+        query = info.get('query_name', '')
+        if len(query) > QUERY_CHARS and self.logger:
+            self.logger.log_sql(f"{self.stage} {label}: {query}")
+        profile = {
+            'label': label,
+            'query': query[:QUERY_CHARS],
+            'latency': info.get('latency'),
+            'cpu_time': info.get('cpu_time'),
+            'rows_returned': info.get('rows_returned'),
+            'rows_scanned': info.get('cumulative_rows_scanned'),
+            'bytes_read': info.get('total_bytes_read'),
+            'bytes_written': info.get('total_bytes_written'),
+            'peak_buffer_memory': info.get('system_peak_buffer_memory')
+        }
+        with self.lock:
+            self.profiles.append(profile)
+            self.counts['bytes_read'] += profile['bytes_read'] or 0
+            if scanned:
+                self.counts['rows_in'] += profile['rows_scanned'] or 0
+        return profile
+
+    def finish(self, error=None):
+        """error: what the stage raised, a stage that catches its own errors sets self.error before it exits"""
+        self.seconds = time.perf_counter() - self.start
+        self.error = error or self.error
+
+    def record(self, conn=None):
+        """the stage row and its query profiles into nba.db, a failure to record is logged and never raised"""
+        if not self.enabled:
+            return
+        try:
+            own = conn is None
+            conn = conn or duckdb.connect(os.path.join(self.database_path, 'nba.db'))
+            try:
+                create_tables(conn)
+                conn.execute(
+                    f"INSERT INTO {RUN_HISTORY_TABLE} VALUES (?, ?, to_timestamp(?)::TIMESTAMP, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [self.run_id, self.stage, self.started_at, self.seconds, *(self.counts[c] for c in COUNTERS), len(self.profiles), self.error]
+                )
+                if self.profiles:
+                    conn.executemany(
+                        f"INSERT INTO {QUERY_PROFILES_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [[self.run_id, self.stage, *p.values()] for p in self.profiles]
+                    )
+            finally:
+                if own:
+                    conn.close()
+        except Exception as e:
+            if self.logger:
+                self.logger.log_warning(f"could not record metrics of {self.stage}: {e}")
+            return
+        if self.logger:
+            self.logger.log_info(f"{self.stage} metrics", run_id=self.run_id, seconds=round(self.seconds, 3), error=self.error,
+                                 **self.counts, queries=len(self.profiles))
+
+
+def create_tables(conn):
+    conn.execute("CREATE SCHEMA IF NOT EXISTS metrics")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {RUN_HISTORY_TABLE} (
+            run_id VARCHAR,
+            stage VARCHAR,
+            started_at TIMESTAMP,
+            seconds DOUBLE,
+            rows_in BIGINT,
+            rows_out BIGINT,
+            bytes_read BIGINT,
+            http_calls BIGINT,
+            cache_hits BIGINT,
+            retries BIGINT,
+            queries BIGINT,
+            error VARCHAR
+        )
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {QUERY_PROFILES_TABLE} (
+            run_id VARCHAR,
+            stage VARCHAR,
+            label VARCHAR,
+            query VARCHAR,
+            latency DOUBLE,
+            cpu_time DOUBLE,
+            rows_returned BIGINT,
+            rows_scanned BIGINT,
+            bytes_read BIGINT,
+            bytes_written BIGINT,
+            peak_buffer_memory BIGINT
+        )
+    """)
+
+
+def slowest_stages(conn, run_id=None, limit=10):
+    """[(stage, seconds, rows_in, rows_out, bytes_read, http_calls, cache_hits, retries, error)] of run_id, the latest run by default"""
+    run_id = run_id or latest_run(conn)
+    return run_id, conn.execute(f"""
+        SELECT stage, SUM(seconds), SUM(rows_in), SUM(rows_out), SUM(bytes_read), SUM(http_calls), SUM(cache_hits), SUM(retries),
+               MAX(error)
+        FROM {RUN_HISTORY_TABLE}
+        WHERE run_id = ?
+        GROUP BY stage
+        ORDER BY 2 DESC
+        LIMIT ?
+    """, [run_id, limit]).fetchall()
+
+
+def slowest_queries(conn, run_id=None, limit=10):
+    """[(stage, label, latency, cpu_time, rows_scanned, bytes_read, peak_buffer_memory, query)] of run_id"""
+    run_id = run_id or latest_run(conn)
+    return conn.execute(f"""
+        SELECT stage, label, latency, cpu_time, rows_scanned, bytes_read, peak_buffer_memory, query
+        FROM {QUERY_PROFILES_TABLE}
+        WHERE run_id = ?
+        ORDER BY latency DESC
+        LIMIT ?
+    """, [run_id, limit]).fetchall()
+
+
+def stage_trend(conn, runs=10, stage=None):
+    """
+    {stage: [(run_id, seconds, rows_out)]} over the last runs runs, oldest first
+    a run's seconds of a stage are summed (a stage recorded once per season worker, per export...)
+    """
+    stage_filter = "AND stage = ?" if stage else ""
+    rows = conn.execute(f"""
+        WITH recent AS (
+            SELECT run_id
+            FROM {RUN_HISTORY_TABLE}
+            GROUP BY run_id
+            ORDER BY MIN(started_at) DESC
+            LIMIT ?
+        )
+        SELECT stage, run_id, SUM(seconds), SUM(rows_out), MIN(started_at) AS started_at
+        FROM {RUN_HISTORY_TABLE}
+        WHERE run_id IN (SELECT run_id FROM recent) {stage_filter}
+        GROUP BY stage, run_id
+        ORDER BY stage, started_at
+    """, [runs] + ([stage] if stage else [])).fetchall()
+    trend = dict()
+    for name, run_id, seconds, rows_out, _ in rows:
+        trend.setdefault(name, []).append((run_id, seconds, rows_out))
+    return trend
+
+
+def latest_run(conn):
+    row = conn.execute(f"SELECT run_id FROM {RUN_HISTORY_TABLE} ORDER BY started_at DESC LIMIT 1").fetchone()
+    return row[0] if row else None
+
+
+def report(conn, runs=10, stage=None, limit=10):
+    """the report command's text: slowest stages and queries of the latest run, seconds per stage across runs"""
+    create_tables(conn)
+    run_id, stages = slowest_stages(conn, limit=limit)
+    if run_id is None:
+        return "no runs recorded yet"
+    lines = [f"slowest stages of run {run_id}",
+             f"{'stage':40} {'seconds':>9} {'rows in':>11} {'rows out':>11} {'MB read':>9} {'http':>7} {'cached':>7} {'retries':>7}"]
+    for name, seconds, rows_in, rows_out, bytes_read, http_calls, cache_hits, retries, error in stages:
+        lines.append(f"{name:40} {seconds:9.2f} {rows_in:11} {rows_out:11} {bytes_read / 1e6:9.1f} {http_calls:7} {cache_hits:7} {retries:7}"
+                     + (f"  FAILED {error}" if error else ""))
+
+    queries = slowest_queries(conn, run_id, limit)
+    if queries:
+        lines += ["", f"slowest queries of run {run_id}",
+                  f"{'stage':30} {'label':30} {'seconds':>9} {'cpu':>9} {'rows scanned':>13} {'MB read':>9} {'peak MB':>9}  query"]
+        for name, label, latency, cpu_time, rows_scanned, bytes_read, peak, query in queries:
+            lines.append(f"{name:30} {label[:30]:30} {latency:9.3f} {cpu_time:9.3f} {rows_scanned:13} {(bytes_read or 0) / 1e6:9.1f} "
+                         f"{(peak or 0) / 1e6:9.1f}  {' '.join(query.split())[:80]}")
+
+    lines += ["", f"seconds per stage over the last {runs} runs, oldest first (change: latest vs the median of the runs before)"]
+    for name, history in sorted(stage_trend(conn, runs, stage).items()):
+        seconds = [s for _, s, _ in history]
+        before = sorted(seconds[:-1])
+        change = ""
+        if before and before[len(before) // 2]:
+            change = f"{seconds[-1] / before[len(before) // 2] - 1:+.0%}"
+        lines.append(f"{name:40} {change:>6}  " + ' '.join(f"{s:.1f}" for s in seconds))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pipeline run history: slowest stages and how they trend across runs")
+    parser.add_argument('command', choices=['report'])
+    parser.add_argument('--runs', type=int, default=10, help="runs the trend goes back")
+    parser.add_argument('--stage', default=None, help="only this stage in the trend")
+    parser.add_argument('--limit', type=int, default=10, help="stages / queries listed for the latest run")
+    args = parser.parse_args()
+
+    logger = Logger()
+    conn = duckdb.connect(os.path.join(DATABASE_PATH, 'nba.db'))
+    print(report(conn, args.runs, args.stage, args.limit))
+    conn.close()
+    logger.log_info(f"metrics report of the last {args.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
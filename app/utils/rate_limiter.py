@@ -0,0 +1,62 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    thread safe token bucket shared by every fetch worker
+
+    rate: requests per second allowed across all workers
+    capacity: how many requests can go out in a burst
+    backoff() / recover() adjust the rate (AIMD) so we stay under stats.nba.com throttling
+    backoff_window: the rate is halved at most once per window, workers throttled together count once
+    max_pause: longest pause a backoff puts every worker in, the failing worker waits out its own retry delay
+    """
+
+    def __init__(self, rate=2.0, capacity=None, min_rate=0.2, max_rate=None, backoff_window=2.0, max_pause=1.0):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.backoff_window = backoff_window
+        self.max_pause = max_pause
+        self.backed_off = float('-inf')
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request is allowed to go out."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def backoff(self, pause=None):
+        """
+        Throttle / timeout seen: halve the rate (once per backoff_window) and pause every worker for
+        pause seconds, at most max_pause (a short Retry-After like pause, not the caller's retry delay).
+        """
+        with self.lock:
+            now = time.monotonic()
+            if now - self.backed_off >= self.backoff_window:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = 0
+                self.backed_off = now
+            pause = self.max_pause if pause is None else min(pause, self.max_pause)
+            self.paused_until = max(self.paused_until, now + pause)
+
+    def recover(self, step=None):
+        """Creep the rate back up after a successful request (default 5% of max_rate per success)."""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + (step or self.max_rate * 0.05))
@@ -0,0 +1,139 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from nba_api.stats.library.http import NBAStatsResponse
+
+from .stats_api import DEFAULT_STATS_URL, stats_url
+
+
+BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CACHE_PATH = os.path.join(BASE_PATH, 'app', 'data', 'cache', 'http')
+
+CACHE_MODES = ('off', 'readwrite', 'replay')
+DEFAULT_CACHE_MODE = os.environ.get('NBA_CACHE_MODE', 'readwrite')
+
+# ttl in seconds, None never expires
+CURRENT_SEASON_TTL = 60 * 60            # league game finder for the season still being played
+PLAYER_INFO_TTL = 7 * 24 * 60 * 60      # commonplayerinfo, teams / rosters change
+EMPTY_RESPONSE_TTL = 6 * 60 * 60        # a response with no rows may just not be published yet
+
+
+class CacheMiss(Exception):
+    pass
+
+
+class ResponseCache:
+    """
+    content addressed on-disk cache for nba_api endpoint calls
+
+    key: sha256 of the endpoint name and its request parameters, plus the url when NBA_STATS_URL points somewhere
+    else than stats.nba.com, so responses of a local fake never answer for the real site
+    value: the raw response body (gzipped json), so a hit rebuilds the endpoint exactly like a network call would
+
+    mode 'readwrite' serves hits and stores misses, 'replay' only serves from the cache (CacheMiss otherwise),
+    'off' always goes to the network
+    """
+
+    def __init__(self, cache_dir=CACHE_PATH, mode=DEFAULT_CACHE_MODE):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"unknown cache mode {mode}, expected one of {CACHE_MODES}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0  # responses asked of the network, failed ones included
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint, parameters):
+        request = {'endpoint': endpoint, 'parameters': parameters}
+        if stats_url() != DEFAULT_STATS_URL:
+            request['url'] = stats_url()
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json.gz')
+
+    def read(self, key):
+        """cached entry or None when missing / expired"""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry['ttl'] is not None and time.time() > entry['fetched_at'] + entry['ttl']:
+            return None
+        return entry
+
+    def write(self, key, entry):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)  # atomic, a concurrent reader never sees half a file
+
+    def fetch(self, result, ttl=None):
+        """
+        fill an endpoint built with get_request=False, from the cache when possible
+        ttl: seconds the response stays valid, None for responses that never change (finished games)
+        """
+        if self.mode == 'off':
+            self.count_request()
+            result.get_request()
+            return result
+
+        key = self.key(result.endpoint, result.parameters)
+        entry = self.read(key)
+        if entry is not None:
+            with self.lock:
+                self.hits += 1
+            result.nba_response = NBAStatsResponse(response=entry['response'], status_code=entry['status_code'], url=entry['url'])
+            result.load_response()
+            return result
+
+        with self.lock:
+            self.misses += 1
+        if self.mode == 'replay':
+            raise CacheMiss(f"{result.endpoint} {result.parameters} not in cache")
+
+        self.count_request()
+        result.get_request()  # raises before anything is written when the response does not parse
+        response = result.nba_response
+        if is_empty(result):
+            ttl = EMPTY_RESPONSE_TTL if ttl is None else min(ttl, EMPTY_RESPONSE_TTL)
+        self.write(key, {
+            'endpoint': result.endpoint,
+            'parameters': result.parameters,
+            'status_code': response._status_code,
+            'url': response.get_url(),
+            'fetched_at': time.time(),
+            'ttl': ttl,
+            'response': response.get_response()
+        })
+        return result
+
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+
+
+def is_empty(result):
+    """True when no data set in the response has any rows"""
+    return not any(data_set.get_dict().get('data') for data_set in result.data_sets)
+
+
+def fetch(result, cache=None, ttl=None):
+    """request an endpoint built with get_request=False, through the cache when one is given"""
+    if cache is None:
+        result.get_request()
+        return result
+    return cache.fetch(result, ttl=ttl)
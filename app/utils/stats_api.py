@@ -0,0 +1,26 @@
+import os
+
+from nba_api.stats.library.http import NBAStatsHTTP
+
+
+# where nba_api sends the stats requests, e.g. NBA_STATS_URL=http://127.0.0.1:8765/stats for the local fake
+# (python -m app.benchmarks.fake_stats), the real site when unset
+DEFAULT_STATS_URL = 'https://stats.nba.com/stats'
+STATS_URL = os.environ.get('NBA_STATS_URL', DEFAULT_STATS_URL)
+# seconds before a request times out, nba_api's own default is 30
+STATS_TIMEOUT = float(os.environ.get('NBA_STATS_TIMEOUT', '30'))
+# requests per second across every collector worker when no rate is given, the adaptive backoff works under it
+STATS_RATE = float(os.environ.get('NBA_STATS_RATE', '8'))
+
+
+def configure(url=STATS_URL):
+    """point every nba_api stats endpoint at url (the part before /{endpoint})"""
+    NBAStatsHTTP.base_url = f"{url.rstrip('/')}/{{endpoint}}"
+
+
+def stats_url():
+    """the url nba_api requests currently go to"""
+    return NBAStatsHTTP.base_url[:-len('/{endpoint}')]
+
+
+configure()
@@ -0,0 +1,94 @@
+"""
+the incremental (INCREMENTAL_BY_PARTITION on SEASON_ID) sqlmesh models against a FULL evaluation of their query
+(app.sql.incremental_check) on a small synthetic nba.db: plan with one season held back, append that season's games
+to raw.*, run, and every model has to match the FULL query row for row
+
+    python -m pytest tests
+"""
+import datetime
+import shutil
+
+import duckdb
+import pytest
+
+pytest.importorskip('sqlmesh')
+
+from sqlmesh import Context
+
+from app.benchmarks.restate import synthetic_raw, SQLMESH_PATH
+from app.sql.incremental_check import INCREMENTAL_MODELS, compare, stale_rows
+
+
+APPENDED_SEASON = 22024  # the last of the synthetic seasons, the one a nightly run appends games to
+
+
+def raw_tables(conn):
+    """{raw table: whether it has a GAME_ID column}, raw.log_table last (the other tables' games are looked up in it)"""
+    rows = conn.execute("""
+        SELECT table_name, bool_or(column_name = 'GAME_ID')
+        FROM information_schema.columns
+        WHERE table_schema = 'raw'
+        GROUP BY table_name
+        ORDER BY table_name = 'log_table', table_name
+    """).fetchall()
+    return dict(rows)
+
+
+def season_filter(table, has_game_id, season=APPENDED_SEASON):
+    if table == 'lines_source':
+        return f"file = 'lines{str(season)[1:]}.csv'"
+    assert has_game_id, f"raw.{table} has no GAME_ID to hold its season back by"
+    return f"CAST(GAME_ID AS BIGINT) IN (SELECT CAST(GAME_ID AS BIGINT) FROM raw.log_table WHERE SEASON_ID = {season})"
+
+
+def hold_back(conn):
+    """move the rows of APPENDED_SEASON from raw.* to appended.*"""
+    conn.execute("CREATE SCHEMA appended")
+    for table, has_game_id in raw_tables(conn).items():
+        where = season_filter(table, has_game_id)
+        conn.execute(f"CREATE TABLE appended.{table} AS SELECT * FROM raw.{table} WHERE {where}")
+        conn.execute(f"DELETE FROM raw.{table} WHERE {where}")
+
+
+def append(conn):
+    """the held back season's games land in raw.*, as update_duckdb inserts new games"""
+    for table in raw_tables(conn):
+        conn.execute(f"INSERT INTO raw.{table} SELECT * FROM appended.{table}")
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """a copy of the sqlmesh project on tmp_path/nba.db, raw.* holding every synthetic season but APPENDED_SEASON"""
+    monkeypatch.setenv('NBA_DATABASE_PATH', str(tmp_path))
+    monkeypatch.delenv('NBA_RESTATE_SEASONS', raising=False)
+    project_path = tmp_path / 'sqlmesh'
+    shutil.copytree(SQLMESH_PATH, project_path, ignore=shutil.ignore_patterns('.cache', 'logs'))
+    conn = duckdb.connect(str(tmp_path / 'nba.db'))
+    synthetic_raw(conn, seasons=3, teams=6, games=10)
+    hold_back(conn)
+    conn.close()
+    return project_path
+
+
+def test_incremental_append_matches_full(project, tmp_path):
+    context = Context(paths=str(project))
+    context.plan(auto_apply=True, no_prompts=True)
+    context.close()
+
+    conn = duckdb.connect(str(tmp_path / 'nba.db'))
+    append(conn)
+    conn.close()
+
+    # a day past the plan, so the run has an interval to evaluate whatever time the test runs at
+    context = Context(paths=str(project))
+    context.run(ignore_cron=True, execution_time=datetime.datetime.now() + datetime.timedelta(days=2))
+    context.close()
+
+    conn = duckdb.connect(str(tmp_path / 'nba.db'), read_only=True)
+    seasons = {row[0] for row in conn.execute("SELECT DISTINCT SEASON_ID FROM base.players_processed").fetchall()}
+    assert APPENDED_SEASON in {int(season) for season in seasons}, "the run did not pick up the appended season"
+    for model_name, model_file in INCREMENTAL_MODELS.items():
+        stale_rows(conn, model_name, model_file)  # the condition a run renders binds against the table
+        only_full, only_incremental, _ = compare(conn, model_name, model_file)
+        assert (only_full, only_incremental) == (0, 0), f"{model_name}: {only_full} rows only in FULL, {only_incremental} only in incremental"
+    conn.close()